@@ -0,0 +1,256 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Loader Benchmark Module
+
+This module times the game_data loaders on generated data sets and checks
+the results against committed baselines, so a parser change that slows
+startup down fails loudly instead of going unnoticed.
+
+Usage:
+    python benchmark_loaders.py                    # run and compare to baselines
+    python benchmark_loaders.py --sizes 1k 100k    # skip the 1M run
+    python benchmark_loaders.py --update-baselines # record new baselines
+
+Baselines are machine-specific; record them on the machine that runs the check.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+import game_data
+import data_converter
+import world_generator
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "benchmark_baselines.json")
+
+# Fail when throughput falls more than this far below the baseline
+DEFAULT_THRESHOLD_PERCENT = 25
+
+SIZES = {"1k": 1000, "100k": 100000, "1m": 1000000}
+
+# ============================================================================
+# BENCHMARK TARGETS
+# ============================================================================
+
+def read_blocks(filename):
+    """Split a data file into lists of lines, one list per record"""
+    with open(filename) as f:
+        text = f.read()
+    return [block.split("\n") for block in text.split("\n\n") if block.strip()]
+
+
+def _load_quests(filename, blocks):
+    return len(game_data.load_quests(filename, use_cache=False))
+
+
+def _load_items(filename, blocks):
+    return len(game_data.load_items(filename, use_cache=False))
+
+
+def _parse_quest_blocks(filename, blocks):
+    for block in blocks:
+        game_data.parse_quest_block(block)
+    return len(blocks)
+
+
+def _parse_item_blocks(filename, blocks):
+    for block in blocks:
+        game_data.parse_item_block(block)
+    return len(blocks)
+
+
+# name → (function, which generated file it reads)
+TARGETS = {
+    "load_quests": (_load_quests, "quests"),
+    "load_items": (_load_items, "items"),
+    "load_quests_jsonl": (_load_quests, "quests_jsonl"),
+    "load_items_jsonl": (_load_items, "items_jsonl"),
+    "parse_quest_block": (_parse_quest_blocks, "quests"),
+    "parse_item_block": (_parse_item_blocks, "items"),
+}
+
+# ============================================================================
+# MEASURING
+# ============================================================================
+
+def measure(function, filename, blocks, repeats):
+    """
+    Time function and trace its peak memory
+
+    The timed runs and the traced run are kept apart because tracemalloc
+    slows allocation down a lot.
+
+    Returns: Dictionary with records, seconds, records_per_second, peak_memory_bytes
+    """
+    best = None
+    records = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        records = function(filename, blocks)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    tracemalloc.start()
+    try:
+        function(filename, blocks)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "records": records,
+        "seconds": round(best, 4),
+        "records_per_second": round(records / best) if best else 0,
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_benchmarks(size_names, targets=None, work_directory=None, repeats=3):
+    """
+    Generate data sets and run every target on each size
+
+    Args:
+        size_names: Keys of SIZES to run ("1k", "100k", "1m")
+        targets: Names from TARGETS (default: all)
+        work_directory: Where to write the generated files (default: a temp dir)
+        repeats: Timed runs per benchmark; the fastest one counts
+
+    Returns: Dictionary {"target/size": result dictionary}
+    """
+    targets = targets or list(TARGETS)
+    results = {}
+
+    with tempfile.TemporaryDirectory(dir=work_directory) as directory:
+        for size_name in size_names:
+            count = SIZES[size_name]
+            files = {
+                "quests": os.path.join(directory, f"quests_{size_name}.txt"),
+                "items": os.path.join(directory, f"items_{size_name}.txt"),
+            }
+            world_generator.generate_quests_file(files["quests"], count)
+            world_generator.generate_items_file(files["items"], count)
+            for kind in ("quests", "items"):
+                files[f"{kind}_jsonl"] = os.path.splitext(files[kind])[0] + ".jsonl"
+                data_converter.convert_data_file(files[kind], files[f"{kind}_jsonl"], kind[:-1])
+            # Only the block-format files are used by the parse_*_block targets
+            blocks = {kind: read_blocks(files[kind]) for kind in ("quests", "items")}
+            blocks["quests_jsonl"] = blocks["items_jsonl"] = None
+
+            # Large inputs take long enough that one timed run is stable
+            size_repeats = repeats if count < 1000000 else 1
+            for target in targets:
+                function, kind = TARGETS[target]
+                results[f"{target}/{size_name}"] = measure(
+                    function, files[kind], blocks[kind], size_repeats)
+    return results
+
+# ============================================================================
+# BASELINES
+# ============================================================================
+
+def load_baselines(filename=BASELINE_FILE):
+    """
+    Read committed baselines
+
+    Returns: Dictionary with "threshold_percent" and "results", or None if missing
+    """
+    if not os.path.exists(filename):
+        return None
+    with open(filename) as f:
+        return json.load(f)
+
+
+def save_baselines(results, filename=BASELINE_FILE, threshold_percent=DEFAULT_THRESHOLD_PERCENT):
+    """Write results as the new baselines (keeps entries for sizes not re-run)"""
+    baselines = load_baselines(filename) or {"results": {}}
+    baselines["threshold_percent"] = threshold_percent
+    baselines["results"].update(results)
+    baselines["results"] = dict(sorted(baselines["results"].items()))
+    with open(filename, "w") as f:
+        json.dump(baselines, f, indent=2)
+        f.write("\n")
+
+
+def compare_to_baselines(results, baselines, threshold_percent=None):
+    """
+    Find benchmarks whose throughput dropped past the threshold
+
+    Benchmarks with no baseline are skipped.
+
+    Returns: List of regression messages (empty if everything is fine)
+    """
+    if threshold_percent is None:
+        threshold_percent = baselines.get("threshold_percent", DEFAULT_THRESHOLD_PERCENT)
+
+    regressions = []
+    for name, result in results.items():
+        baseline = baselines.get("results", {}).get(name)
+        if not baseline:
+            continue
+        expected = baseline["records_per_second"]
+        floor = expected * (1 - threshold_percent / 100)
+        if result["records_per_second"] < floor:
+            drop = 100 * (1 - result["records_per_second"] / expected)
+            regressions.append(
+                f"{name}: {result['records_per_second']:,} records/sec is {drop:.0f}% "
+                f"below the baseline of {expected:,} (limit {threshold_percent}%)")
+    return regressions
+
+
+def format_results(results):
+    """Format results as a table"""
+    lines = [f"{'benchmark':<26}{'records/sec':>14}{'seconds':>10}{'peak MiB':>10}"]
+    for name, result in results.items():
+        lines.append(f"{name:<26}{result['records_per_second']:>14,}"
+                     f"{result['seconds']:>10.3f}"
+                     f"{result['peak_memory_bytes'] / (1024 * 1024):>10.1f}")
+    return "\n".join(lines)
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the game_data loaders")
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=None,
+                        help="allowed throughput drop in percent (default: from the baseline file)")
+    parser.add_argument("--baselines", default=BASELINE_FILE)
+    parser.add_argument("--update-baselines", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.sizes, args.targets, repeats=args.repeats)
+    print(format_results(results))
+
+    if args.update_baselines:
+        threshold = DEFAULT_THRESHOLD_PERCENT if args.threshold is None else args.threshold
+        save_baselines(results, args.baselines, threshold)
+        print(f"\nBaselines written to {args.baselines}")
+        return 0
+
+    baselines = load_baselines(args.baselines)
+    if baselines is None:
+        print(f"\nNo baselines at {args.baselines}; run with --update-baselines first")
+        return 0
+
+    regressions = compare_to_baselines(results, baselines, args.threshold)
+    if regressions:
+        print("\nTHROUGHPUT REGRESSIONS:")
+        for message in regressions:
+            print(f"  {message}")
+        return 1
+    print("\nAll benchmarks within threshold of baselines")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Benchmark Module
+
+This module measures what one character save costs with each way of
+saving, so changes to the save path can be compared with real numbers.
+
+Usage:
+    python benchmark_saves.py                 # 1000 characters, every mode
+    python benchmark_saves.py --count 5000 --modes atomic_fsync group_commit
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+import character_manager
+import save_queue
+import world_generator
+
+# ============================================================================
+# SAVE MODES
+# ============================================================================
+
+def _save_in_place(characters, save_directory):
+    # The old save: truncate the save file and write it key by key (not crash-safe)
+    os.makedirs(save_directory, exist_ok=True)
+    for character in characters:
+        with open(character_manager.get_save_path(character["name"], save_directory), "w") as f:
+            f.write(character_manager.format_character(character))
+
+
+def _save_atomic(characters, save_directory):
+    for character in characters:
+        character_manager.save_character(character, save_directory, sync=False)
+
+
+def _save_atomic_fsync(characters, save_directory):
+    for character in characters:
+        character_manager.save_character(character, save_directory)
+
+
+def _save_group_commit(characters, save_directory):
+    character_manager.save_characters(characters, save_directory)
+
+
+def _save_unchanged(characters, save_directory):
+    # Saving characters that have not changed since their last save (skipped)
+    for character in characters:
+        character_manager.save_character(character, save_directory)
+
+
+def _save_journal(characters, save_directory):
+    # One journal append (fsynced) per save, as for a single gold change
+    for character in characters:
+        try:
+            character_manager.record_change(character, "gold", 1, save_directory)
+        except character_manager.CharacterNotFoundError:
+            # The first run saves and starts the journals, so the measured run only appends
+            character_manager.save_character(character, save_directory)
+            character_manager.record_change(character, "gold", 1, save_directory)
+
+
+def _save_sqlite(characters, save_directory):
+    database = os.path.join(save_directory, "saves.db")
+    for character in characters:
+        character_manager.save_character(character, database)
+
+
+def _save_sqlite_batch(characters, save_directory):
+    # One transaction for the whole batch
+    character_manager.save_characters(characters, os.path.join(save_directory, "saves.db"))
+
+
+def _save_write_behind(characters, save_directory):
+    # Includes waiting for the writer, so this is throughput, not what the caller waits for
+    queue = save_queue.SaveQueue(save_directory)
+    for character in characters:
+        queue.save(character)
+    queue.close()
+
+
+# name → function(characters, save_directory)
+MODES = {
+    "in_place": _save_in_place,
+    "atomic": _save_atomic,
+    "atomic_fsync": _save_atomic_fsync,
+    "group_commit": _save_group_commit,
+    "write_behind": _save_write_behind,
+    "unchanged": _save_unchanged,
+    "journal": _save_journal,
+    "sqlite": _save_sqlite,
+    "sqlite_batch": _save_sqlite_batch,
+}
+
+# Modes whose measured run saves the characters exactly as first saved
+UNCHANGED_MODES = {"unchanged"}
+
+# ============================================================================
+# MEASURING
+# ============================================================================
+
+def make_characters(count, seed=163):
+    """Build count generated characters without writing them"""
+    with tempfile.TemporaryDirectory() as directory:
+        world_generator.generate_save_games(directory, count, seed)
+        names = character_manager.list_saved_characters(directory)
+        characters, _ = character_manager.load_characters(names, directory)
+        return list(characters.values())
+
+
+def run_benchmarks(count, modes=None, work_directory=None):
+    """
+    Save count characters with each mode into a fresh directory
+
+    Every mode saves the characters twice (a first save, then overwriting
+    it), and the second run is the one measured. The second run saves
+    changed characters (one more gold each), so unchanged saves are not
+    skipped, except in UNCHANGED_MODES.
+
+    Returns: Dictionary {mode: {"saves", "seconds", "microseconds_per_save", "saves_per_second"}}
+    """
+    modes = modes or list(MODES)
+    characters = make_characters(count)
+    results = {}
+
+    for mode in modes:
+        # A fresh copy per mode: the journal mode changes the characters it saves
+        changed = [dict(character, gold=character["gold"] + 1) for character in characters]
+        second = characters if mode in UNCHANGED_MODES else changed
+        with tempfile.TemporaryDirectory(dir=work_directory) as directory:
+            MODES[mode](characters, directory)
+            start = time.perf_counter()
+            MODES[mode](second, directory)
+            elapsed = time.perf_counter() - start
+        results[mode] = {
+            "saves": count,
+            "seconds": round(elapsed, 4),
+            "microseconds_per_save": round(elapsed / count * 1000000, 1),
+            "saves_per_second": round(count / elapsed) if elapsed else 0,
+        }
+    return results
+
+
+def format_results(results):
+    """Format results as a table"""
+    lines = [f"{'mode':<16}{'us/save':>10}{'saves/sec':>12}{'seconds':>10}"]
+    for mode, result in results.items():
+        lines.append(f"{mode:<16}{result['microseconds_per_save']:>10.1f}"
+                     f"{result['saves_per_second']:>12,}{result['seconds']:>10.3f}")
+    return "\n".join(lines)
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the cost of one character save")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--directory", default=None,
+                        help="where to write (fsync cost depends on the filesystem)")
+    args = parser.parse_args(argv)
+
+    print(format_results(run_benchmarks(args.count, args.modes, args.directory)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,6 +13,12 @@ This module handles character creation, loading, and saving.
 """
 
 import os
+import re
+import math
+import hashlib
+import threading
+from collections import OrderedDict
+import inventory_system
 from custom_exceptions import (
     InvalidCharacterClassError,
     CharacterNotFoundError,
@@ -88,7 +94,8 @@ def create_character(name, character_class):
 
 
 # AI USAGE - I had AI help me format the save function in this format:
-def save_character(character, save_directory="data/save_games"):
+def save_character(character, save_directory="data/save_games", sync=True, journal_position=None,
+                   report_skip=False):
 
     """
     Save character to file
@@ -109,7 +116,23 @@ def save_character(character, save_directory="data/save_games"):
     ACTIVE_QUESTS: quest1,quest2
     COMPLETED_QUESTS: quest1,quest2
     
-    Returns: True if successful
+    The save is written to a temporary file and then swapped in with
+    os.replace, so a crash part-way through never leaves a truncated save:
+    the file holds either the old save or the new one. With sync=True the
+    data is also fsynced, so it survives a power cut once this returns.
+    (To save many characters at once, save_characters is faster.)
+
+    If the character has not changed since it was last saved or loaded
+    (and its save file has not been touched since), nothing is written.
+    That still counts as a successful save; pass report_skip=True to get
+    SAVE_UNCHANGED back instead of True when it happens.
+
+    The character's journal (see record_changes) is folded into the save.
+    To save a copy taken earlier, e.g. on another thread, take it with
+    snapshot_character and pass its journal_position: journal entries
+    recorded after the copy was taken are then kept.
+
+    Returns: True (SAVE_UNCHANGED for a skipped save, with report_skip=True)
     Raises: PermissionError, IOError (let them propagate or handle)
     """
     # TODO: Implement save functionality
@@ -118,29 +141,112 @@ def save_character(character, save_directory="data/save_games"):
     # Lists should be saved as comma-separated values
 
 
-# Make sure the save directory exists
-    os.makedirs(save_directory, exist_ok=True)
+    if is_database(save_directory):
+        get_character_store(save_directory).save_character(character, sync)
+        character_cache.invalidate(save_directory, [character["name"]])
+        return True
 
-    # Build the save file path using character's name
-    filepath = os.path.join(save_directory, f"{character['name']}_save.txt")
+# Build the save file path using character's name
+    filepath = get_save_path(character["name"], save_directory)
 
+    # Errors are raised (not turned into False) so the caller knows the save failed
+    text = format_character(character)
+    content_hash = _content_hash(text)
+    if _is_unchanged(filepath, content_hash, sync):
+        return SAVE_UNCHANGED if report_skip else True
     try:
-        with open(filepath, "w") as f:
-            for key, value in character.items():
-                # If the value is a list (like inventory or quests), join it as comma-separated
-                if isinstance(value, list):
-                    value = ",".join(value)
-                # Write the line as key:value
-                f.write(f"{key}:{value}\n")
-        return True
-    except Exception as e:
-        # Could log e here if needed
-        return False
-    
+        temp_path = _write_temp_file(filepath, text, sync)
+    except FileNotFoundError:
+        # Make sure the save directory (or its shard directory) exists
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        temp_path = _write_temp_file(filepath, text, sync)
+    with _journal_lock(filepath):
+        os.replace(temp_path, filepath)
+        _trim_journal(filepath, content_hash, journal_position, sync)
+    if sync:
+        _sync_directory(os.path.dirname(filepath))
+    _remember_saved(filepath, content_hash, sync)
+    character_cache.invalidate(save_directory, [character["name"]])
+    _record_saves(save_directory, [character])
+    return True
+
+
+def save_characters(characters, save_directory="data/save_games", sync=True,
+                    journal_positions=None):
+    """
+    Save many characters at once (group commit)
+
+    Each save is atomic exactly like save_character, but the expensive
+    steps are batched: every temporary file is written first, then they
+    are all fsynced, then all swapped in, and each directory written to
+    is fsynced once for the whole batch. Unchanged characters are skipped
+    (see save_character).
+
+    journal_positions maps names to the journal positions snapshot_character
+    gave for the copies being saved (see save_character).
+
+    Returns: Number of characters saved (not counting skipped ones)
+    Raises: PermissionError, IOError (saves already swapped in are kept)
+    """
+    if is_database(save_directory):
+        characters = list(characters)
+        saved = get_character_store(save_directory).save_characters(characters, sync)
+        character_cache.invalidate(save_directory, [c["name"] for c in characters])
+        return saved
+    os.makedirs(save_directory, exist_ok=True)
+
+    pending = []  # (temp_path, filepath, content_hash)
+    saved = []
+    directories = {save_directory}
+    replaced = 0
+    try:
+        for character in characters:
+            filepath = get_save_path(character["name"], save_directory)
+            text = format_character(character)
+            content_hash = _content_hash(text)
+            if _is_unchanged(filepath, content_hash, sync):
+                continue
+            if os.path.dirname(filepath) not in directories:
+                directories.add(os.path.dirname(filepath))
+                os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            pending.append((_write_temp_file(filepath, text, False), filepath, content_hash))
+            saved.append(character)
+        if sync:
+            for temp_path, _, _ in pending:
+                _sync_file(temp_path)
+
+        for (temp_path, filepath, content_hash), character in zip(pending, saved):
+            position = journal_positions.get(character["name"]) if journal_positions else None
+            with _journal_lock(filepath):
+                os.replace(temp_path, filepath)
+                replaced += 1
+                _trim_journal(filepath, content_hash, position, sync)
+    finally:
+        # Anything not swapped in (because of an error) is cleaned up
+        for temp_path, _, _ in pending[replaced:]:
+            _remove_quietly(temp_path)
+
+    if sync:
+        for directory in directories:
+            _sync_directory(directory)
+    for _, filepath, content_hash in pending:
+        _remember_saved(filepath, content_hash, sync)
+    character_cache.invalidate(save_directory, [c["name"] for c in saved])
+    _record_saves(save_directory, saved)
+    return len(pending)
+
+
 def load_character(character_name, save_directory="data/save_games"):
 
     """
     Load character from save file
+
+    If the character has a journal (see record_changes), its changes are
+    replayed on top of the save file.
+
+    Recently loaded characters come from character_cache (see CHARACTER
+    CACHE below) instead of being read again; every call still returns a
+    fresh copy the caller may change.
     
     Args:
         character_name: Name of character to load
@@ -161,50 +267,139 @@ def load_character(character_name, save_directory="data/save_games"):
     
     from custom_exceptions import CharacterNotFoundError, InvalidSaveDataError
 
-    # Build full file path for the save file
-    filepath = os.path.join(save_directory, f"{character_name}_save.txt")
+    cached = character_cache.get(save_directory, character_name)
+    if cached is not None:
+        return cached
+    cache_version = character_cache.version
+
+    if is_database(save_directory):
+        character = get_character_store(save_directory).load_character(character_name)
+        character_cache.put(save_directory, character, cache_version)
+        return character
+
+    # Find the save file (in either layout, see find_save_file)
+    filepath = find_save_file(character_name, save_directory)
 
     # Check if the file exists
-    if not os.path.exists(filepath):
+    if filepath is None:
         raise CharacterNotFoundError(f"Save file not found for: {character_name}")
 
     character = {}
+    journal_path = _journal_path(filepath)
 
     try:
         with open(filepath, "r") as f:
-            for line in f:
-                # Skip lines that don't contain a colon (invalid line)
-                if ":" not in line:
-                    continue
-
-                # Split at the first colon into key and value
-                key, value = line.strip().split(":", 1)
-
-                # Strip extra whitespace from key and value
-                key = key.strip()
-                value = value.strip()
-
-                # Convert comma-separated strings back into lists
-                if "," in value:
-                    value = value.split(",")
-                # Convert numeric strings to integers
-                elif value.isdigit():
-                    value = int(value)
-
-                # Store in character dictionary
-                character[key] = value
+            text = f.read()
+        for line in text.split("\n"):
+            # Skip lines that don't contain a colon (invalid line)
+            if ":" not in line:
+                continue
+
+            # Split at the first colon into key and value
+            key, value = line.strip().split(":", 1)
+
+            # Strip extra whitespace from key and value
+            key = key.strip()
+            value = value.strip()
+
+            # Convert comma-separated strings back into lists
+            if "," in value:
+                value = value.split(",")
+            # Convert numeric strings to integers
+            elif value.isdigit():
+                value = int(value)
+
+            # Store in character dictionary
+            character[key] = value
+
+        journal = _read_journal(journal_path)
+        replayed = False
+        if journal is not None:
+            base, changes = journal
+            if base == _content_hash(text).hex():
+                for kind, value in changes:
+                    _replay_change(character, kind, value)
+                replayed = bool(changes)
+            else:
+                with _journal_lock(filepath):
+                    # Left over from a crash just after a save: already part of
+                    # the save file. (Unless a save just replaced both files.)
+                    if _journal_is_stale(filepath):
+                        _remove_journal(filepath)
+                        _append_manifest(save_directory, [])
 
     except Exception as e:
         # If any issue occurs while reading or parsing the file, raise an error
         raise InvalidSaveDataError(f"Save data format is invalid for {character_name}: {e}")
 
+    if not replayed:
+        # Saving the character again before it changes can then be skipped
+        # (a file this process wrote without fsync stays marked as not synced)
+        previous = _saved_state.get(filepath)
+        _remember_saved(filepath, _content_hash(format_character(character)),
+                        previous[3] if previous else True)
+    character_cache.put(save_directory, character, cache_version)
     return character
 
+# Threads load_characters uses by default (loading waits on the disk, not the CPU)
+LOAD_WORKERS = 16
+
+
+def load_characters(names, save_directory="data/save_games", max_workers=LOAD_WORKERS):
+    """
+    Load many characters at once, on a pool of threads
+
+    Every name is loaded like load_character; a save that cannot be loaded
+    does not stop the others. Worth it when each read is slow (network
+    storage); on a fast local disk it is about as fast as a plain loop.
+
+    Args:
+        names: Character names (repeats are loaded once)
+        save_directory: Directory containing save files (or a database)
+        max_workers: Most loads running at the same time
+
+    Returns: (Dictionary {name: character} of the loaded characters,
+              Dictionary {name: exception} of the ones that failed),
+             both in the order of names
+    """
+    names = list(dict.fromkeys(names))
+    outcomes = {}
+
+    def load(name):
+        try:
+            outcomes[name] = (load_character(name, save_directory), None)
+        except Exception as e:
+            outcomes[name] = (None, e)
+
+    if len(names) <= 1 or max_workers <= 1:
+        for name in names:
+            load(name)
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(names)),
+                                thread_name_prefix="load-characters") as pool:
+            for _ in pool.map(load, names):
+                pass
+
+    characters = {}
+    errors = {}
+    for name in names:
+        character, error = outcomes[name]
+        if error is None:
+            characters[name] = character
+        else:
+            errors[name] = error
+    return characters, errors
+
+
 def list_saved_characters(save_directory="data/save_games"):
 
     """
     Get list of all saved character names
     
+    Names come from the save directory's manifest (see get_save_manifest),
+    so the directory is only scanned when the manifest is missing or stale.
+
     Returns: List of character names (without _save.txt extension)
     """
     # TODO: Implement this function
@@ -212,10 +407,14 @@ def list_saved_characters(save_directory="data/save_games"):
     # Extract character names from filenames
 
     
-    if not os.path.exists(save_directory):
+    if is_database(save_directory):
+        if not os.path.exists(save_directory):
+            return []
+        return get_character_store(save_directory).list_saved_characters()
+    if not os.path.isdir(save_directory):
         return []
-    files = os.listdir(save_directory)
-    return [f.replace("_save.txt", "") for f in files if f.endswith("_save.txt")]
+    with _manifest_lock:
+        return list(_load_manifest(save_directory)["entries"])
 
 
  # ChatGPT suggested to use these commands above 
@@ -234,17 +433,1091 @@ def delete_character(character_name, save_directory="data/save_games"):
     # TODO: Implement character deletion
     # Verify file exists before attempting deletion
 
+    if is_database(save_directory):
+        get_character_store(save_directory).delete_character(character_name)
+        character_cache.invalidate(save_directory, [character_name])
+        return True
+
     # builds the filepath system to retrieve information
 
-    filename = f"{character_name}_save.txt"
-    filepath = os.path.join(save_directory, filename)
-    if not os.path.exists(filepath):
+    filepath = find_save_file(character_name, save_directory)
+    if filepath is None:
         raise CharacterNotFoundError(f"Character {character_name} was not found.")
     os.remove(filepath)
+    _remove_journal(filepath)
+    _saved_state.pop(filepath, None)
+    character_cache.invalidate(save_directory, [character_name])
+    _record_deletes(save_directory, [character_name])
 
     return True
 
 
+# ============================================================================
+# SAVE FILE HELPERS
+# ============================================================================
+
+SAVE_SUFFIX = "_save.txt"
+
+
+def get_save_path(character_name, save_directory="data/save_games"):
+    """Path of a character's save file (depends on the directory's layout)"""
+    if get_save_layout(save_directory) == "sharded":
+        return _sharded_save_path(character_name, save_directory)
+    return _flat_save_path(character_name, save_directory)
+
+
+def find_save_file(character_name, save_directory="data/save_games"):
+    """
+    Find a character's save file
+
+    The path for the directory's layout is tried first, then the other
+    layout's path, so saves stay readable part-way through a migration.
+
+    Returns: Path of the save file, or None if there is none
+    """
+    filepath = get_save_path(character_name, save_directory)
+    if os.path.exists(filepath):
+        return filepath
+    for other_path in (_flat_save_path(character_name, save_directory),
+                       _sharded_save_path(character_name, save_directory)):
+        if other_path != filepath and os.path.exists(other_path):
+            return other_path
+    return None
+
+
+def _flat_save_path(character_name, save_directory):
+    return os.path.join(save_directory, f"{character_name}{SAVE_SUFFIX}")
+
+
+def _sharded_save_path(character_name, save_directory):
+    return os.path.join(save_directory, *_shard_of(character_name),
+                        f"{character_name}{SAVE_SUFFIX}")
+
+
+def format_character(character):
+    """
+    Turn a character into the text of its save file
+
+    Returns: String with one key:value line per field
+    """
+    lines = []
+    for key, value in character.items():
+        # If the value is a list (like inventory or quests), join it as comma-separated
+        if isinstance(value, list):
+            value = ",".join(value)
+        lines.append(f"{key}:{value}\n")
+    return "".join(lines)
+
+
+def _write_temp_file(filepath, text, sync):
+    """
+    Write text to a temporary file next to filepath
+
+    The temporary name does not end in _save.txt, so it is never listed
+    as a save. The caller swaps it in with os.replace.
+
+    Returns: Path of the temporary file
+    """
+    temp_path = f"{filepath}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, "w") as f:
+            f.write(text)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+    except BaseException:
+        _remove_quietly(temp_path)
+        raise
+    return temp_path
+
+
+def _sync_file(filepath):
+    """fsync a file that has already been written and closed"""
+    fd = os.open(filepath, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _sync_directory(directory):
+    """fsync a directory so the renames in it survive a crash (POSIX only)"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _remove_quietly(filepath):
+    """Remove a file, ignoring errors (used for cleaning up temporary files)"""
+    try:
+        os.remove(filepath)
+    except OSError:
+        pass
+
+
+# ============================================================================
+# SAVE CHANGE TRACKING
+# ============================================================================
+
+# Autosaves and batch tools save far more often than characters change,
+# so every save remembers a hash of what it wrote. A save whose text hashes
+# the same is skipped, as long as the file on disk is still the one that
+# was written (same modification time and size).
+
+# What save_character(..., report_skip=True) returns for a skipped save
+SAVE_UNCHANGED = "unchanged"
+
+_saved_state = {}  # save file path → (content hash, mtime_ns, size, synced)
+
+
+def is_save_unchanged(character, save_directory="data/save_games", sync=False):
+    """
+    Check whether saving character now would be skipped
+
+    Returns: True if the save file already holds exactly this character
+             (and was fsynced, when sync is True)
+    """
+    return _is_unchanged(get_save_path(character["name"], save_directory),
+                         _content_hash(format_character(character)), sync)
+
+
+def _content_hash(text):
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+def _is_unchanged(filepath, content_hash, sync):
+    state = _saved_state.get(filepath)
+    if state is None or state[0] != content_hash or (sync and not state[3]):
+        return False
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return False
+    return (stat.st_mtime_ns, stat.st_size) == state[1:3]
+
+
+def _remember_saved(filepath, content_hash, synced):
+    stat = os.stat(filepath)
+    _saved_state[filepath] = (content_hash, stat.st_mtime_ns, stat.st_size, synced)
+
+
+# ============================================================================
+# CHARACTER CACHE
+# ============================================================================
+
+# load_character keeps the characters it loaded most recently in
+# character_cache, keyed by (real path of the save directory, name), so
+# every spelling of a directory (relative, absolute, via a symlink) shares
+# one entry. Saves, deletes and
+# journaled changes made through this module drop the entry, so the next
+# load reads the save again. Changes made by other processes (or straight
+# through a CharacterStore) are not seen: call character_cache.clear().
+
+CHARACTER_CACHE_SIZE = 256
+
+
+class CharacterCache:
+    """Size-bounded LRU cache of loaded characters, with hit and miss counters"""
+
+    def __init__(self, capacity=CHARACTER_CACHE_SIZE):
+        self.capacity = capacity
+        # Bumped by every invalidation, so a load that raced a save is not cached
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # (save_directory, name) → character
+        self._lock = threading.Lock()
+
+    def get(self, save_directory, character_name):
+        """
+        Returns: A copy of the cached character, or None on a miss
+        """
+        key = (os.path.realpath(save_directory), character_name)
+        with self._lock:
+            character = self._entries.get(key)
+            if character is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _copy_character(character)
+
+    def put(self, save_directory, character, version):
+        """
+        Cache a copy of a loaded character
+
+        version is self.version from before the load; if anything was
+        invalidated since, the character may be out of date and is not cached.
+        """
+        key = (os.path.realpath(save_directory), character["name"])
+        character = _copy_character(character)
+        with self._lock:
+            if self.capacity <= 0 or version != self.version:
+                return
+            self._entries[key] = character
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, save_directory, names):
+        """Forget the given characters of a save directory"""
+        save_directory = os.path.realpath(save_directory)
+        with self._lock:
+            self.version += 1
+            for name in names:
+                self._entries.pop((save_directory, name), None)
+
+    def clear(self):
+        """Forget every character"""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def resize(self, capacity):
+        """Change how many characters are kept (0 turns the cache off)"""
+        with self._lock:
+            self.capacity = capacity
+            while len(self._entries) > max(capacity, 0):
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        """
+        Returns: Dictionary with hits, misses, hit_rate, size and capacity
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "capacity": self.capacity,
+            }
+
+
+def _copy_character(character):
+    """Copy a character deep enough that changing the copy never changes the original"""
+    return {key: list(value) if isinstance(value, list) else value
+            for key, value in character.items()}
+
+
+character_cache = CharacterCache()
+
+
+# ============================================================================
+# JOURNAL SAVES
+# ============================================================================
+
+# Instead of rewriting the whole save file after every action, a change
+# can be appended to the character's journal, {name}_journal.txt, next to
+# its save file:
+#     base\t<hash of the save file the journal applies to>\t<random tag>
+#     gold\t-20
+#     experience\t150
+#     item\thealth_potion
+#     quest\tfirst_steps
+# load_character replays the journal on top of the save file. Compacting
+# folds the journal into a new save file and removes it; any full save
+# does the same. A save of a copy taken earlier (snapshot_character, as
+# SaveQueue does) instead keeps the entries recorded after the copy, in a
+# journal based on the new save. A journal whose base does not match the
+# save file was left over from a crash right after a save, and is ignored.
+
+JOURNAL_SUFFIX = "_journal.txt"
+JOURNAL_CHANGES = ("gold", "experience", "item", "quest")
+
+# Journals bigger than this are folded into their save by compact_journals
+JOURNAL_COMPACT_BYTES = 4096
+
+_journal_locks = {}  # save file path → lock for changing the save and its journal
+_journal_locks_guard = threading.Lock()
+
+
+def _journal_lock(filepath):
+    """
+    The lock for a save file and its journal
+
+    Each save file has its own lock, so journaling one character never
+    waits on another character's fsync.
+    """
+    lock = _journal_locks.get(filepath)
+    if lock is None:
+        with _journal_locks_guard:
+            lock = _journal_locks.setdefault(filepath, threading.RLock())
+    return lock
+
+
+def record_change(character, kind, value, save_directory="data/save_games", sync=True):
+    """Apply and journal one change (see record_changes)"""
+    return record_changes(character, [(kind, value)], save_directory, sync)
+
+
+def record_changes(character, changes, save_directory="data/save_games", sync=True):
+    """
+    Apply changes to character and append them to its journal
+
+    Args:
+        character: Character dictionary (changed in place)
+        changes: List of (kind, value) with kind one of JOURNAL_CHANGES:
+                 ("gold", amount), ("experience", amount),
+                 ("item", item_id), ("quest", completed_quest_id)
+        save_directory: Directory holding the character's save file
+        sync: fsync the journal, so the changes survive a power cut
+
+    The changes are checked like the game checks them (add_gold,
+    gain_experience, inventory_system.add_item_to_inventory). If one
+    fails, the changes before it are still journaled and the error is
+    raised.
+
+    Returns: Size of the journal in bytes (compare with JOURNAL_COMPACT_BYTES)
+    Raises:
+        CharacterNotFoundError if the character has never been saved
+        ValueError for an unknown kind of change or gold going negative
+        CharacterDeadError for experience gained while dead
+        InventoryFullError for an item added to a full inventory
+
+    (For a database, see CHARACTER STORE below, the changed character is
+    saved instead: updating its rows is already a small write. Returns 0.)
+    """
+    database = is_database(save_directory)
+    filepath = None if database else find_save_file(character["name"], save_directory)
+    if filepath is None and not database:
+        raise CharacterNotFoundError(f"Save file not found for: {character['name']}")
+
+    # (A database has no save file: the character's name is locked instead)
+    with _journal_lock(filepath or (save_directory, character["name"])):
+        lines = []
+        error = None
+        for kind, value in changes:
+            try:
+                if kind not in JOURNAL_CHANGES:
+                    raise ValueError(f"Unknown journal change: {kind}")
+                apply_change(character, kind, value)
+            except Exception as e:
+                error = e
+                break
+            lines.append(f"{kind}\t{_escape(str(value))}\n")
+
+        if database:
+            save_character(character, save_directory, sync)
+            if error is not None:
+                raise error
+            return 0
+
+        size, created = _append_journal(filepath, "".join(lines), sync) if lines else \
+            (_journal_size(filepath), False)
+        character_cache.invalidate(save_directory, [character["name"]])
+        if created:
+            # Keeps the manifest from mistaking the new file for an outside change
+            _append_manifest(save_directory, [])
+        if error is not None:
+            raise error
+        return size
+
+
+def apply_change(character, kind, value):
+    """Apply one journal change to character, with the game's checks"""
+    if kind == "gold":
+        add_gold(character, int(value))
+    elif kind == "experience":
+        gain_experience(character, int(value))
+    elif kind == "item":
+        _list_field(character, "inventory")
+        inventory_system.add_item_to_inventory(character, value)
+    else:
+        _replay_change(character, kind, value)
+
+
+def compact_journal(character_name, save_directory="data/save_games", sync=True):
+    """
+    Fold a character's journal into its save file
+
+    Returns: True if there was a journal to fold in
+    """
+    filepath = find_save_file(character_name, save_directory)
+    if filepath is None:
+        return False
+    with _journal_lock(filepath):
+        if not os.path.exists(_journal_path(filepath)):
+            return False
+        save_character(load_character(character_name, save_directory), save_directory, sync)
+        # Also covers a save that is still in the other layout's place
+        _remove_journal(filepath)
+        return True
+
+
+def compact_journals(save_directory="data/save_games", threshold=JOURNAL_COMPACT_BYTES, sync=True):
+    """
+    Fold every journal bigger than threshold bytes into its save file
+
+    Returns: Number of journals folded in
+    """
+    if not os.path.isdir(save_directory):
+        return 0
+    compacted = 0
+    for name, journal_path in list(iter_save_files(save_directory, JOURNAL_SUFFIX)):
+        try:
+            size = os.path.getsize(journal_path)
+        except FileNotFoundError:
+            continue
+        if size > threshold and compact_journal(name, save_directory, sync):
+            compacted += 1
+    return compacted
+
+
+def snapshot_character(character, save_directory="data/save_games"):
+    """
+    Copy a character to save later (e.g. on another thread)
+
+    Returns: (copy, journal position to pass to save_character with it)
+    """
+    if is_database(save_directory):
+        return _copy_character(character), None
+    try:
+        filepath = find_save_file(character["name"], save_directory)
+    except OSError:
+        filepath = None  # saving the copy reports the problem
+    if filepath is None:
+        return _copy_character(character), (b"", 0)
+    with _journal_lock(filepath):
+        return _copy_character(character), _journal_position(filepath)
+
+
+def _journal_path(save_path):
+    return save_path[:-len(SAVE_SUFFIX)] + JOURNAL_SUFFIX
+
+
+def _journal_position(filepath):
+    """
+    Where the journal of the save file at filepath ends now
+
+    Returns: (base line of the journal, size in bytes), (b"", 0) if there is none
+    """
+    try:
+        with open(_journal_path(filepath), "rb") as f:
+            return f.readline(), f.seek(0, os.SEEK_END)
+    except FileNotFoundError:
+        return b"", 0
+
+
+def _trim_journal(filepath, content_hash, position, sync):
+    """
+    Drop the journal entries a save just swapped in at filepath already holds
+
+    With position None the save holds them all and the journal is removed.
+    Otherwise the entries after position are kept, based on the new save.
+    Call with _journal_lock(filepath) held.
+    """
+    if position is None:
+        _remove_journal(filepath)
+        return
+    journal_path = _journal_path(filepath)
+    try:
+        with open(journal_path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return
+    base_line = data[:data.find(b"\n") + 1]
+    if base_line and base_line == position[0]:
+        kept = data[position[1]:]
+    else:
+        # The journal was started after the copy was taken
+        kept = data[len(base_line):]
+    if not kept:
+        _remove_journal(filepath)
+        return
+
+    temp_path = f"{journal_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(_journal_base_line(content_hash).encode() + kept)
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, journal_path)
+    except BaseException:
+        _remove_quietly(temp_path)
+        raise
+
+
+def _journal_base_line(content_hash):
+    # The random tag tells a rebased journal from the one it replaced
+    return f"base\t{content_hash.hex()}\t{os.urandom(4).hex()}\n"
+
+
+def _journal_is_stale(filepath):
+    """True if the journal of the save file at filepath does not apply to it"""
+    journal = _read_journal(_journal_path(filepath))
+    if journal is None:
+        return False
+    try:
+        with open(filepath) as save_file:
+            return journal[0] != _content_hash(save_file.read()).hex()
+    except FileNotFoundError:
+        return True
+
+
+def _append_journal(filepath, text, sync):
+    """
+    Append journal lines for the save file at filepath
+
+    A new journal starts with the hash of the save file it applies to.
+
+    Returns: (size of the journal in bytes, True if the journal is new)
+    """
+    journal_path = _journal_path(filepath)
+    with open(journal_path, "a") as f:
+        created = f.tell() == 0
+        if created:
+            with open(filepath) as save_file:
+                text = _journal_base_line(_content_hash(save_file.read())) + text
+        f.write(text)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+        size = f.tell()
+    if created and sync:
+        _sync_directory(os.path.dirname(journal_path))
+    return size, created
+
+
+def _journal_size(filepath):
+    try:
+        return os.path.getsize(_journal_path(filepath))
+    except FileNotFoundError:
+        return 0
+
+
+def _read_journal(journal_path):
+    """
+    Read a journal
+
+    A last line without a newline was cut short by a crash and is dropped.
+
+    Returns: (base hash, list of (kind, value)), or None if there is no journal
+    """
+    try:
+        with open(journal_path) as f:
+            lines = f.read().split("\n")
+    except FileNotFoundError:
+        return None
+    lines.pop()
+    if not lines:
+        return None, []
+
+    kind, _, base = lines[0].partition("\t")
+    if kind != "base":
+        raise SaveFileCorruptedError(f"Journal has no base line: {journal_path}")
+    base = base.partition("\t")[0]
+    changes = []
+    for line in lines[1:]:
+        kind, _, value = line.partition("\t")
+        value = _unescape(value)
+        if kind in ("gold", "experience"):
+            value = int(value)
+        elif kind not in JOURNAL_CHANGES:
+            raise SaveFileCorruptedError(f"Unknown journal change '{kind}' in {journal_path}")
+        changes.append((kind, value))
+    return base, changes
+
+
+def _replay_change(character, kind, value):
+    """Apply a journaled change as it was recorded (no checks: it already happened)"""
+    if kind == "gold":
+        character["gold"] = character.get("gold", 0) + value
+    elif kind == "experience":
+        _add_experience(character, value)
+    elif kind == "item":
+        _list_field(character, "inventory").append(value)
+    elif kind == "quest":
+        active = _list_field(character, "active_quests")
+        if value in active:
+            active.remove(value)
+        _list_field(character, "completed_quests").append(value)
+    else:
+        raise ValueError(f"Unknown journal change: {kind}")
+
+
+def _list_field(character, key):
+    """A list field of character, fixing up the one- and zero-item values loading gives"""
+    value = character.get(key, [])
+    if not isinstance(value, list):
+        value = [value] if value != "" else []
+        character[key] = value
+    return value
+
+
+def _remove_journal(filepath):
+    """Remove the journal of the save file at filepath, if it has one"""
+    try:
+        os.remove(_journal_path(filepath))
+    except FileNotFoundError:
+        pass
+
+
+# ============================================================================
+# CHARACTER STORE
+# ============================================================================
+
+# A save "directory" ending in one of these is a SQLite database (see
+# character_store.py) instead of a folder of text saves. The save, load,
+# list and delete functions above pass such paths on to its store.
+DATABASE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+_stores = {}  # database path → CharacterStore
+_stores_lock = threading.Lock()
+
+
+def is_database(save_directory):
+    """True if save_directory names a SQLite character database"""
+    return str(save_directory).endswith(DATABASE_SUFFIXES)
+
+
+def get_character_store(database_path):
+    """
+    Get the shared CharacterStore for a database, opening it on first use
+
+    Use it directly for what only the database can do, e.g.
+        get_character_store("data/saves.db").find_characters(min_level=10)
+
+    Returns: character_store.CharacterStore
+    """
+    store = _stores.get(database_path)
+    if store is None or store.closed:
+        # Imported here so games using text saves never load sqlite3
+        import character_store
+        with _stores_lock:
+            store = _stores.get(database_path)
+            if store is None or store.closed:
+                # A store closed with store.close() is opened again
+                store = _stores[database_path] = character_store.CharacterStore(database_path)
+    return store
+
+
+def close_character_store(database_path):
+    """Close a database's shared CharacterStore (the next use opens a new one)"""
+    with _stores_lock:
+        store = _stores.pop(database_path, None)
+    if store is not None:
+        store.close()
+
+
+# ============================================================================
+# SAVE DIRECTORY LAYOUT
+# ============================================================================
+
+# A save directory is "flat" (every save directly inside it) unless it
+# holds a layout file saying "sharded". Sharded directories spread saves
+# over two levels of hash-prefix subdirectories (256 x 256), e.g.
+#     data/save_games/3f/a2/Hero_save.txt
+# so no single directory grows past a few hundred files.
+# migrate_save_directory switches a directory between the two layouts.
+
+LAYOUT_FILE = "layout.txt"
+SAVE_LAYOUTS = ["flat", "sharded"]
+
+_layout_cache = {}  # save_directory → layout
+
+
+def get_save_layout(save_directory="data/save_games"):
+    """
+    Get the layout of a save directory
+
+    Returns: "flat" or "sharded"
+    """
+    layout = _layout_cache.get(save_directory)
+    if layout is None:
+        try:
+            with open(os.path.join(save_directory, LAYOUT_FILE)) as f:
+                layout = f.read().strip()
+        except FileNotFoundError:
+            layout = "flat"
+        if layout not in SAVE_LAYOUTS:
+            raise SaveFileCorruptedError(f"Unknown save layout '{layout}' in {save_directory}")
+        _layout_cache[save_directory] = layout
+    return layout
+
+
+def _shard_of(character_name):
+    """The two shard directory names for a character"""
+    digest = hashlib.blake2b(character_name.encode(), digest_size=2).hexdigest()
+    return digest[:2], digest[2:]
+
+
+def _is_shard_name(name):
+    return len(name) == 2 and all(c in "0123456789abcdef" for c in name)
+
+
+def iter_save_files(save_directory="data/save_games", suffix=SAVE_SUFFIX):
+    """
+    Find every save file in a save directory, in either layout
+
+    (With suffix=JOURNAL_SUFFIX, finds the journals instead.)
+
+    Yields: (character_name, filepath)
+    """
+    for entry in os.scandir(save_directory):
+        if entry.name.endswith(suffix):
+            yield entry.name[:-len(suffix)], entry.path
+        elif _is_shard_name(entry.name) and entry.is_dir():
+            for shard in os.scandir(entry.path):
+                if not (_is_shard_name(shard.name) and shard.is_dir()):
+                    continue
+                for save in os.scandir(shard.path):
+                    if save.name.endswith(suffix):
+                        yield save.name[:-len(suffix)], save.path
+
+
+def migrate_save_directory(save_directory="data/save_games", layout="sharded"):
+    """
+    Move every save into the given layout
+
+    Each save is moved with one rename, so a save is never half moved.
+    If the migration is interrupted, loading still works (see
+    find_save_file) and running it again finishes the job. Best run while
+    nothing else is saving to the directory.
+
+    Returns: Number of save files moved
+    Raises: ValueError if layout is not "flat" or "sharded"
+    """
+    if layout not in SAVE_LAYOUTS:
+        raise ValueError(f"Unknown save layout: {layout}")
+    os.makedirs(save_directory, exist_ok=True)
+
+    path_for = _sharded_save_path if layout == "sharded" else _flat_save_path
+    moved = 0
+    for name, filepath in list(iter_save_files(save_directory)):
+        target = path_for(name, save_directory)
+        if filepath == target:
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.exists(_journal_path(filepath)):
+            os.replace(_journal_path(filepath), _journal_path(target))
+        os.replace(filepath, target)
+        moved += 1
+
+    # The layout file is written last: until then the old layout is tried first
+    layout_path = os.path.join(save_directory, LAYOUT_FILE)
+    os.replace(_write_temp_file(layout_path, layout + "\n", True), layout_path)
+    _sync_directory(save_directory)
+    _layout_cache[save_directory] = layout
+
+    if layout == "flat":
+        _remove_empty_shards(save_directory)
+    rebuild_save_manifest(save_directory)
+    return moved
+
+
+def _remove_empty_shards(save_directory):
+    """Remove shard directories left empty after moving back to flat"""
+    for entry in os.scandir(save_directory):
+        if _is_shard_name(entry.name) and entry.is_dir():
+            for shard in os.scandir(entry.path):
+                if _is_shard_name(shard.name) and shard.is_dir():
+                    try:
+                        os.rmdir(shard.path)
+                    except OSError:
+                        pass  # not empty
+            try:
+                os.rmdir(entry.path)
+            except OSError:
+                pass
+
+
+# ============================================================================
+# SAVE MANIFEST
+# ============================================================================
+
+# Each save directory keeps a manifest of its saves so the "Load Game"
+# screen never has to list and open every save file. The manifest is an
+# append-only log of tab-separated lines:
+#     S  name  class  level  mtime_ns   a character was saved
+#     D  name                           a save was deleted
+#     M  directory_mtime_ns             the directory's mtime after the change
+# Saves and deletes append lines. The manifest is trusted only while the
+# last M line matches the directory's mtime; any change made without
+# updating it (e.g. a file copied in by hand) makes it be rebuilt by a scan.
+# In a sharded directory only changes at the top level show up in its
+# mtime; rebuild_save_manifest picks up files copied into shards by hand.
+
+MANIFEST_NAME = "manifest.tsv"
+
+# Rewrite the manifest when it holds more than this many stale lines
+MANIFEST_COMPACT_SLACK = 1000
+
+_MANIFEST_LINE = re.compile(rb"(?:S\t([^\t\n]*)\t[^\t\n]*\t\d+\t\d+|D\t([^\t\n]*)|M\t(\d+))\n")
+
+_manifest_lock = threading.RLock()
+_manifest_cache = {}  # save_directory → loaded manifest (see _read_manifest)
+
+
+def get_save_manifest(save_directory="data/save_games"):
+    """
+    Get every saved character's name, class and level without opening saves
+
+    Returns: Dictionary {name: {"class", "level", "mtime", "offset"}}
+             mtime is the save file's modification time (seconds) and
+             offset is where the entry's line starts in the manifest
+             (for a database: just {name: {"class", "level"}})
+    """
+    if is_database(save_directory):
+        if not os.path.exists(save_directory):
+            return {}
+        return get_character_store(save_directory).get_manifest()
+    if not os.path.isdir(save_directory):
+        return {}
+    with _manifest_lock:
+        manifest = _load_manifest(save_directory)
+        data = manifest["data"]
+        return {name: _parse_entry(data, offset) for name, offset in manifest["entries"].items()}
+
+
+def rebuild_save_manifest(save_directory="data/save_games"):
+    """
+    Rebuild the manifest by scanning every save file
+
+    Returns: Number of saves found
+    """
+    with _manifest_lock:
+        return len(_rebuild_manifest(save_directory)["entries"])
+
+
+def _manifest_path(save_directory):
+    return os.path.join(save_directory, MANIFEST_NAME)
+
+
+def _escape(value):
+    """Make a value safe to store in one tab-separated field"""
+    value = str(value)
+    if "\\" in value or "\t" in value or "\n" in value or "\r" in value:
+        value = (value.replace("\\", "\\\\").replace("\t", "\\t")
+                 .replace("\n", "\\n").replace("\r", "\\r"))
+    return value
+
+
+_ESCAPED = re.compile(r"\\(.)")
+_UNESCAPES = {"t": "\t", "n": "\n", "r": "\r"}
+
+
+def _unescape(value):
+    """Undo _escape"""
+    if "\\" not in value:
+        return value
+    return _ESCAPED.sub(lambda found: _UNESCAPES.get(found.group(1), found.group(1)), value)
+
+
+def _parse_entry(data, offset):
+    """Read the S line starting at offset in the manifest data"""
+    fields = data[offset:data.index(b"\n", offset)].decode().split("\t")
+    return {"class": _unescape(fields[2]), "level": int(fields[3]),
+            "mtime": int(fields[4]) / 1000000000, "offset": offset}
+
+
+def _load_manifest(save_directory):
+    """
+    Get the manifest, from memory if nothing has changed since it was read
+
+    Falls back to a rebuild when the manifest is missing, damaged or stale,
+    and compacts it when it has built up too many old lines.
+    """
+    directory_mtime = os.stat(save_directory).st_mtime_ns
+    try:
+        size = os.stat(_manifest_path(save_directory)).st_size
+    except FileNotFoundError:
+        return _rebuild_manifest(save_directory)
+
+    cached = _manifest_cache.get(save_directory)
+    if cached and len(cached["data"]) == size and cached["directory_mtime"] == directory_mtime:
+        return cached
+
+    manifest = _read_manifest(_manifest_path(save_directory))
+    if manifest is None or manifest["directory_mtime"] != directory_mtime:
+        return _rebuild_manifest(save_directory)
+    if manifest["lines"] > len(manifest["entries"]) + MANIFEST_COMPACT_SLACK:
+        data = manifest["data"]
+        return _write_manifest(save_directory, {name: _parse_entry(data, offset)
+                                                for name, offset in manifest["entries"].items()})
+
+    _manifest_cache[save_directory] = manifest
+    return manifest
+
+
+def _read_manifest(path):
+    """
+    Replay a manifest file
+
+    Only names and line offsets are kept; an entry's other fields are
+    read from its line when asked for.
+
+    Returns: Dictionary with "data" (the file, as a bytearray), "entries"
+             {name: offset}, "directory_mtime" and "lines", or None if the
+             file is damaged
+    """
+    try:
+        with open(path, "rb") as f:
+            data = bytearray(f.read())
+    except OSError:
+        return None
+
+    entries = {}
+    directory_mtime = None
+    lines = 0
+    end = 0
+    try:
+        for found in _MANIFEST_LINE.finditer(data):
+            # Every byte must belong to a line (a crash can leave a partial one)
+            if found.start() != end:
+                return None
+            end = found.end()
+            saved, deleted, mark = found.groups()
+            if saved is not None:
+                entries[_unescape(saved.decode())] = found.start()
+            elif deleted is not None:
+                entries.pop(_unescape(deleted.decode()), None)
+            else:
+                directory_mtime = int(mark)
+            lines += 1
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if end != len(data):
+        return None
+
+    return {"data": data, "entries": entries, "directory_mtime": directory_mtime,
+            "lines": lines}
+
+
+def _entry_line(name, character_class, level, mtime_ns):
+    return f"S\t{_escape(name)}\t{_escape(character_class)}\t{level}\t{mtime_ns}\n".encode()
+
+
+def _write_manifest(save_directory, entries):
+    """
+    Write a fresh manifest (atomically) and cache it
+
+    If the manifest cannot be written (e.g. the save directory is
+    read-only), the manifest is returned without being kept.
+
+    Args:
+        entries: Dictionary {name: {"class", "level", "mtime"}}
+    """
+    data = bytearray()
+    offsets = {}
+    for name, entry in entries.items():
+        offsets[name] = len(data)
+        data += _entry_line(name, entry["class"], entry["level"],
+                            round(entry["mtime"] * 1000000000))
+
+    path = _manifest_path(save_directory)
+    try:
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+
+        # The rename changed the directory, so its new mtime is recorded afterwards
+        directory_mtime = os.stat(save_directory).st_mtime_ns
+        mark = f"M\t{directory_mtime}\n".encode()
+        with open(path, "ab") as f:
+            f.write(mark)
+    except OSError:
+        # Listing still works; the next listing scans again
+        _remove_quietly(path + ".tmp")
+        _manifest_cache.pop(save_directory, None)
+        return {"data": data, "entries": offsets, "directory_mtime": None,
+                "lines": len(offsets)}
+    data += mark
+
+    manifest = {"data": data, "entries": offsets, "directory_mtime": directory_mtime,
+                "lines": len(offsets) + 1}
+    _manifest_cache[save_directory] = manifest
+    return manifest
+
+
+def _rebuild_manifest(save_directory):
+    """Scan the save directory and write a manifest of what is there"""
+    entries = {}
+    for name, filepath in sorted(iter_save_files(save_directory)):
+        try:
+            character_class, level = _read_class_and_level(filepath)
+            mtime = os.stat(filepath).st_mtime_ns / 1000000000
+        except OSError:
+            continue  # removed while scanning
+        entries[name] = {"class": character_class, "level": level, "mtime": mtime}
+    return _write_manifest(save_directory, entries)
+
+
+def _read_class_and_level(filepath):
+    """Read just the class and level lines of a save file"""
+    character_class, level = "", 0
+    with open(filepath, "r") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key == "class":
+                character_class = value.strip()
+            elif key == "level":
+                value = value.strip()
+                level = int(value) if value.isdigit() else 0
+    return character_class, level
+
+
+def _append_manifest(save_directory, lines):
+    """
+    Append (name, line) pairs to the manifest, then the directory's mtime
+
+    A name paired with an S line is (re)added; with a D line it is removed.
+    If there is no manifest yet, nothing is written: the first listing
+    builds it with a scan.
+    """
+    path = _manifest_path(save_directory)
+    with _manifest_lock:
+        if not os.path.exists(path):
+            _manifest_cache.pop(save_directory, None)
+            return
+
+        directory_mtime = os.stat(save_directory).st_mtime_ns
+        text = b"".join(line for _, line in lines) + f"M\t{directory_mtime}\n".encode()
+        with open(path, "ab") as f:
+            offset = f.tell()
+            f.write(text)
+
+        cached = _manifest_cache.get(save_directory)
+        if cached is None or len(cached["data"]) != offset:
+            # Someone else wrote to it; read it again next time
+            _manifest_cache.pop(save_directory, None)
+            return
+
+        entries = cached["entries"]
+        for name, line in lines:
+            if line.startswith(b"S"):
+                entries[name] = offset
+            else:
+                entries.pop(name, None)
+            offset += len(line)
+        cached["data"] += text
+        cached["lines"] += len(lines) + 1
+        cached["directory_mtime"] = directory_mtime
+
+
+def _record_saves(save_directory, characters):
+    """Add saved characters to the manifest"""
+    lines = []
+    for character in characters:
+        mtime_ns = os.stat(get_save_path(character["name"], save_directory)).st_mtime_ns
+        lines.append((character["name"],
+                      _entry_line(character["name"], character.get("class", ""),
+                                  character.get("level", 0), mtime_ns)))
+    _append_manifest(save_directory, lines)
+
+
+def _record_deletes(save_directory, names):
+    """Remove deleted characters from the manifest"""
+    _append_manifest(save_directory, [(name, f"D\t{_escape(name)}\n".encode())
+                                      for name in names])
+
+
 # ============================================================================
 # CHARACTER OPERATIONS
 # ============================================================================
@@ -274,17 +1547,77 @@ def gain_experience(character, xp_amount):
     if character["health"] == 0:
         raise CharacterDeadError("Character is dead, cannot gain experience.")
 
-# The while loop keeps leveling up the character until the experience equals the level * 100
-    character["experience"] += xp_amount
-    while character["experience"] >= character["level"] * 100:
-        level_up_xp = character["level"] * 100
-        character["experience"] -= level_up_xp
-        character["level"] += 1
-        character["max_health"] += 10
-        character["strength"] += 2
-        character["magic"] += 2
+    _add_experience(character, xp_amount)
+
+
+def _add_experience(character, xp_amount):
+    """Add experience and level up, without the dead check (used for journal replay)"""
+    levels, experience = _level_ups(character["level"], character["experience"], xp_amount)
+    character["experience"] = experience
+    if levels:
+        character["level"] += levels
+        character["max_health"] += 10 * levels
+        character["strength"] += 2 * levels
+        character["magic"] += 2 * levels
         character["health"] = character["max_health"]
 
+
+def preview_experience(character, xp_amount):
+    """
+    Work out what gain_experience would do, without changing the character
+
+    Returns: Dictionary with levels_gained and the resulting level,
+             experience, health, max_health, strength and magic
+    Raises: CharacterDeadError if character health is 0 (like gain_experience)
+    """
+    if character["health"] == 0:
+        raise CharacterDeadError("Character is dead, cannot gain experience.")
+
+    levels, experience = _level_ups(character["level"], character["experience"], xp_amount)
+    max_health = character["max_health"] + 10 * levels
+    return {
+        "levels_gained": levels,
+        "level": character["level"] + levels,
+        "experience": experience,
+        "health": max_health if levels else character["health"],
+        "max_health": max_health,
+        "strength": character["strength"] + 2 * levels,
+        "magic": character["magic"] + 2 * levels,
+    }
+
+
+def _level_ups(level, experience, xp_amount):
+    """
+    Levels gained and experience left after adding xp_amount
+
+    Going from level L to L+1 costs L * 100 experience, so k level-ups from
+    level L cost 100 * (k*L + k*(k-1)/2) in total. The largest affordable k
+    is the root of that quadratic, found with integer square roots (exact,
+    however much experience there is).
+
+    Returns: (levels gained, experience left over)
+    """
+    experience += xp_amount
+    if not (isinstance(level, int) and isinstance(experience, int)) or level < 1:
+        # Unusual values (fractional experience, level 0 or below): step one level at a time
+        levels = 0
+        while experience >= (level + levels) * 100:
+            experience -= (level + levels) * 100
+            levels += 1
+        return levels, experience
+
+    # Largest k with k*k + (2L - 1)*k <= 2 * (experience // 100)
+    budget = 2 * (experience // 100)
+    b = 2 * level - 1
+    if budget < 0:
+        return 0, experience
+    levels = (math.isqrt(b * b + 4 * budget) - b) // 2
+    while levels * levels + b * levels > budget:
+        levels -= 1
+    while (levels + 1) * (levels + 1) + b * (levels + 1) <= budget:
+        levels += 1
+    return levels, experience - 100 * (levels * level + levels * (levels - 1) // 2)
+
     
 
 def add_gold(character, amount):
@@ -381,6 +1714,128 @@ def revive_character(character):
     return True
     
 
+# ============================================================================
+# BATCH AWARDS
+# ============================================================================
+
+# Raids and event payouts award XP and gold to thousands of characters at
+# once. These apply the same rules as gain_experience and add_gold to every
+# character in one pass, using the closed-form level-up (_level_ups).
+
+# Columns award_columns reads and updates
+AWARD_COLUMNS = ["level", "experience", "health", "max_health", "strength", "magic", "gold"]
+
+
+def award_party(characters, xp_amount=0, gold_amount=0):
+    """
+    Give XP and gold to many characters at once
+
+    Args:
+        characters: List of character dictionaries (changed in place)
+        xp_amount: XP for everyone, or a list with one amount per character
+        gold_amount: Gold for everyone (may be negative), or a list per character
+
+    Each character gets both awards or neither. A character is rejected
+    (and left unchanged) if it is dead and would gain XP, or if its gold
+    would go negative. An XP amount of 0 is not an XP award, so dead
+    characters can still be paid gold.
+
+    Returns: List of (index, character name, exception) for rejected characters
+    Raises: ValueError if an amount list is not one per character
+    """
+    xp_amounts = _per_character(xp_amount, len(characters), "xp_amount")
+    gold_amounts = _per_character(gold_amount, len(characters), "gold_amount")
+
+    rejected = []
+    for i, character in enumerate(characters):
+        xp = xp_amounts[i]
+        if xp and character["health"] == 0:
+            rejected.append((i, character.get("name"), _dead_error()))
+            continue
+        current_gold = character.get("gold", 0)
+        gold = current_gold + gold_amounts[i]
+        if gold < 0:
+            rejected.append((i, character.get("name"), _gold_error(current_gold, gold_amounts[i])))
+            continue
+
+        character["gold"] = gold
+        if xp:
+            experience = character["experience"] + xp
+            if experience < character["level"] * 100:
+                # No level-up (the usual case for small awards)
+                character["experience"] = experience
+                continue
+            _add_experience(character, xp)
+    return rejected
+
+
+def award_columns(columns, xp_amount=0, gold_amount=0):
+    """
+    Give XP and gold to characters stored column by column
+
+    Args:
+        columns: Dictionary {field: list}, one list per field in
+                 AWARD_COLUMNS (plus "name", optional), all the same
+                 length; the lists are changed in place
+        xp_amount, gold_amount: As for award_party
+
+    Returns: List of (index, character name or None, exception) for rejected characters
+    Raises: ValueError if the lists are not all the same length
+    """
+    levels, experiences, healths, max_healths, strengths, magics, golds = \
+        (columns[column] for column in AWARD_COLUMNS)
+    count = len(levels)
+    if any(len(columns[column]) != count for column in AWARD_COLUMNS):
+        raise ValueError("Every award column must have one value per character")
+    names = columns.get("name") or [None] * count
+    xp_amounts = _per_character(xp_amount, count, "xp_amount")
+    gold_amounts = _per_character(gold_amount, count, "gold_amount")
+
+    rejected = []
+    for i in range(count):
+        xp = xp_amounts[i]
+        if xp and healths[i] == 0:
+            rejected.append((i, names[i], _dead_error()))
+            continue
+        gold = golds[i] + gold_amounts[i]
+        if gold < 0:
+            rejected.append((i, names[i], _gold_error(golds[i], gold_amounts[i])))
+            continue
+
+        golds[i] = gold
+        if xp:
+            experience = experiences[i] + xp
+            if experience < levels[i] * 100:
+                # No level-up (the usual case for small awards)
+                experiences[i] = experience
+                continue
+            levels_gained, experiences[i] = _level_ups(levels[i], experiences[i], xp)
+            if levels_gained:
+                levels[i] += levels_gained
+                max_healths[i] += 10 * levels_gained
+                strengths[i] += 2 * levels_gained
+                magics[i] += 2 * levels_gained
+                healths[i] = max_healths[i]
+    return rejected
+
+
+def _dead_error():
+    return CharacterDeadError("Character is dead, cannot gain experience.")
+
+
+def _gold_error(gold, amount):
+    return ValueError(f"Gold would go negative: {gold} + {amount}")
+
+
+def _per_character(amount, count, argument):
+    """An award amount as one value per character"""
+    if isinstance(amount, (list, tuple)):
+        if len(amount) != count:
+            raise ValueError(f"{argument} has {len(amount)} amounts for {count} characters")
+        return amount
+    return [amount] * count
+
+
 # ============================================================================
 # VALIDATION
 # ============================================================================
@@ -0,0 +1,410 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Character Store Module
+
+This module keeps characters in a local SQLite database instead of one
+text file per character. character_manager uses it for any save
+"directory" whose name ends in .db, .sqlite or .sqlite3:
+
+    character_manager.save_character(character, "data/saves.db")
+    character_manager.load_character("Hero", "data/saves.db")
+
+The text-file saves stay the default. The database adds indexed queries
+(find_characters and friends) and saves many characters in one
+transaction.
+
+Schema:
+    characters          one row per character, stats as typed columns
+    inventory_items     (character, position) → item_id
+    character_quests    (character, status, position) → quest_id
+    character_fields    any other field, stored as text
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from custom_exceptions import (
+    CharacterNotFoundError,
+    SaveFileCorruptedError,
+    InvalidSaveDataError
+)
+
+# Typed columns of the characters table, in save order
+STAT_FIELDS = ["name", "class", "level", "health", "max_health", "strength", "magic",
+               "experience", "gold"]
+
+# Fields kept in child tables
+LIST_FIELDS = ["inventory", "active_quests", "completed_quests"]
+
+QUEST_STATUSES = {"active_quests": "active", "completed_quests": "completed"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS characters (
+    id          INTEGER PRIMARY KEY,
+    name        TEXT NOT NULL UNIQUE,
+    class       TEXT NOT NULL,
+    level       INTEGER NOT NULL,
+    health      INTEGER NOT NULL,
+    max_health  INTEGER NOT NULL,
+    strength    INTEGER NOT NULL,
+    magic       INTEGER NOT NULL,
+    experience  INTEGER NOT NULL,
+    gold        INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS characters_by_class_level ON characters (class, level);
+CREATE INDEX IF NOT EXISTS characters_by_level ON characters (level);
+
+CREATE TABLE IF NOT EXISTS inventory_items (
+    character_id  INTEGER NOT NULL REFERENCES characters (id) ON DELETE CASCADE,
+    position      INTEGER NOT NULL,
+    item_id       TEXT NOT NULL,
+    PRIMARY KEY (character_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS inventory_by_item ON inventory_items (item_id);
+
+CREATE TABLE IF NOT EXISTS character_quests (
+    character_id  INTEGER NOT NULL REFERENCES characters (id) ON DELETE CASCADE,
+    status        TEXT NOT NULL CHECK (status IN ('active', 'completed')),
+    position      INTEGER NOT NULL,
+    quest_id      TEXT NOT NULL,
+    PRIMARY KEY (character_id, status, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS quests_by_quest ON character_quests (quest_id, status);
+
+CREATE TABLE IF NOT EXISTS character_fields (
+    character_id  INTEGER NOT NULL REFERENCES characters (id) ON DELETE CASCADE,
+    key           TEXT NOT NULL,
+    value         TEXT NOT NULL,
+    PRIMARY KEY (character_id, key)
+) WITHOUT ROWID;
+"""
+
+_UPSERT = (
+    f"INSERT INTO characters ({', '.join(STAT_FIELDS)}) "
+    f"VALUES ({', '.join('?' * len(STAT_FIELDS))}) "
+    f"ON CONFLICT (name) DO UPDATE SET "
+    f"{', '.join(f'{field} = excluded.{field}' for field in STAT_FIELDS[1:])} "
+    f"RETURNING id"
+)
+
+# ============================================================================
+# CHARACTER STORE
+# ============================================================================
+
+class CharacterStore:
+    """
+    Characters in one SQLite database, with a small connection pool
+
+    Safe to use from many threads: each call borrows a connection from the
+    pool (up to pool_size of them) and gives it back when done. The
+    database runs in WAL mode, so loads do not wait for saves.
+
+    Once closed, every call raises RuntimeError.
+    """
+
+    def __init__(self, path, pool_size=4):
+        """
+        Args:
+            path: Database file (created if missing)
+            pool_size: Most connections open at once
+        """
+        self.path = path
+        self.pool_size = pool_size
+        self.closed = False
+        self._condition = threading.Condition()
+        self._idle = []    # open connections not in use
+        self._opened = 0   # open connections, in use or idle
+
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+
+    def save_character(self, character, sync=True):
+        """
+        Save (insert or replace) one character
+
+        Returns: True
+        Raises: InvalidSaveDataError if a stat field is missing or not a number
+        """
+        self.save_characters([character], sync)
+        return True
+
+    def save_characters(self, characters, sync=True):
+        """
+        Save many characters in one transaction (all or none are saved)
+
+        Returns: Number of characters saved
+        Raises: InvalidSaveDataError if a stat field is missing or not a number
+        """
+        rows = [_character_row(character) for character in characters]
+
+        with self._transaction(sync) as connection:
+            ids = [connection.execute(_UPSERT, stats).fetchone()[0] for stats, _, _, _ in rows]
+            id_params = [(character_id,) for character_id in ids]
+            for table in ("inventory_items", "character_quests", "character_fields"):
+                connection.executemany(f"DELETE FROM {table} WHERE character_id = ?", id_params)
+
+            connection.executemany(
+                "INSERT INTO inventory_items (character_id, position, item_id) VALUES (?, ?, ?)",
+                [(character_id, position, item_id)
+                 for character_id, (_, items, _, _) in zip(ids, rows)
+                 for position, item_id in enumerate(items)])
+            connection.executemany(
+                "INSERT INTO character_quests (character_id, status, position, quest_id) "
+                "VALUES (?, ?, ?, ?)",
+                [(character_id, status, position, quest_id)
+                 for character_id, (_, _, quests, _) in zip(ids, rows)
+                 for status, quest_ids in quests
+                 for position, quest_id in enumerate(quest_ids)])
+            connection.executemany(
+                "INSERT INTO character_fields (character_id, key, value) VALUES (?, ?, ?)",
+                [(character_id, key, value)
+                 for character_id, (_, _, _, fields) in zip(ids, rows)
+                 for key, value in fields])
+        return len(rows)
+
+    def load_character(self, character_name):
+        """
+        Load one character
+
+        Returns: Character dictionary (list fields are always lists)
+        Raises:
+            CharacterNotFoundError if there is no such character
+            SaveFileCorruptedError if the database cannot be read
+        """
+        try:
+            with self._connection() as connection:
+                row = connection.execute(
+                    f"SELECT id, {', '.join(STAT_FIELDS)} FROM characters WHERE name = ?",
+                    (character_name,)).fetchone()
+                if row is None:
+                    raise CharacterNotFoundError(f"Save not found for: {character_name}")
+
+                character_id = row[0]
+                character = dict(zip(STAT_FIELDS, row[1:]))
+                character["inventory"] = [item_id for (item_id,) in connection.execute(
+                    "SELECT item_id FROM inventory_items WHERE character_id = ? "
+                    "ORDER BY position", (character_id,))]
+                character["active_quests"] = []
+                character["completed_quests"] = []
+                for status, quest_id in connection.execute(
+                        "SELECT status, quest_id FROM character_quests WHERE character_id = ? "
+                        "ORDER BY status, position", (character_id,)):
+                    character[f"{status}_quests"].append(quest_id)
+                for key, value in connection.execute(
+                        "SELECT key, value FROM character_fields WHERE character_id = ?",
+                        (character_id,)):
+                    character[key] = _parse_field(value)
+        except sqlite3.DatabaseError as e:
+            raise SaveFileCorruptedError(f"Could not read {character_name} from {self.path}: {e}")
+        return character
+
+    def list_saved_characters(self):
+        """Returns: List of character names, in the order they were first saved"""
+        with self._connection() as connection:
+            return [name for (name,) in connection.execute(
+                "SELECT name FROM characters ORDER BY id")]
+
+    def delete_character(self, character_name):
+        """
+        Delete one character
+
+        Returns: True
+        Raises: CharacterNotFoundError if there is no such character
+        """
+        with self._transaction(True) as connection:
+            deleted = connection.execute("DELETE FROM characters WHERE name = ?",
+                                         (character_name,)).rowcount
+        if not deleted:
+            raise CharacterNotFoundError(f"Character {character_name} was not found.")
+        return True
+
+    def get_manifest(self):
+        """Returns: Dictionary {name: {"class", "level"}} (like get_save_manifest)"""
+        with self._connection() as connection:
+            return {name: {"class": character_class, "level": level}
+                    for name, character_class, level in connection.execute(
+                        "SELECT name, class, level FROM characters ORDER BY id")}
+
+    # ------------------------------------------------------------------------
+    # Indexed queries
+    # ------------------------------------------------------------------------
+
+    def find_characters(self, character_class=None, min_level=None, max_level=None):
+        """
+        Find characters by class and level range (any argument may be left out)
+
+        Returns: List of character names, lowest level first
+        """
+        conditions = []
+        params = []
+        if character_class is not None:
+            conditions.append("class = ?")
+            params.append(character_class)
+        if min_level is not None:
+            conditions.append("level >= ?")
+            params.append(min_level)
+        if max_level is not None:
+            conditions.append("level <= ?")
+            params.append(max_level)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._connection() as connection:
+            return [name for (name,) in connection.execute(
+                f"SELECT name FROM characters {where} ORDER BY level, id", params)]
+
+    def find_characters_with_item(self, item_id):
+        """Returns: Names of the characters carrying item_id"""
+        with self._connection() as connection:
+            return [name for (name,) in connection.execute(
+                "SELECT name FROM characters WHERE id IN "
+                "(SELECT character_id FROM inventory_items WHERE item_id = ?) ORDER BY id",
+                (item_id,))]
+
+    def find_characters_by_quest(self, quest_id, status="completed"):
+        """
+        Args:
+            status: "active" or "completed"
+
+        Returns: Names of the characters with quest_id in that state
+        """
+        with self._connection() as connection:
+            return [name for (name,) in connection.execute(
+                "SELECT name FROM characters WHERE id IN "
+                "(SELECT character_id FROM character_quests WHERE quest_id = ? AND status = ?) "
+                "ORDER BY id", (quest_id, status))]
+
+    def close(self):
+        """
+        Close the store: idle connections now, ones in use when they are given back
+
+        Calls waiting for a connection raise RuntimeError.
+        """
+        with self._condition:
+            self.closed = True
+            idle, self._idle = self._idle, []
+            self._opened -= len(idle)
+            self._condition.notify_all()
+        for connection in idle:
+            connection.close()
+
+    # ------------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------------
+
+    @contextmanager
+    def _connection(self):
+        """Borrow a connection from the pool"""
+        connection = self._borrow()
+        try:
+            yield connection
+        finally:
+            self._give_back(connection)
+
+    @contextmanager
+    def _transaction(self, sync):
+        """Borrow a connection and run the block in one write transaction"""
+        with self._connection() as connection:
+            # Without sync, a power cut may lose the last transactions (never corrupts)
+            connection.execute(f"PRAGMA synchronous = {'FULL' if sync else 'OFF'}")
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def _borrow(self):
+        """Take an idle connection, open a new one, or wait for one to be given back"""
+        with self._condition:
+            while True:
+                if self.closed:
+                    raise RuntimeError(f"Character store {self.path} is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._opened < self.pool_size:
+                    self._opened += 1
+                    break
+                self._condition.wait()
+
+        try:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA foreign_keys = ON")
+        except BaseException:
+            with self._condition:
+                self._opened -= 1
+                self._condition.notify()
+            raise
+        return connection
+
+    def _give_back(self, connection):
+        with self._condition:
+            if not self.closed:
+                self._idle.append(connection)
+                self._condition.notify()
+                return
+            self._opened -= 1
+        connection.close()
+
+
+# ============================================================================
+# HELPERS
+# ============================================================================
+
+def _character_row(character):
+    """
+    Split a character into its table rows
+
+    Returns: (stat values, inventory, [(status, quest ids)], [(key, text)])
+    Raises: InvalidSaveDataError if a stat field is missing or has the wrong type
+    """
+    stats = []
+    for field in STAT_FIELDS:
+        if field not in character:
+            raise InvalidSaveDataError(f"Missing required field: {field}")
+        value = character[field]
+        if field in ("name", "class"):
+            value = str(value)
+        elif isinstance(value, bool) or not isinstance(value, int):
+            raise InvalidSaveDataError(f"Field '{field}' must be of type int")
+        stats.append(value)
+
+    quests = [(status, _as_list(character.get(field, [])))
+              for field, status in QUEST_STATUSES.items()]
+    fields = [(key, ",".join(value) if isinstance(value, list) else str(value))
+              for key, value in character.items()
+              if key not in STAT_FIELDS and key not in LIST_FIELDS]
+    return stats, _as_list(character.get("inventory", [])), quests, fields
+
+
+def _as_list(value):
+    """A list field as a list (text saves load one item as a string and none as "")"""
+    if isinstance(value, list):
+        return value
+    return [value] if value != "" else []
+
+
+def _parse_field(value):
+    """Turn a stored field back into a value, the way load_character does"""
+    if "," in value:
+        return value.split(",")
+    if value.isdigit():
+        return int(value)
+    return value
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    print("=== CHARACTER STORE TEST ===")
+
+    # import character_manager
+    # store = CharacterStore("test_saves.db")
+    # store.save_character(character_manager.create_character("StoreTest", "Mage"))
+    # print(store.load_character("StoreTest"))
+    # print(store.find_characters(character_class="Mage", min_level=1))
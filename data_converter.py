@@ -0,0 +1,132 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Data Converter Module
+
+This module converts quest and item files between the "KEY: value" block
+format (quests.txt, items.txt) and JSON Lines (quests.jsonl, items.jsonl).
+Records are validated by the game_data loaders while converting, so a
+converted file always loads.
+
+Usage:
+    python data_converter.py data/quests.txt              # writes data/quests.jsonl
+    python data_converter.py data/items.jsonl             # writes data/items.txt
+    python data_converter.py in.txt out.jsonl --type item
+"""
+
+import os
+import json
+import argparse
+
+import game_data
+from custom_exceptions import InvalidDataFormatError
+
+RECORD_ITERATORS = {"quest": game_data.iter_quests, "item": game_data.iter_items}
+
+# ============================================================================
+# CONVERTING
+# ============================================================================
+
+def guess_record_type(filename):
+    """
+    Work out whether a data file holds quests or items from its name
+
+    Returns: "quest" or "item"
+    Raises: ValueError if the name does not say
+    """
+    name = os.path.basename(filename).lower()
+    if "quest" in name:
+        return "quest"
+    if "item" in name:
+        return "item"
+    raise ValueError(f"Cannot tell whether {filename} holds quests or items; pass record_type")
+
+
+def record_fields(record):
+    """
+    The fields of a loaded record that belong in a data file
+
+    Quest/Item records list them in _fields (an Item's parsed effect_stat
+    and effect_value are worked out again on load). Records with extra
+    fields are plain dictionaries and keep every key.
+    """
+    keys = getattr(record, "_fields", None) or list(record)
+    return {key: record[key] for key in keys}
+
+
+def record_to_jsonl(record):
+    """Format one loaded record as a JSON Lines line (without the newline)"""
+    return json.dumps(record_fields(record), ensure_ascii=False)
+
+
+def record_to_block(record):
+    """
+    Format one loaded record as a "KEY: value" block (without the blank line)
+
+    Raises: InvalidDataFormatError if a value cannot be written on one line
+    """
+    lines = []
+    for key, value in record_fields(record).items():
+        value = str(value)
+        if "\n" in value or "\r" in value:
+            raise InvalidDataFormatError(f"Field '{key}' has a line break and cannot be "
+                                         f"written in the block format")
+        lines.append(f"{key.upper()}: {value}\n")
+    return "".join(lines)
+
+
+def convert_data_file(source, destination=None, record_type=None):
+    """
+    Convert a quest or item file between block format and JSON Lines
+
+    The direction comes from the source extension: .jsonl files become
+    block files, anything else becomes JSON Lines. The destination is
+    written to a temporary file first, so a failed conversion never leaves
+    a half-written file behind.
+
+    Args:
+        source: File to read
+        destination: File to write (default: source with the other extension)
+        record_type: "quest" or "item" (default: guessed from the file name)
+
+    Returns: Number of records converted
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    record_type = record_type or guess_record_type(source)
+    to_jsonl = not game_data.is_jsonl(source)
+    if destination is None:
+        destination = os.path.splitext(source)[0] + (".jsonl" if to_jsonl else ".txt")
+
+    records = RECORD_ITERATORS[record_type](source)
+    temp_path = f"{destination}.{os.getpid()}.tmp"
+    count = 0
+    try:
+        with open(temp_path, "w") as f:
+            for record in records:
+                if to_jsonl:
+                    f.write(record_to_jsonl(record) + "\n")
+                else:
+                    if count:
+                        f.write("\n")
+                    f.write(record_to_block(record))
+                count += 1
+        os.replace(temp_path, destination)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return count
+
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert quest/item files between KEY: value blocks and JSON Lines")
+    parser.add_argument("source")
+    parser.add_argument("destination", nargs="?")
+    parser.add_argument("--type", choices=list(RECORD_ITERATORS), dest="record_type")
+    args = parser.parse_args()
+
+    converted = convert_data_file(args.source, args.destination, args.record_type)
+    print(f"Converted {converted} records from {args.source}")
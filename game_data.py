@@ -12,6 +12,15 @@ This module handles loading and validating game data from text files.
 """
 
 import os
+import re
+import mmap
+import glob
+import json
+import hashlib
+import pickle
+import threading
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping
 from custom_exceptions import (
     InvalidDataFormatError,
     MissingDataFileError,
@@ -24,7 +33,7 @@ from custom_exceptions import (
 
 # AI Usage: Used AI (ChatGPT) to help structure/finish functions if I had errors or if I didn't have the correct formatting
 
-def load_quests(filename="data/quests.txt"):
+def load_quests(filename="data/quests.txt", use_cache=True):
     """
     Load quest data from file
     
@@ -37,56 +46,31 @@ def load_quests(filename="data/quests.txt"):
     REQUIRED_LEVEL: 1
     PREREQUISITE: previous_quest_id (or NONE)
     
-    Returns: Dictionary of quests {quest_id: quest_data_dict}
-    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
-    """
+    A filename ending in .jsonl is read as JSON Lines instead: one JSON
+    object per line with the lowercase field names, e.g.
+    {"quest_id": "first_steps", "title": "First Steps", ..., "prerequisite": "NONE"}
 
+    If use_cache is True, a compiled copy of the parsed quests is kept in
+    data/.cache/ and reused while quests.txt is unchanged.
 
-    import os
+    Returns: Dictionary of quests {quest_id: Quest} (a QuestCatalog)
+             (Quest records are read exactly like quest dictionaries)
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
 
     if not os.path.exists(filename):
         raise MissingDataFileError(f"Quest file not found: {filename}")
 
-    quests = {}
-    try:
-        with open(filename, "r") as f:
-            lines = f.read().splitlines()
-
-        current_quest = {}
-        for line in lines + [""]:
-            line = line.strip()
-            if line == "":
-                if current_quest:
-                    required_fields = ["QUEST_ID", "TITLE", "DESCRIPTION",
-                                       "REWARD_XP", "REWARD_GOLD", "REQUIRED_LEVEL", "PREREQUISITE"]
-                    for field in required_fields:
-                        if field not in current_quest:
-                            raise InvalidDataFormatError(f"Missing field '{field}' in quest")
-                    quest_id = current_quest["QUEST_ID"]
-                    # Normalize keys to lowercase (should match test case calls)
-                    normalized_quest = {k.lower(): v for k, v in current_quest.items()}
-                    quests[quest_id] = normalized_quest
-                    current_quest = {}
-                continue
+    if not use_cache:
+        return _parse_quest_file(filename)
+    return _load_with_cache(filename, _parse_quest_file)
 
-            if ": " not in line:
-                raise InvalidDataFormatError(f"Invalid line format: {line}") # Custom exception for Invalid data formats
-
-            key, value = line.split(": ", 1)
-            key = key.strip()
-            value = value.strip()
-            if key in ["REWARD_XP", "REWARD_GOLD", "REQUIRED_LEVEL"]:
-                try:
-                    value = int(value)
-                except ValueError:
-                    raise InvalidDataFormatError(f"Expected integer for {key}, got '{value}'")
-            current_quest[key] = value
-
-    except InvalidDataFormatError:
-        raise
-    except Exception as e:
-        raise CorruptedDataError(f"Could not read quest file: {e}")
 
+def _parse_quest_file(filename):
+    """Parse quests.txt into a QuestCatalog dictionary (no cache)"""
+    quests = QuestCatalog()
+    for quest in iter_quests(filename):
+        quests[quest["quest_id"]] = quest
     return quests
 
     # TODO: Implement this function
@@ -96,7 +80,7 @@ def load_quests(filename="data/quests.txt"):
     # - Corrupted/unreadable data → raise CorruptedDataError
     
 
-def load_items(filename="data/items.txt"):
+def load_items(filename="data/items.txt", use_cache=True):
     """
     Load item data from file
     
@@ -108,59 +92,987 @@ def load_items(filename="data/items.txt"):
     COST: 100
     DESCRIPTION: Item description
     
-    Returns: Dictionary of items {item_id: item_data_dict}
+    A filename ending in .jsonl is read as JSON Lines instead (one JSON
+    object per line with the lowercase field names).
+
+    If use_cache is True, a compiled copy of the parsed items is kept in
+    data/.cache/ and reused while items.txt is unchanged.
+
+    Returns: Dictionary of items {item_id: Item} (an ItemCatalog)
+             (Item records are read exactly like item dictionaries)
     Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
     """
     # TODO: Implement this function
     # Must handle same exceptions as load_quests
 
-    import os
-
     if not os.path.exists(filename):
         raise MissingDataFileError(f"Item file not found: {filename}")
 
-    items = {}
+    if not use_cache:
+        return _parse_item_file(filename)
+    return _load_with_cache(filename, _parse_item_file)
+
+
+def _parse_item_file(filename):
+    """Parse items.txt into an ItemCatalog dictionary (no cache)"""
+    items = ItemCatalog()
+    for item in iter_items(filename):
+        items[item["item_id"]] = item
+    return items
+
+
+# ============================================================================
+# RECORD TYPES
+# ============================================================================
+
+class GameRecord(Mapping):
+    """
+    Base class for compact, read-only quest and item records
+
+    Each field is stored in a __slots__ attribute instead of a per-record
+    dictionary, which saves a lot of memory on big catalogs. Records still
+    behave like the old dictionaries: record["title"], record.get("cost"),
+    "reward_xp" in record, record.items() and record == {...} all work.
+
+    _fields lists the values passed to the constructor (the fields in the
+    data file); only they are iterated and counted, so a record equals its
+    data-file dictionary. A subclass may add more slots that it works out
+    itself; those can be read by key or attribute but are not iterated.
+    """
+
+    __slots__ = ()
+    _fields = ()
+    _field_set = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "_fields" not in cls.__dict__:
+            cls._fields = cls.__slots__
+        cls._field_set = frozenset(cls.__slots__)
+
+    def __init__(self, *values):
+        if len(values) != len(self._fields):
+            raise TypeError(f"{type(self).__name__} expects {len(self._fields)} values")
+        for name, value in zip(self._fields, values):
+            setattr(self, name, value)
+
+    def __getitem__(self, key):
+        if key in self._field_set:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._field_set
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+    def __reduce__(self):
+        # Pickle as (class, values) so cache files stay small
+        return (type(self), tuple(getattr(self, name) for name in self._fields))
+
+
+class Quest(GameRecord):
+    """A quest loaded from quests.txt"""
+    __slots__ = ("quest_id", "title", "description",
+                 "reward_xp", "reward_gold", "required_level", "prerequisite")
+
+
+class Item(GameRecord):
+    """
+    An item loaded from items.txt
+
+    The EFFECT string is parsed once here, so using or equipping the item
+    can read effect_stat and effect_value without splitting the string.
+    (They are read by key or attribute only: dict(item) has the six file fields.)
+    """
+    _fields = ("item_id", "name", "type", "effect", "cost", "description")
+    __slots__ = _fields + ("effect_stat", "effect_value")
+
+    def __init__(self, *values):
+        super().__init__(*values)
+        self.effect_stat, self.effect_value = parse_effect(self.effect)
+
+
+# Stats an item EFFECT may change
+VALID_EFFECT_STATS = ["health", "max_health", "strength", "magic"]
+
+
+def parse_effect(effect_string):
+    """
+    Parse and check an item EFFECT string
+
+    Example: "health:20" → ("health", 20)
+
+    Returns: Tuple of (stat_name, value)
+    Raises: ValueError if the format is wrong or the stat is unknown
+    """
+    stat, separator, value = effect_string.partition(":")
+    stat = stat.strip()
+    if not separator:
+        raise ValueError(f"Invalid effect '{effect_string}' (expected stat:value)")
+    if stat not in VALID_EFFECT_STATS:
+        raise ValueError(f"Unknown effect stat '{stat}'. Must be one of {VALID_EFFECT_STATS}")
     try:
-        with open(filename, "r") as f:
-            lines = f.read().splitlines()
-
-        current_item = {}
-        for line in lines + [""]:
-            line = line.strip()
-            if line == "":
-                if current_item:
-                    required_fields = ["ITEM_ID", "NAME", "TYPE", "EFFECT", "COST", "DESCRIPTION"]
-                    for field in required_fields:
-                        if field not in current_item:
-                            raise InvalidDataFormatError(f"Missing field '{field}' in item")
-                    item_id = current_item["ITEM_ID"]
-                    # Normalize keys to lowercase
-                    normalized_item = {k.lower(): v for k, v in current_item.items()}
-                    items[item_id] = normalized_item
-                    current_item = {}
+        return stat, int(value)
+    except ValueError:
+        raise ValueError(f"Expected integer effect value, got '{value}'")
+
+
+# ============================================================================
+# CATALOG INDEXES
+# ============================================================================
+
+class IndexedCatalog(dict):
+    """
+    Dictionary of records that also keeps lookup indexes
+
+    Indexes are built the first time a query needs them and thrown away
+    whenever the dictionary is changed (e.g. by DataReloader), so they
+    never go stale. Subclasses fill in _build_indexes().
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._indexes = None
+
+    @property
+    def indexes(self):
+        """The current indexes, built on first use"""
+        if self._indexes is None:
+            self._indexes = self._build_indexes()
+        return self._indexes
+
+    def _build_indexes(self):
+        raise NotImplementedError
+
+    def _positions(self):
+        """record ID → position in the catalog (to keep results in file order)"""
+        return {record_id: position for position, record_id in enumerate(self)}
+
+    def _in_catalog_order(self, record_ids):
+        position = self.indexes["position"]
+        return sorted(record_ids, key=position.__getitem__)
+
+    def __reduce__(self):
+        # Pickle only the records; indexes are rebuilt when needed
+        return (type(self), (dict(self),))
+
+    # Every way of changing the dictionary drops the indexes
+    def __setitem__(self, key, value):
+        self._indexes = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        self._indexes = None
+        super().__delitem__(key)
+
+    def __ior__(self, other):
+        self._indexes = None
+        return super().__ior__(other)
+
+    def update(self, *args, **kwargs):
+        self._indexes = None
+        super().update(*args, **kwargs)
+
+    def setdefault(self, key, default=None):
+        self._indexes = None
+        return super().setdefault(key, default)
+
+    def pop(self, *args):
+        self._indexes = None
+        return super().pop(*args)
+
+    def popitem(self):
+        self._indexes = None
+        return super().popitem()
+
+    def clear(self):
+        self._indexes = None
+        super().clear()
+
+
+class QuestCatalog(IndexedCatalog):
+    """
+    Quest dictionary {quest_id: quest} with indexes by level and prerequisite
+
+    Indexes:
+        levels        sorted list of the required levels in use
+        by_level      required_level → [quest_id, ...]
+        root_levels   sorted levels of quests with no prerequisite
+        roots         required_level → [quest_id, ...] with no prerequisite
+        unlocks       quest_id → [quest_ids that list it as prerequisite]
+        position      quest_id → position in the catalog
+    """
+
+    def _build_indexes(self):
+        by_level = {}
+        roots = {}
+        unlocks = {}
+        for quest_id, quest in self.items():
+            level = quest.get("required_level", 1)
+            prerequisite = quest.get("prerequisite", "NONE")
+            by_level.setdefault(level, []).append(quest_id)
+            if prerequisite == "NONE":
+                roots.setdefault(level, []).append(quest_id)
+            else:
+                unlocks.setdefault(prerequisite, []).append(quest_id)
+
+        return {
+            "levels": sorted(by_level),
+            "by_level": by_level,
+            "root_levels": sorted(roots),
+            "roots": roots,
+            "unlocks": unlocks,
+            "position": self._positions(),
+        }
+
+    def quest_ids_by_level(self, min_level, max_level):
+        """IDs of quests whose required_level is between min and max (inclusive)"""
+        indexes = self.indexes
+        levels = indexes["levels"]
+        found = []
+        for level in levels[bisect_left(levels, min_level):bisect_right(levels, max_level)]:
+            found.extend(indexes["by_level"][level])
+        return self._in_catalog_order(found)
+
+    def quests_unlocked_by(self, quest_id):
+        """IDs of quests that have quest_id as their prerequisite"""
+        return list(self.indexes["unlocks"].get(quest_id, []))
+
+    def available_quest_ids(self, level, completed_quests, active_quests):
+        """
+        IDs of quests a character can accept (same rules as get_available_quests)
+
+        Only quests with no prerequisite, or whose prerequisite is in
+        completed_quests, are looked at. The quest lists may also be a
+        single quest ID or "" (how load_character loads one or no quests).
+        """
+        indexes = self.indexes
+        completed = set(_quest_id_list(completed_quests))
+        active = set(_quest_id_list(active_quests))
+
+        candidates = []
+        root_levels = indexes["root_levels"]
+        for root_level in root_levels[:bisect_right(root_levels, level)]:
+            candidates.extend(indexes["roots"][root_level])
+        for quest_id in completed:
+            candidates.extend(indexes["unlocks"].get(quest_id, []))
+
+        available = set()
+        for quest_id in candidates:
+            if quest_id in completed or quest_id in active:
                 continue
+            if self[quest_id].get("required_level", 1) <= level:
+                available.add(quest_id)
+        return self._in_catalog_order(available)
+
+
+def _quest_id_list(quest_ids):
+    """A character's quest list as a list (a saved one-quest list loads as a bare string)"""
+    if isinstance(quest_ids, str):
+        return [quest_ids] if quest_ids else []
+    return quest_ids
+
+
+class ItemCatalog(IndexedCatalog):
+    """
+    Item dictionary {item_id: item} with indexes by type and cost
+
+    Indexes:
+        by_type       type → [item_id, ...]
+        costs         every item's cost, sorted
+        ids_by_cost   item IDs in the same order as costs
+        position      item_id → position in the catalog
+    """
+
+    def _build_indexes(self):
+        by_type = {}
+        for item_id, item in self.items():
+            by_type.setdefault(item.get("type"), []).append(item_id)
+
+        ids_by_cost = sorted(self, key=lambda item_id: self[item_id].get("cost", 0))
+        return {
+            "by_type": by_type,
+            "costs": [self[item_id].get("cost", 0) for item_id in ids_by_cost],
+            "ids_by_cost": ids_by_cost,
+            "position": self._positions(),
+        }
+
+    def item_ids_by_type(self, item_type):
+        """IDs of every item of one type, in catalog order"""
+        return list(self.indexes["by_type"].get(item_type, []))
+
+    def item_ids_by_cost(self, min_cost=None, max_cost=None):
+        """IDs of items costing between min_cost and max_cost, cheapest first"""
+        indexes = self.indexes
+        costs = indexes["costs"]
+        start = 0 if min_cost is None else bisect_left(costs, min_cost)
+        end = len(costs) if max_cost is None else bisect_right(costs, max_cost)
+        return indexes["ids_by_cost"][start:end]
+
+
+# ============================================================================
+# STREAMING LOADERS
+# ============================================================================
 
-            if ": " not in line:
-                raise InvalidDataFormatError(f"Invalid line format: {line}")
+# Fields every record must have, and the fields stored as integers
+QUEST_FIELDS = ["QUEST_ID", "TITLE", "DESCRIPTION",
+                "REWARD_XP", "REWARD_GOLD", "REQUIRED_LEVEL", "PREREQUISITE"]
+QUEST_INT_FIELDS = ["REWARD_XP", "REWARD_GOLD", "REQUIRED_LEVEL"]
 
-            key, value = line.split(": ", 1)
+ITEM_FIELDS = ["ITEM_ID", "NAME", "TYPE", "EFFECT", "COST", "DESCRIPTION"]
+ITEM_INT_FIELDS = ["COST"]
+
+VALID_ITEM_TYPES = ["weapon", "armor", "consumable"]
+
+
+class RecordSchema:
+    """
+    Compiled description of one kind of record (quest or item)
+
+    The schema is built once and then shared by the loaders, the lazy
+    catalog, the hot reloader and the validators, so they all apply
+    exactly the same rules:
+    - every line must be "KEY: value"
+    - integer fields must hold whole numbers
+    - every required field must be present
+    - fields with a fixed set of values (like an item's TYPE) must use one
+
+    Errors are either raised straight away (InvalidDataFormatError) or,
+    when an errors list is passed in, collected as (line_number, message)
+    so a whole file can be checked in one run.
+    """
+
+    def __init__(self, record_name, record_class, fields, int_fields=(), choices=None,
+                 checks=None):
+        self.record_name = record_name
+        self.record_class = record_class
+        self.fields = tuple(fields)
+        self._field_set = frozenset(self.fields)
+        self.id_field = self.fields[0]
+        self.id_key = self.id_field.lower()
+        self.int_fields = frozenset(int_fields)
+        self.choices = dict(choices or {})
+        # Lowercase field name → function that raises ValueError for a bad value
+        self.checks = dict(checks or {})
+        # Lowercase field name → expected Python type (for loaded records)
+        self.types = {field.lower(): (int if field in self.int_fields else str)
+                      for field in self.fields}
+        # Lowercase keys in field order, and their expected types, for JSON records
+        self.keys = tuple(self.types)
+        self._key_types = tuple(self.types.values())
+        self._choice_positions = [(self.keys.index(field.lower()), frozenset(allowed))
+                                  for field, allowed in self.choices.items()]
+
+    def parse_block(self, numbered_lines, errors=None):
+        """
+        Parse one block into a record
+
+        Args:
+            numbered_lines: List of (line_number, stripped_line) pairs.
+                            line_number may be None if it is not known.
+            errors: Optional list. If given, problems are appended to it as
+                    (line_number, message) instead of being raised.
+
+        Returns: The record, or None if errors were collected for it
+        Raises: InvalidDataFormatError (only when errors is None)
+        """
+        block_line = numbered_lines[0][0] if numbered_lines else None
+        error_count = len(errors) if errors is not None else 0
+        int_fields = self.int_fields
+
+        fields = {}
+        for line_number, line in numbered_lines:
+            # Each line must be "KEY: value"
+            key, separator, value = line.partition(": ")
+            if not separator:
+                self._report(errors, line_number, f"Invalid line format: {line}")
+                continue
             key = key.strip()
             value = value.strip()
-            if key == "COST":
+            if key in int_fields:
                 try:
                     value = int(value)
                 except ValueError:
-                    raise InvalidDataFormatError(f"Expected integer for COST, got '{value}'")
-            current_item[key] = value
+                    # Still counts as present, so it is not also reported missing
+                    self._report(errors, line_number,
+                                 f"Expected integer for {key}, got '{value}'")
+            fields[key] = value
+
+        return self._finish(fields, block_line, errors, error_count)
+
+    def parse_json(self, line_number, text, errors=None):
+        """
+        Parse one JSON Lines record into a record
+
+        The JSON object uses the lowercase field names of the loaded
+        records; integer fields must be JSON numbers and the other
+        standard fields JSON strings.
+
+        Returns: The record, or None if errors were collected for it
+        Raises: InvalidDataFormatError (only when errors is None)
+        """
+        try:
+            data = json.loads(text)
+        except ValueError as e:
+            self._report(errors, line_number, f"Invalid JSON: {e}")
+            return None
+        return self.parse_json_object(line_number, data, errors)
+
+    def parse_json_object(self, line_number, data, errors=None):
+        """Same as parse_json, for a line that has already been decoded"""
+        if not isinstance(data, dict):
+            self._report(errors, line_number, f"Expected a JSON object for each {self.record_name}")
+            return None
+
+        # Fast path: exactly the standard keys, in order, with the right types
+        if tuple(data) == self.keys:
+            values = tuple(data.values())
+            if tuple(map(type, values)) == self._key_types:
+                for position, allowed in self._choice_positions:
+                    if values[position] not in allowed:
+                        break
+                else:
+                    try:
+                        return self.record_class(*values)
+                    except ValueError:
+                        pass  # Reported with its line number by the full check below
+
+        error_count = len(errors) if errors is not None else 0
+        fields = {}
+        for key, value in data.items():
+            key = key.upper()
+            if key in self.int_fields:
+                # bool is a subclass of int, but true/false are not numbers here
+                if type(value) is not int:
+                    self._report(errors, line_number,
+                                 f"Expected integer for {key}, got {json.dumps(value)}")
+            elif key in self._field_set and not isinstance(value, str):
+                self._report(errors, line_number,
+                             f"Expected text for {key}, got {json.dumps(value)}")
+            fields[key] = value
+
+        return self._finish(fields, line_number, errors, error_count)
+
+    def _finish(self, fields, block_line, errors, error_count):
+        """Check required fields and allowed values, then build the record"""
+        if not self._field_set <= fields.keys():
+            for field in self.fields:
+                if field not in fields:
+                    self._report(errors, block_line,
+                                 f"Missing field '{field}' in {self.record_name}")
+
+        for field, allowed in self.choices.items():
+            if field in fields and fields[field] not in allowed:
+                self._report(errors, block_line,
+                             f"Invalid {field} '{fields[field]}' in {self.record_name}. "
+                             f"Must be one of {allowed}")
+
+        if errors is not None and len(errors) > error_count:
+            return None
+        try:
+            return self.build(fields)
+        except ValueError as e:
+            # Raised by field checks done while building (e.g. an item EFFECT)
+            self._report(errors, block_line, f"{e} in {self.record_name}")
+            return None
+
+    def build(self, fields):
+        """
+        Build a record from checked fields
+
+        Blocks with exactly the standard fields become Quest/Item records.
+        Blocks with extra fields keep them all in a plain dictionary instead.
+        """
+        if len(fields) == len(self.fields):
+            return self.record_class(*[fields[field] for field in self.fields])
+
+        # Normalize keys to lowercase (should match test case calls)
+        record = {k.lower(): v for k, v in fields.items()}
+        for key, check in self.checks.items():
+            check(record[key])
+        return record
+
+    def record_errors(self, record):
+        """Return a list of every problem with an already-loaded record"""
+        problems = []
+        for key, expected_type in self.types.items():
+            if key not in record:
+                problems.append(f"Missing required field: {key}")
+            elif not isinstance(record[key], expected_type):
+                problems.append(f"Field '{key}' must be of type {expected_type.__name__}")
+
+        for field, allowed in self.choices.items():
+            key = field.lower()
+            if key in record and record[key] not in allowed:
+                problems.append(f"Invalid {key}: {record[key]}. Must be one of {allowed}")
+
+        for key, check in self.checks.items():
+            if isinstance(record.get(key), str):
+                try:
+                    check(record[key])
+                except ValueError as e:
+                    problems.append(str(e))
+        return problems
+
+    def _report(self, errors, line_number, message):
+        """Raise the problem, or collect it if an errors list was given"""
+        if errors is None:
+            if line_number is not None:
+                message = f"Line {line_number}: {message}"
+            raise InvalidDataFormatError(message)
+        errors.append((line_number, message))
+
+
+QUEST_SCHEMA = RecordSchema("quest", Quest, QUEST_FIELDS, QUEST_INT_FIELDS)
+ITEM_SCHEMA = RecordSchema("item", Item, ITEM_FIELDS, ITEM_INT_FIELDS,
+                           choices={"TYPE": VALID_ITEM_TYPES},
+                           checks={"effect": parse_effect})
+
+# record type name → schema
+_SCHEMAS = {"quest": QUEST_SCHEMA, "item": ITEM_SCHEMA}
+
+
+def iter_quests(filename="data/quests.txt"):
+    """
+    Stream quests from file one at a time
+
+    Same format and validation as load_quests, but only one quest block is
+    held in memory at a time, so very large files can be processed.
+
+    Returns: Iterator of Quest records (dictionary-like)
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    if not os.path.exists(filename):
+        raise MissingDataFileError(f"Quest file not found: {filename}")
+    return _iter_records(filename, QUEST_SCHEMA)
+
+
+def iter_items(filename="data/items.txt"):
+    """
+    Stream items from file one at a time
+
+    Same format and validation as load_items, but only one item block is
+    held in memory at a time, so very large files can be processed.
+
+    Returns: Iterator of Item records (dictionary-like)
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    if not os.path.exists(filename):
+        raise MissingDataFileError(f"Item file not found: {filename}")
+    return _iter_records(filename, ITEM_SCHEMA)
+
+
+def _iter_records(filename, schema):
+    """Generator shared by iter_quests and iter_items"""
+    try:
+        with open(filename, "r") as f:
+            for _, record in _iter_parsed(f, schema, is_jsonl(filename)):
+                yield record
 
     except InvalidDataFormatError:
         raise
     except Exception as e:
-        raise CorruptedDataError(f"Could not read item file: {e}")
+        raise CorruptedDataError(f"Could not read {schema.record_name} file: {e}")
 
-    return items
 
-    
+def is_jsonl(filename):
+    """True if filename is a JSON Lines data file"""
+    return filename.endswith(".jsonl")
+
+
+def _iter_parsed(f, schema, jsonl, errors=None):
+    """
+    Parse every record in an open data file
+
+    Yields: (line_number, record) for each block or JSON line. The record
+            is None if it had errors and an errors list was given.
+    """
+    if jsonl:
+        for numbered_lines in _iter_json_chunks(f):
+            # Decode the whole chunk in one call; one bad line means each
+            # line is decoded again on its own to report where it is
+            try:
+                decoded = json.loads("[" + ",".join(line for _, line in numbered_lines) + "]")
+            except ValueError:
+                decoded = None
+            # A line like "1, 2" would decode as two values and shift the rest
+            if decoded is not None and len(decoded) != len(numbered_lines):
+                decoded = None
+            for position, (line_number, line) in enumerate(numbered_lines):
+                if decoded is None:
+                    record = schema.parse_json(line_number, line, errors)
+                else:
+                    record = schema.parse_json_object(line_number, decoded[position], errors)
+                yield line_number, record
+    else:
+        for numbered_lines in _iter_blocks(f):
+            yield numbered_lines[0][0], schema.parse_block(numbered_lines, errors)
+
+
+def _iter_json_chunks(lines, chunk_size=1000):
+    """
+    Group the non-blank lines of a JSON Lines file into chunks
+
+    Yields: List of up to chunk_size (line_number, stripped_line) pairs
+    """
+    chunk = []
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line:
+            chunk.append((line_number, line))
+            if len(chunk) == chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def _iter_blocks(lines):
+    """
+    Group lines into blocks separated by blank lines
+
+    Yields: List of (line_number, stripped_line) for each block
+    """
+    block = []
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if line:
+            block.append((line_number, line))
+        elif block:
+            yield block
+            block = []
+
+    # The last block may not be followed by a blank line
+    if block:
+        yield block
+
+
+# ============================================================================
+# WHOLE-FILE VALIDATION
+# ============================================================================
+
+def validate_quest_file(filename="data/quests.txt"):
+    """
+    Check every quest in a file and report all problems at once
+
+    Besides the loader's checks this also reports duplicate quest IDs and
+    prerequisites that name a quest not in the file.
+
+    Returns: List of (line_number, message) tuples (empty if the file is valid)
+    Raises: MissingDataFileError, CorruptedDataError
+    """
+    return _validate_file(filename, QUEST_SCHEMA)
+
+
+def validate_item_file(filename="data/items.txt"):
+    """
+    Check every item in a file and report all problems at once
+
+    Besides the loader's checks this also reports duplicate item IDs.
+
+    Returns: List of (line_number, message) tuples (empty if the file is valid)
+    Raises: MissingDataFileError, CorruptedDataError
+    """
+    return _validate_file(filename, ITEM_SCHEMA)
+
+
+def _validate_file(filename, schema):
+    """Single pass over a data file collecting every error"""
+    if not os.path.exists(filename):
+        raise MissingDataFileError(f"{schema.record_name.capitalize()} file not found: {filename}")
+
+    errors = []
+    first_seen = {}      # record ID → line it was first defined on
+    prerequisites = []   # (line_number, prerequisite) to check at the end
+
+    try:
+        with open(filename, "r") as f:
+            for block_line, record in _iter_parsed(f, schema, is_jsonl(filename), errors):
+                if record is None:
+                    continue
+
+                record_id = record[schema.id_key]
+                if record_id in first_seen:
+                    errors.append((block_line,
+                                   f"Duplicate {schema.record_name} ID '{record_id}' "
+                                   f"(first defined on line {first_seen[record_id]})"))
+                else:
+                    first_seen[record_id] = block_line
+
+                if "prerequisite" in record:
+                    prerequisites.append((block_line, record["prerequisite"]))
+    except OSError as e:
+        raise CorruptedDataError(f"Could not read {schema.record_name} file: {e}")
+    except UnicodeDecodeError as e:
+        raise CorruptedDataError(f"Could not read {schema.record_name} file: {e}")
+
+    for block_line, prerequisite in prerequisites:
+        if prerequisite != "NONE" and prerequisite not in first_seen:
+            errors.append((block_line, f"Unknown prerequisite '{prerequisite}'"))
+
+    errors.sort(key=lambda error: error[0] or 0)
+    return errors
+
+
+# ============================================================================
+# SHARDED CATALOGS
+# ============================================================================
+
+QUEST_SHARD_DIRECTORY = "data/quests.d"
+ITEM_SHARD_DIRECTORY = "data/items.d"
+QUEST_JSONL_FILE = "data/quests.jsonl"
+ITEM_JSONL_FILE = "data/items.jsonl"
+
+
+def load_quest_shards(directory=QUEST_SHARD_DIRECTORY, max_workers=None):
+    """
+    Load every *.txt quest file in a directory, in parallel
+
+    Each shard uses the same format as quests.txt. Shards are parsed in
+    separate processes and merged into one dictionary.
+
+    Returns: Dictionary of quests {quest_id: quest_data_dict}
+    Raises:
+        MissingDataFileError if the directory does not exist
+        InvalidDataFormatError if a shard is invalid or an ID is in two shards
+        CorruptedDataError if a shard cannot be read
+    """
+    return _load_shards(directory, load_quests, "quest", max_workers, QuestCatalog)
+
+
+def load_item_shards(directory=ITEM_SHARD_DIRECTORY, max_workers=None):
+    """
+    Load every *.txt item file in a directory, in parallel
+
+    Same rules as load_quest_shards, using the items.txt format.
+
+    Returns: Dictionary of items {item_id: item_data_dict}
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+    return _load_shards(directory, load_items, "item", max_workers, ItemCatalog)
+
+
+def load_quest_catalog(filename="data/quests.txt", shard_directory=QUEST_SHARD_DIRECTORY,
+                       jsonl_filename=QUEST_JSONL_FILE):
+    """
+    Load the quest shard directory if there is one, otherwise the quest
+    file (quests.jsonl is used over quests.txt when it exists)
+    """
+    if os.path.isdir(shard_directory):
+        return load_quest_shards(shard_directory)
+    return load_quests(catalog_file(filename, jsonl_filename))
+
+
+def load_item_catalog(filename="data/items.txt", shard_directory=ITEM_SHARD_DIRECTORY,
+                      jsonl_filename=ITEM_JSONL_FILE):
+    """
+    Load the item shard directory if there is one, otherwise the item
+    file (items.jsonl is used over items.txt when it exists)
+    """
+    if os.path.isdir(shard_directory):
+        return load_item_shards(shard_directory)
+    return load_items(catalog_file(filename, jsonl_filename))
+
+
+def catalog_file(filename, jsonl_filename):
+    """The single file a catalog is read from: the JSONL file if it exists"""
+    if jsonl_filename and os.path.exists(jsonl_filename):
+        return jsonl_filename
+    return filename
+
+
+def _load_shards(directory, loader, record_name, max_workers, catalog_class):
+    """Run loader over each shard file (in a process pool) and merge the results"""
+    if not os.path.isdir(directory):
+        raise MissingDataFileError(f"{record_name.capitalize()} shard directory not found: {directory}")
+
+    shard_files = sorted(glob.glob(os.path.join(directory, "*.txt"))
+                         + glob.glob(os.path.join(directory, "*.jsonl")))
+
+    # A pool is only worth starting when there is more than one shard
+    if len(shard_files) <= 1 or max_workers == 1:
+        results = [loader(shard) for shard in shard_files]
+    else:
+        # Imported here: concurrent.futures is slow to import and only needed for shards
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        # Workers are never forked from this process: it may be running other
+        # threads (e.g. main.py's background loader), and a fork can deadlock
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        # (The fork server may have been started from another working directory)
+        paths = [os.path.abspath(shard) for shard in shard_files]
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+            results = list(pool.map(loader, paths))
+
+    merged = catalog_class()
+    owners = {}  # record_id → shard file it came from
+    for shard, records in zip(shard_files, results):
+        for record_id, record in records.items():
+            if record_id in merged:
+                raise InvalidDataFormatError(
+                    f"Duplicate {record_name} ID '{record_id}' in {owners[record_id]} and {shard}"
+                )
+            merged[record_id] = record
+            owners[record_id] = shard
+    return merged
+
+
+# ============================================================================
+# LAZY CATALOGS
+# ============================================================================
+
+# A block is a run of non-blank lines; blocks are separated by blank lines
+_BLOCK_PATTERN = re.compile(rb"(?:^[ \t\r\f\v]*\S.*(?:\n|\Z))+", re.MULTILINE)
+# In JSON Lines files every non-blank line is one record
+_JSONL_LINE_PATTERN = re.compile(rb"^[ \t\r\f\v]*\S.*(?:\n|\Z)", re.MULTILINE)
+
+
+class LazyCatalog(Mapping):
+    """
+    Read-only {id: record} mapping over a memory-mapped data file
+
+    Opening the catalog makes one quick pass over the file to find where
+    each block starts and ends. A block is only parsed the first time its
+    ID is looked up, and the parsed record is kept for later lookups.
+
+    Works anywhere a quest or item dictionary is expected, e.g.
+        quests = LazyCatalog("data/quests.txt", "quest")
+        quest_handler.accept_quest(character, "first_steps", quests)
+
+    Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+    """
+
+    def __init__(self, filename, record_type="quest"):
+        if record_type not in _SCHEMAS:
+            raise ValueError(f"Unknown record type: {record_type}")
+        if not os.path.exists(filename):
+            raise MissingDataFileError(f"{record_type.capitalize()} file not found: {filename}")
+
+        self.filename = filename
+        self.record_type = record_type
+        self._schema = _SCHEMAS[record_type]
+        self._jsonl = is_jsonl(filename)
+        self._id_pattern = re.compile(
+            rb"^[ \t]*" + self._schema.id_field.encode() + rb": (.*?)[ \t\r]*$", re.MULTILINE
+        )
+        self._file = None
+        self._data = b""
+        self._index = {}   # record_id → (offset, length)
+        self._records = {}  # record_id → parsed record
+
+        try:
+            self._file = open(filename, "rb")
+            if os.fstat(self._file.fileno()).st_size > 0:
+                self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._build_index()
+        except InvalidDataFormatError:
+            self.close()
+            raise
+        except Exception as e:
+            self.close()
+            raise CorruptedDataError(f"Could not read {record_type} file: {e}")
+
+    def _build_index(self):
+        """Record the byte offset and length of every block by its ID"""
+        if self._jsonl:
+            self._build_jsonl_index()
+            return
+
+        data = self._data
+        id_prefix = self._schema.id_field.encode() + b": "
+        for block in _BLOCK_PATTERN.finditer(data):
+            start, end = block.span()
+            # Fast path: the ID is normally the first line of the block
+            if data[start:start + len(id_prefix)] == id_prefix:
+                line_end = data.find(b"\n", start, end)
+                if line_end == -1:
+                    line_end = end
+                record_id = data[start + len(id_prefix):line_end]
+            else:
+                found = self._id_pattern.search(data, start, end)
+                if found is None:
+                    raise InvalidDataFormatError(
+                        f"Missing field '{self._schema.id_field}' in {self.record_type}"
+                    )
+                record_id = found.group(1)
+            self._index[record_id.strip().decode()] = (start, end - start)
+
+    def _build_jsonl_index(self):
+        """Record the byte offset and length of every JSON line by its ID"""
+        data = self._data
+        id_key = self._schema.id_key
+        # Fast path: converted files start each line with {"quest_id": "...
+        # (an ID with any JSON escape in it is decoded by json.loads instead)
+        id_prefix = b'{"' + id_key.encode() + b'": "'
+        for line in _JSONL_LINE_PATTERN.finditer(data):
+            start, end = line.span()
+            id_end = data.find(b'"', start + len(id_prefix), end)
+            if data[start:start + len(id_prefix)] == id_prefix and id_end != -1 \
+                    and data.find(b"\\", start + len(id_prefix), id_end) == -1:
+                record_id = data[start + len(id_prefix):id_end].decode()
+            else:
+                try:
+                    record_id = json.loads(data[start:end])[id_key]
+                except (ValueError, TypeError, KeyError):
+                    raise InvalidDataFormatError(
+                        f"Missing or unreadable '{id_key}' in {self.record_type} "
+                        f"at byte {start}"
+                    )
+            self._index[record_id] = (start, end - start)
+
+    def __getitem__(self, record_id):
+        record = self._records.get(record_id)
+        if record is not None:
+            return record
+
+        offset, length = self._index[record_id]  # KeyError if unknown ID
+        try:
+            text = self._data[offset:offset + length].decode()
+        except Exception as e:
+            raise CorruptedDataError(f"Could not read {self.record_type} '{record_id}': {e}")
+
+        if self._jsonl:
+            record = self._schema.parse_json(None, text)
+        else:
+            numbered_lines = [(None, line.strip()) for line in text.splitlines() if line.strip()]
+            record = self._schema.parse_block(numbered_lines)
+        self._records[record_id] = record
+        return record
+
+    def __contains__(self, record_id):
+        # Checked against the index so membership tests never parse a block
+        return record_id in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def close(self):
+        """Release the memory map and file handle"""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._data = b""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
 
 def validate_quest_data(quest_dict):
     """
@@ -170,27 +1082,13 @@ def validate_quest_data(quest_dict):
                     reward_gold, required_level, prerequisite
     
     Returns: True if valid
-    Raises: InvalidDataFormatError if missing required fields
+    Raises: InvalidDataFormatError listing every missing or mistyped field
     """
-    
-    required_fields = {
-        "quest_id": str, 
-        "title": str, 
-        "description": str, 
-        "reward_xp": int, 
-        "reward_gold": int, 
-        "required_level": int, 
-        "prerequisite": str
-    }
-    # Loops through fields & checks if they're in the quest dictionary
-    for key, expected_type in required_fields.items():
-        # Raises InvalidDataFormatError if the key is not in the quest dictionary
-        if key not in quest_dict:
-            raise InvalidDataFormatError(f"Missing required field(s): {key}")
-        # Also raises InvalidDataFormatError if the key does not match its expected type
-        if not isinstance(quest_dict[key], expected_type):
-            raise InvalidDataFormatError(f"Field {key} should be this type: {expected_type.__name__}")
-            
+
+    # Uses the same compiled schema as the quest loader
+    problems = QUEST_SCHEMA.record_errors(quest_dict)
+    if problems:
+        raise InvalidDataFormatError("; ".join(problems))
     return True
     
     # TODO: Implement validation
@@ -206,31 +1104,13 @@ def validate_item_data(item_dict):
     Valid types: weapon, armor, consumable
     
     Returns: True if valid
-    Raises: InvalidDataFormatError if missing required fields or invalid type
-    """
-    required_fields = {
-        "item_id": str,
-        "name": str,
-        "type": str,
-        "effect": str,
-        "cost": int,
-        "description": str,
-    }
-
-    valid_types = ["weapon", "armor", "consumable"]
-
-    for field, expected_type in required_fields.items():
-        if field not in item_dict:
-            raise InvalidDataFormatError(f"Missing required field: {field}")
-
-        # Check type
-        if not isinstance(item_dict[field], expected_type):
-            raise InvalidDataFormatError(f"Field '{field}' must be of type {expected_type.__name__}")
-
-    # Check item type validity
-    if item_dict["type"] not in valid_types:
-        raise InvalidDataFormatError(f"Invalid item type: {item_dict['type']}. Must be one of {valid_types}")
+    Raises: InvalidDataFormatError listing every missing/mistyped field or invalid type
+    """
 
+    # Uses the same compiled schema as the item loader
+    problems = ITEM_SCHEMA.record_errors(item_dict)
+    if problems:
+        raise InvalidDataFormatError("; ".join(problems))
     return True
 
 
@@ -348,7 +1228,232 @@ def parse_item_block(lines):
     return item
 
     # TODO: Implement parsing logic
-    
+
+
+# ============================================================================
+# COMPILED DATA CACHE
+# ============================================================================
+
+# Parsed catalogs are pickled into a ".cache" folder next to the text file.
+# Bump CACHE_VERSION whenever the shape of the parsed records changes so old
+# cache files are ignored instead of loaded.
+CACHE_DIRECTORY_NAME = ".cache"
+CACHE_VERSION = 5
+
+
+def get_cache_path(filename):
+    """
+    Get the path of the compiled cache file for a data file
+
+    Example: "data/quests.txt" → "data/.cache/quests.txt.pickle"
+    """
+    directory = os.path.dirname(filename)
+    return os.path.join(directory, CACHE_DIRECTORY_NAME,
+                        os.path.basename(filename) + ".pickle")
+
+
+def _hash_file(filename):
+    """Return the sha256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    try:
+        with open(filename, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    except OSError as e:
+        raise CorruptedDataError(f"Could not read data file: {e}")
+    return digest.hexdigest()
+
+
+def _read_cache(cache_path):
+    """Return the cached entry dictionary, or None if missing/unusable"""
+    try:
+        with open(cache_path, "rb") as f:
+            entry = pickle.load(f)
+    except Exception:
+        # A missing, truncated or outdated cache just means we parse again
+        return None
+
+    if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION:
+        return None
+    return entry
+
+
+def _write_cache(cache_path, file_stat, file_hash, records):
+    """Write a cache entry (silently skipped if the folder is not writable)"""
+    entry = {
+        "version": CACHE_VERSION,
+        "size": file_stat.st_size,
+        "mtime_ns": file_stat.st_mtime_ns,
+        "sha256": file_hash,
+        "records": records,
+    }
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(temp_path, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # Replace in one step so other readers never see half a cache file
+        os.replace(temp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def _load_with_cache(filename, parser):
+    """
+    Load a data file through its compiled cache
+
+    The cache is used when the file size and mtime still match. If only the
+    mtime changed (e.g. after a git checkout) the content hash decides.
+    Otherwise the text file is parsed with parser(filename) and the cache
+    is rewritten.
+    """
+    file_stat = os.stat(filename)
+    cache_path = get_cache_path(filename)
+    entry = _read_cache(cache_path)
+
+    file_hash = None
+    if entry is not None and entry["size"] == file_stat.st_size:
+        if entry["mtime_ns"] == file_stat.st_mtime_ns:
+            return entry["records"]
+
+        file_hash = _hash_file(filename)
+        if entry["sha256"] == file_hash:
+            _write_cache(cache_path, file_stat, file_hash, entry["records"])
+            return entry["records"]
+
+    if file_hash is None:
+        file_hash = _hash_file(filename)
+    records = parser(filename)
+    _write_cache(cache_path, file_stat, file_hash, records)
+    return records
+
+
+# ============================================================================
+# HOT RELOAD
+# ============================================================================
+
+class DataReloader:
+    """
+    Keep a loaded catalog up to date while its data file is being edited
+
+    reload_if_changed() checks the file's mtime. When it has changed, only
+    blocks whose contents are new (by hash) are parsed, and the catalog
+    dictionary is updated in place, so everything holding a reference to
+    it sees the new records.
+
+    Example:
+        all_items = load_items("data/items.txt")
+        reloader = DataReloader("data/items.txt", "item", all_items)
+        ...
+        reloader.reload_if_changed()
+
+    Call it from the thread that uses the catalog (or hold reloader.lock),
+    since the dictionary is changed in place.
+    """
+
+    def __init__(self, filename, record_type, catalog):
+        if record_type not in _SCHEMAS:
+            raise ValueError(f"Unknown record type: {record_type}")
+        self.filename = filename
+        self.record_type = record_type
+        self.catalog = catalog
+        self.lock = threading.Lock()
+        self._schema = _SCHEMAS[record_type]
+        self._jsonl = is_jsonl(filename)
+        self._signature = self._file_signature()
+        # block hash → record ID; None until the first reload has hashed the file
+        self._block_ids = None
+
+    def _file_signature(self):
+        """(mtime, size) of the data file, or None if it is missing"""
+        try:
+            file_stat = os.stat(self.filename)
+        except OSError:
+            return None
+        return (file_stat.st_mtime_ns, file_stat.st_size)
+
+    def reload_if_changed(self):
+        """
+        Apply any changes made to the data file since the last check
+
+        If a changed block is invalid, nothing is applied and the error is
+        raised; the file is checked again after its next edit.
+
+        Returns: None if the file is unchanged, otherwise a dictionary
+                 {"added": [...], "updated": [...], "removed": [...]} of IDs
+        Raises: MissingDataFileError, InvalidDataFormatError, CorruptedDataError
+        """
+        signature = self._file_signature()
+        if signature == self._signature:
+            return None
+        if signature is None:
+            raise MissingDataFileError(f"Data file not found: {self.filename}")
+
+        with self.lock:
+            self._signature = signature
+            new_block_ids, changed = self._read_changed_blocks()
+
+            # Work out every change first, then apply them all together
+            present = set(new_block_ids.values())
+            added = [rid for rid in changed if rid not in self.catalog]
+            updated = [rid for rid in changed
+                       if rid in self.catalog and self.catalog[rid] != changed[rid]]
+            removed = [rid for rid in self.catalog if rid not in present]
+
+            for record_id in added + updated:
+                self.catalog[record_id] = changed[record_id]
+            for record_id in removed:
+                del self.catalog[record_id]
+
+            self._block_ids = new_block_ids
+
+        return {"added": added, "updated": updated, "removed": removed}
+
+    def _read_changed_blocks(self):
+        """Hash every block and parse the ones not seen before"""
+        old_block_ids = self._block_ids or {}
+
+        try:
+            with open(self.filename, "rb") as f:
+                data = f.read()
+        except OSError as e:
+            raise CorruptedDataError(f"Could not read {self.record_type} file: {e}")
+
+        new_block_ids = {}
+        changed = {}
+        line_number, counted_to = 1, 0
+        pattern = _JSONL_LINE_PATTERN if self._jsonl else _BLOCK_PATTERN
+        for block in pattern.finditer(data):
+            text = block.group()
+            block_hash = hashlib.blake2b(text, digest_size=16).digest()
+            if block_hash in old_block_ids:
+                new_block_ids[block_hash] = old_block_ids[block_hash]
+                continue
+
+            try:
+                text = text.decode()
+            except UnicodeDecodeError as e:
+                raise CorruptedDataError(f"Could not read {self.record_type} file: {e}")
+
+            # Line numbers (for error messages) are only counted for changed blocks
+            line_number += data.count(b"\n", counted_to, block.start())
+            counted_to = block.start()
+
+            if self._jsonl:
+                record = self._schema.parse_json(line_number, text)
+            else:
+                numbered_lines = [(line_number + i, line.strip())
+                                  for i, line in enumerate(text.splitlines())]
+                record = self._schema.parse_block(numbered_lines)
+            record_id = record[self._schema.id_key]
+            new_block_ids[block_hash] = record_id
+            changed[record_id] = record
+
+        return new_block_ids, changed
+
 
 # ============================================================================
 # TESTING
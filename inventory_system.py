@@ -10,6 +10,7 @@ AI Usage: [Document any AI assistance used]
 This module handles inventory management, item usage, and equipment.
 """
 
+from functools import lru_cache
 from custom_exceptions import (
     InventoryFullError,
     ItemNotFoundError,
@@ -174,9 +175,8 @@ def use_item(character, item_id, item_data):
     if item_data["type"] != "consumable":
         raise InvalidItemTypeError("Item type cannot be used")
 
-    # Parse effect such as "health:20"
-    stat, value = item_data["effect"].split(":")
-    value = int(value)
+    # Effect such as "health:20" (already parsed for items from game_data)
+    stat, value = get_item_effect(item_data)
 
     character[stat] = min(character.get("max_" + stat, float('inf')), character[stat] + value)
 
@@ -227,8 +227,7 @@ def equip_weapon(character, item_id, item_data):
     # Apply weapon effects (example: "strength:5")
     effect = item_data.get("effect")
     if effect:
-        stat, value = effect.split(":")
-        value = int(value)
+        stat, value = get_item_effect(item_data)
         if stat in character:
             character[stat] += value
 
@@ -280,15 +279,15 @@ def equip_armor(character, item_id, item_data):
     if character.get("equipped_armor"):
         old_armor = character["equipped_armor"]
         old_data = item_data[old_armor]
-        stat, value = old_data["effect"].split(":")
-        character[stat] -= int(value)
+        stat, value = get_item_effect(old_data)
+        character[stat] -= value
 
         # Return old armor to inventory
         character["inventory"].append(old_armor)
 
     # Apply new armor effect
-    stat, value = item["effect"].split(":")
-    character[stat] += int(value)
+    stat, value = get_item_effect(item)
+    character[stat] += value
 
     # Set equipped armor
     character["equipped_armor"] = item_id
@@ -320,8 +319,8 @@ def unequip_weapon(character, item_data):
         raise InventoryFullError("Inventory is full")
 
     weapon_data = item_data[equipped]
-    stat, value = weapon_data["effect"].split(":")
-    character[stat] -= int(value)  # remove stat bonus
+    stat, value = get_item_effect(weapon_data)
+    character[stat] -= value  # remove stat bonus
 
     # Return weapon to inventory
     character["inventory"].append(equipped)
@@ -355,8 +354,8 @@ def unequip_armor(character, item_data):
         raise InventoryFullError("Inventory is full")
 
     armor_data = item_data[equipped]
-    stat, value = armor_data["effect"].split(":")
-    character[stat] -= int(value)
+    stat, value = get_item_effect(armor_data)
+    character[stat] -= value
 
     character["inventory"].append(equipped)
     character["equipped_armor"] = None
@@ -454,6 +453,7 @@ def sell_item(character, item_id, item_data):
 # HELPER FUNCTIONS
 # ============================================================================
 
+@lru_cache(maxsize=1024)
 def parse_item_effect(effect_string):
     """
     Parse item effect string into stat name and value
@@ -463,6 +463,8 @@ def parse_item_effect(effect_string):
     
     Returns: Tuple of (stat_name, value)
     Example: "health:20" → ("health", 20)
+
+    Results are cached, since the same few effect strings come up again and again.
     """
     stat, value = effect_string.split(":")
     return stat, int(value)
@@ -472,6 +474,20 @@ def parse_item_effect(effect_string):
     # Convert value to integer
     
 
+def get_item_effect(item_data):
+    """
+    Get an item's effect as (stat_name, value)
+
+    Items loaded by game_data already carry effect_stat/effect_value, so no
+    string parsing happens. Plain item dictionaries fall back to parsing
+    the "effect" string.
+    """
+    stat = item_data.get("effect_stat")
+    if stat is not None:
+        return stat, item_data["effect_value"]
+    return parse_item_effect(item_data["effect"])
+    
+
 def apply_stat_effect(character, stat_name, value):
     """
     Apply a stat modification to character
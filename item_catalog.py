@@ -0,0 +1,135 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Item Catalog Module
+
+This module builds a column-based view of the item data so the shop and
+balance tools can answer queries without looping over every item dictionary.
+"""
+
+from array import array
+from bisect import bisect_right
+from inventory_system import get_item_effect
+
+# Item types are stored as small integer codes in the type column
+ITEM_TYPES = ["weapon", "armor", "consumable"]
+TYPE_CODES = {item_type: code for code, item_type in enumerate(ITEM_TYPES)}
+UNKNOWN_TYPE = -1
+
+# ============================================================================
+# COLUMNAR VIEW
+# ============================================================================
+
+class ItemColumns:
+    """
+    Column-based copy of an item dictionary
+
+    Instead of one dictionary per item, each field is kept in its own flat
+    column (position i in every column belongs to the same item):
+        item_ids       list of item IDs
+        costs          array of costs
+        type_codes     array of TYPE_CODES values
+        effect_stats   list of effect stat names ("strength", "health", ...)
+        effect_values  array of effect values
+
+    Positions are also pre-sorted by cost, so price-limited queries only
+    look at the items the player can afford.
+    """
+
+    def __init__(self, item_data_dict):
+        self.item_ids = []
+        self.costs = array("q")
+        self.type_codes = array("b")
+        self.effect_stats = []
+        self.effect_values = array("q")
+
+        for item_id, item in item_data_dict.items():
+            stat, value = get_item_effect(item)
+            self.item_ids.append(item_id)
+            self.costs.append(item["cost"])
+            self.type_codes.append(TYPE_CODES.get(item["type"], UNKNOWN_TYPE))
+            self.effect_stats.append(stat)
+            self.effect_values.append(value)
+
+        # Positions ordered by cost, and the matching costs for bisect
+        self.by_cost = sorted(range(len(self.item_ids)), key=self.costs.__getitem__)
+        self.sorted_costs = array("q", [self.costs[i] for i in self.by_cost])
+
+    def __len__(self):
+        return len(self.item_ids)
+
+    def _positions_up_to(self, max_cost):
+        """Positions of every item costing max_cost or less"""
+        return self.by_cost[:bisect_right(self.sorted_costs, max_cost)]
+
+    def items_under_cost(self, item_type, max_cost, stat=None):
+        """
+        Get items of a type costing at most max_cost, best bonus first
+
+        Args:
+            item_type: "weapon", "armor" or "consumable"
+            max_cost: Highest price to include
+            stat: If given, only items whose effect raises this stat
+
+        Example: all weapons under 200 gold sorted by strength bonus
+            columns.items_under_cost("weapon", 200, "strength")
+
+        Returns: List of item IDs, highest effect value first
+        """
+        code = TYPE_CODES.get(item_type, UNKNOWN_TYPE)
+        type_codes = self.type_codes
+        effect_stats = self.effect_stats
+
+        matches = [i for i in self._positions_up_to(max_cost)
+                   if type_codes[i] == code
+                   and (stat is None or effect_stats[i] == stat)]
+        matches.sort(key=self.effect_values.__getitem__, reverse=True)
+        return [self.item_ids[i] for i in matches]
+
+    def best_value(self, item_type, stat=None):
+        """
+        Get the item giving the most effect per gold
+
+        Example: best consumable per gold
+            columns.best_value("consumable", "health")
+
+        Returns: Item ID, or None if no item matches
+        """
+        code = TYPE_CODES.get(item_type, UNKNOWN_TYPE)
+        best_position = None
+        best_ratio = 0
+
+        for i, (item_code, cost, effect_stat, value) in enumerate(
+                zip(self.type_codes, self.costs, self.effect_stats, self.effect_values)):
+            if item_code != code or cost <= 0:
+                continue
+            if stat is not None and effect_stat != stat:
+                continue
+            ratio = value / cost
+            if best_position is None or ratio > best_ratio:
+                best_position, best_ratio = i, ratio
+
+        if best_position is None:
+            return None
+        return self.item_ids[best_position]
+
+
+def build_item_columns(item_data_dict):
+    """
+    Build the columnar view of the output of game_data.load_items()
+
+    Returns: ItemColumns
+    """
+    return ItemColumns(item_data_dict)
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    print("=== ITEM CATALOG TEST ===")
+
+    # import game_data
+    # columns = build_item_columns(game_data.load_items())
+    # print(columns.items_under_cost("weapon", 200, "strength"))
+    # print(columns.best_value("consumable", "health"))
@@ -0,0 +1,145 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Journal Compactor Module
+
+This module folds character journals (see character_manager.record_changes)
+back into their save files in the background, so journals stay small and
+loading a character never has many changes to replay.
+
+Example:
+    compactor = JournalCompactor()
+    size = character_manager.record_change(character, "gold", 50)
+    if size > character_manager.JOURNAL_COMPACT_BYTES:
+        compactor.request()          # compact soon instead of at the next interval
+    ...
+    compactor.close()
+"""
+
+import threading
+
+import character_manager
+
+# ============================================================================
+# BACKGROUND JOURNAL COMPACTION
+# ============================================================================
+
+class JournalCompactor:
+    """
+    Background thread that runs character_manager.compact_journals
+
+    It runs every interval seconds, and straight away when request() is
+    called. Errors are counted and kept (last_error), never raised.
+    """
+
+    def __init__(self, save_directory="data/save_games",
+                 threshold=character_manager.JOURNAL_COMPACT_BYTES, interval=60.0, sync=True):
+        """
+        Args:
+            save_directory: Where the saves and journals are
+            threshold: Journals bigger than this many bytes are compacted
+            interval: Seconds between compaction passes
+            sync: fsync the new save files
+        """
+        self.save_directory = save_directory
+        self.threshold = threshold
+        self.interval = interval
+        self.sync = sync
+
+        self._condition = threading.Condition()
+        self._requested = False
+        self._running = False
+        self._closed = False
+
+        self._passes = 0
+        self._compacted = 0
+        self._failed = 0
+        self.last_error = None
+
+        self._thread = threading.Thread(target=self._run, name="journal-compactor", daemon=True)
+        self._thread.start()
+
+    def request(self):
+        """Ask for a compaction pass now"""
+        with self._condition:
+            self._requested = True
+            self._condition.notify_all()
+
+    def wait_idle(self, timeout=None):
+        """
+        Wait until no pass is requested or running
+
+        Returns: True if idle, False if timeout ran out first
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._requested and not self._running,
+                                            timeout)
+
+    def close(self, timeout=None):
+        """
+        Stop the compactor thread (a pass already running is finished)
+
+        Returns: True if the thread stopped before timeout
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def metrics(self):
+        """
+        Get compaction numbers
+
+        Returns: Dictionary with:
+            passes     compaction passes run
+            compacted  journals folded into their saves
+            failed     passes stopped by an error
+        """
+        with self._condition:
+            return {"passes": self._passes, "compacted": self._compacted, "failed": self._failed}
+
+    def _run(self):
+        """Compactor thread: run a pass when requested or every interval"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._requested or self._closed, self.interval)
+                if self._closed:
+                    self._condition.notify_all()
+                    return
+                self._requested = False
+                self._running = True
+
+            compacted = 0
+            error = None
+            try:
+                compacted = character_manager.compact_journals(
+                    self.save_directory, self.threshold, self.sync)
+            except Exception as e:
+                error = e
+
+            with self._condition:
+                self._passes += 1
+                self._compacted += compacted
+                if error is not None:
+                    self._failed += 1
+                    self.last_error = error
+                self._running = False
+                self._condition.notify_all()
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    print("=== JOURNAL COMPACTOR TEST ===")
+
+    # character = character_manager.create_character("JournalTest", "Warrior")
+    # character_manager.save_character(character)
+    # compactor = JournalCompactor(threshold=0)
+    # for _ in range(100):
+    #     character_manager.record_change(character, "gold", 1)
+    # compactor.request()
+    # compactor.wait_idle()
+    # print(compactor.metrics())
+    # compactor.close()
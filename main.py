@@ -12,14 +12,43 @@ This is the main game file that ties all modules together.
 Demonstrates module integration and complete game flow.
 """
 
-# Import all our custom modules
-import character_manager
-import inventory_system
-import quest_handler
-import combat_system
-import game_data
+import os
+import sys
+import atexit
+import threading
+import importlib.util
+
 from custom_exceptions import *
 
+
+def lazy_import(name):
+    """
+    Import a module the first time one of its attributes is used
+
+    The game modules are only needed once a menu option uses them, so
+    starting the game does not wait for all of them to load.
+
+    Returns: The module (loaded on first attribute access)
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# Import all our custom modules
+character_manager = lazy_import("character_manager")
+inventory_system = lazy_import("inventory_system")
+quest_handler = lazy_import("quest_handler")
+combat_system = lazy_import("combat_system")
+game_data = lazy_import("game_data")
+save_queue = lazy_import("save_queue")
+
 # AI Usage: Used AI (ChatGPT) to help structure/finish functions if I had errors or if I didn't have the correct formatting
 
 # ============================================================================
@@ -32,6 +61,16 @@ all_quests = {}
 all_items = {}
 game_running = False
 
+# Watch the data files so edits show up without restarting the game
+data_reloaders = []
+
+# Game data is loaded in the background while the main menu is shown
+data_loader_thread = None
+data_load_messages = []
+
+# Saves are written by a background writer (started on the first save)
+character_saver = None
+
 # ============================================================================
 # MAIN MENU
 # ============================================================================
@@ -102,10 +141,11 @@ def load_game():
     """
     global current_character
     
-    from character_manager import list_saved_characters, load_character # The imports at the top are apparently not working
+    from character_manager import get_save_manifest, load_character # The imports at the top are apparently not working
 
- # 1. Get list of saved characters
-    saved_characters = list_saved_characters()  # from character_manager
+ # 1. Get list of saved characters (from the save manifest, so no save file is opened)
+    manifest = get_save_manifest()  # from character_manager
+    saved_characters = list(manifest)
     
     if not saved_characters:
         print("No saved characters found.")
@@ -114,7 +154,8 @@ def load_game():
     # 2. Display characters
     print("Saved Characters:")
     for idx, name in enumerate(saved_characters, 1):
-        print(f"{idx}. {name}")
+        entry = manifest[name]
+        print(f"{idx}. {name} ({entry['class']}, Level {entry['level']})")
     
     # 3. Prompt user to select
     while True:
@@ -182,11 +223,13 @@ def game_loop():
 
     global game_running, current_character
     
-    from character_manager import save_character # Imports at the top aren't working apparently
-
+    wait_for_game_data()
     game_running = True
 
     while game_running:
+        refresh_game_data()
+        report_save_failures()
+
         print("\n=== GAME MENU ===")
         print("1. View Character Stats")
         print("2. View Inventory")
@@ -208,13 +251,11 @@ def game_loop():
             print("Starting quest or battle... (placeholder)")
             # You can integrate quest_handler / combat_system here
         elif choice == 4:
-            try:
-                save_character(current_character)
-                print("Game saved successfully.")
-            except Exception as e:
-                print(f"Error saving game: {e}")
+            save_game()
         elif choice == 5:
             print("Exiting to main menu...")
+            # Make sure queued saves are written (and failures shown) before leaving
+            flush_saves()
             game_running = False
         else:
             print("Invalid choice. Please select a number from 1-5.")
@@ -314,6 +355,7 @@ def view_character_stats():
 def view_inventory():
     """Display and manage inventory"""
     global current_character, all_items
+    wait_for_game_data()
     
     inv = current_character["inventory"]
 
@@ -388,6 +430,7 @@ def view_inventory():
 def quest_menu():
     """Quest management menu"""
     global current_character, all_quests
+    wait_for_game_data()
     
     print("\n=== QUEST MENU ===")
     print("1. View Active Quests")
@@ -504,16 +547,30 @@ def explore():
     # Handle exceptions
     
 
+def get_shop_listing():
+    """
+    Get every item for sale, cheapest first
+
+    Returns: List of (item_id, item_data) tuples
+    """
+    if hasattr(all_items, "item_ids_by_cost"):
+        item_ids = all_items.item_ids_by_cost()
+    else:
+        item_ids = sorted(all_items, key=lambda item_id: all_items[item_id]["cost"])
+    return [(item_id, all_items[item_id]) for item_id in item_ids]
+
+
 def shop():
     """Shop menu for buying/selling items"""
     global current_character, all_items
+    wait_for_game_data()
 
     while True:
         print("\n=== SHOP MENU ===")
         print(f"Your Gold: {current_character['gold']}")
         print("Items for Sale:")
 
-        item_list = list(all_items.items())
+        item_list = get_shop_listing()
         for index, (item_id, item) in enumerate(item_list, 1):
             print(f"{index}. {item['name']} ({item['type']}), Cost: {item['cost']} gold")
 
@@ -587,52 +644,101 @@ def shop():
 # ============================================================================
 
 def save_game():
-    """Save current game state"""
+    """
+    Save current game state
+
+    The save is queued for the background writer, so the game does not
+    wait for the disk. A failed save is reported at the next game menu.
+    """
     global current_character
 
     try:
-        character_manager.save_character(current_character)
-        print("\nGame saved successfully!\n")
+        get_character_saver().save(current_character)
+        print("\nGame saved!\n")
     except Exception as e:
         print(f"[ERROR] Failed to save game: {e}")
 
+
+def get_character_saver():
+    """Get the background save writer, starting it on first use"""
+    global character_saver
+
+    if character_saver is None:
+        character_saver = save_queue.SaveQueue()
+        # Queued saves are written even if the game exits some other way
+        atexit.register(close_character_saver)
+    return character_saver
+
+
+def report_save_failures():
+    """Print any background saves that failed"""
+    if character_saver is None:
+        return
+    for name, error in character_saver.take_failures():
+        print(f"[ERROR] Failed to save {name}: {error}")
+
+
+def flush_saves():
+    """Wait for queued saves to be written and report failures"""
+    if character_saver is not None:
+        character_saver.flush()
+        report_save_failures()
+
+
+def close_character_saver():
+    """Write every queued save and stop the writer"""
+    global character_saver
+
+    if character_saver is not None:
+        character_saver.close()
+        report_save_failures()
+        character_saver = None
+
     
     # TODO: Implement save
     # Use character_manager.save_character()
     # Handle any file I/O exceptions
     
 
-def load_game_data():
-    """Load all quest and item data from files"""
+def load_game_data(report=print):
+    """
+    Load all quest and item data from files
+
+    report is called with each warning/error message (print by default;
+    the background loader collects them to print later instead).
+    """
     global all_quests, all_items
 
+    # Shard directories (data/quests.d, data/items.d) are used when present
     try:
-        all_quests = game_data.load_quests()
-        all_items = game_data.load_items()
+        all_quests = game_data.load_quest_catalog()
+        all_items = game_data.load_item_catalog()
 
     except MissingDataFileError:
-        print("[WARNING] Data files missing. Creating default files...")
+        report("[WARNING] Data files missing. Creating default files...")
         game_data.create_default_data_files()
 
         # Try loading again
         try:
-            all_quests = game_data.load_quests()
-            all_items = game_data.load_items()
+            all_quests = game_data.load_quest_catalog()
+            all_items = game_data.load_item_catalog()
         except Exception as e:
-            print(f"[ERROR] Failed to load data even after creating defaults: {e}")
+            report(f"[ERROR] Failed to load data even after creating defaults: {e}")
             all_quests = {}
             all_items = {}
 
     except InvalidDataFormatError as e:
-        print(f"[ERROR] Data file format invalid: {e}")
+        report(f"[ERROR] Data file format invalid: {e}")
         all_quests = {}
         all_items = {}
 
     except Exception as e:
-        print(f"[ERROR] Unexpected error loading data: {e}")
+        report(f"[ERROR] Unexpected error loading data: {e}")
         all_quests = {}
         all_items = {}
     
+    watch_game_data()
+
     # TODO: Implement data loading
     # Try to load quests with game_data.load_quests()
     # Try to load items with game_data.load_items()
@@ -640,6 +746,68 @@ def load_game_data():
     # If files missing, create defaults with game_data.create_default_data_files()
     
 
+def start_loading_game_data():
+    """Start loading the game data in a background thread"""
+    global data_loader_thread
+
+    data_load_messages.clear()
+    data_loader_thread = threading.Thread(target=load_game_data,
+                                          args=(data_load_messages.append,),
+                                          name="game-data-loader", daemon=True)
+    data_loader_thread.start()
+
+
+def wait_for_game_data():
+    """
+    Wait for the background loader to finish (returns at once after the first time)
+
+    Messages the loader reported are printed here, so they never appear
+    in the middle of a menu prompt.
+    """
+    global data_loader_thread
+
+    if data_loader_thread is None:
+        return
+    data_loader_thread.join()
+    data_loader_thread = None
+
+    for message in data_load_messages:
+        print(message)
+    data_load_messages.clear()
+
+
+def watch_game_data():
+    """Start watching the single-file data catalogs for edits"""
+    global data_reloaders
+
+    data_reloaders = []
+    catalogs = [
+        (game_data.catalog_file("data/quests.txt", game_data.QUEST_JSONL_FILE),
+         "quest", all_quests, game_data.QUEST_SHARD_DIRECTORY),
+        (game_data.catalog_file("data/items.txt", game_data.ITEM_JSONL_FILE),
+         "item", all_items, game_data.ITEM_SHARD_DIRECTORY),
+    ]
+    for filename, record_type, catalog, shard_directory in catalogs:
+        # Sharded catalogs and missing files are not watched
+        if catalog and os.path.exists(filename) and not os.path.isdir(shard_directory):
+            data_reloaders.append(game_data.DataReloader(filename, record_type, catalog))
+
+
+def refresh_game_data():
+    """Apply edits made to the data files while the game is running"""
+    for reloader in data_reloaders:
+        try:
+            changes = reloader.reload_if_changed()
+        except DataError as e:
+            print(f"[WARNING] Could not reload {reloader.filename}: {e}")
+            continue
+
+        if changes and any(changes.values()):
+            print(f"[INFO] Reloaded {reloader.filename}: "
+                  f"{len(changes['added'])} added, {len(changes['updated'])} updated, "
+                  f"{len(changes['removed'])} removed")
+
+
 def handle_character_death():
     """Handle character death"""
     global current_character, game_running
@@ -695,18 +863,9 @@ def main():
     # Display welcome message
     display_welcome()
     
-    # Load game data
-    try:
-        load_game_data()
-        print("Game data loaded successfully!")
-    except MissingDataFileError:
-        print("Creating default game data...")
-        game_data.create_default_data_files()
-        load_game_data()
-    except InvalidDataFormatError as e:
-        print(f"Error loading game data: {e}")
-        print("Please check data files for errors.")
-        return
+    # Load game data while the player is in the main menu
+    # (load_game_data reports its own errors; see wait_for_game_data)
+    start_loading_game_data()
     
     # Main menu loop
     while True:
@@ -717,6 +876,7 @@ def main():
         elif choice == 2:
             load_game()
         elif choice == 3:
+            close_character_saver()
             print("\nThanks for playing Quest Chronicles!")
             break
         else:
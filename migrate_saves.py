@@ -0,0 +1,30 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Migration Module
+
+This module moves an existing save directory between the flat layout
+(every {name}_save.txt in one directory) and the hash-sharded layout
+(data/save_games/3f/a2/{name}_save.txt). Stop the game before migrating.
+
+Usage:
+    python migrate_saves.py                          # data/save_games → sharded
+    python migrate_saves.py data/save_games --layout flat
+"""
+
+import argparse
+
+import character_manager
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move saves between the flat and sharded layouts")
+    parser.add_argument("save_directory", nargs="?", default="data/save_games")
+    parser.add_argument("--layout", choices=character_manager.SAVE_LAYOUTS, default="sharded")
+    args = parser.parse_args()
+
+    before = character_manager.get_save_layout(args.save_directory)
+    moved = character_manager.migrate_save_directory(args.save_directory, args.layout)
+    print(f"Moved {moved} saves in {args.save_directory} from {before} to {args.layout} layout")
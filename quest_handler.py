@@ -223,6 +223,12 @@ def get_available_quests(character, quest_data_dict):
     available = []
     level = character.get("level", 1)
 
+    # Indexed catalogs only look at quests whose prerequisite is met
+    if hasattr(quest_data_dict, "available_quest_ids"):
+        quest_ids = quest_data_dict.available_quest_ids(
+            level, character["completed_quests"], character["active_quests"])
+        return [quest_data_dict[quest_id] for quest_id in quest_ids]
+
     for quest_id, quest in quest_data_dict.items():
         required_level = quest.get("required_level", 1)
         prereq = quest.get("prerequisite", "NONE")
@@ -414,6 +420,11 @@ def get_quests_by_level(quest_data_dict, min_level, max_level):
 
     results = []
 
+    # Indexed catalogs can jump straight to the levels in range
+    if hasattr(quest_data_dict, "quest_ids_by_level"):
+        quest_ids = quest_data_dict.quest_ids_by_level(min_level, max_level)
+        return [quest_data_dict[quest_id] for quest_id in quest_ids]
+
     for quest_id, quest in quest_data_dict.items():
         lvl = quest.get("required_level", 1)
         if min_level <= lvl <= max_level:
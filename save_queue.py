@@ -0,0 +1,252 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+Save Queue Module
+
+This module saves characters in the background so the game never waits
+on the disk. Saves are queued and written by one writer thread; if the
+same character is saved again before its save was written, only the
+newest snapshot is written.
+
+Example:
+    queue = SaveQueue()
+    ticket = queue.save(character)   # returns at once
+    ...
+    ticket.result()                  # True, SAVE_UNCHANGED, or raises the save error
+    queue.close()                    # write everything still queued
+"""
+
+import time
+import threading
+from concurrent.futures import Future
+
+import character_manager
+
+# ============================================================================
+# WRITE-BEHIND SAVE QUEUE
+# ============================================================================
+
+class SaveQueue:
+    """
+    Background writer for character saves
+
+    Every save() returns a Future (a "ticket") that finishes with True once
+    the snapshot (or a newer one of the same character) is on disk, with
+    character_manager.SAVE_UNCHANGED if the save file already held it, or
+    with the exception that stopped it. Failures are also kept for
+    take_failures(), for callers that do not hold on to their tickets.
+
+    Each batch the writer takes is written with one group commit
+    (character_manager.save_characters).
+    """
+
+    def __init__(self, save_directory="data/save_games", sync=True, delay=0.0):
+        """
+        Args:
+            save_directory: Where the saves go
+            sync: fsync saves (see character_manager.save_character)
+            delay: Seconds the writer waits after a save arrives, so more
+                   saves can be coalesced into the same batch
+        """
+        self.save_directory = save_directory
+        self.sync = sync
+        self.delay = delay
+
+        self._condition = threading.Condition()
+        self._pending = {}   # name → [snapshot, first queued time, tickets, journal position]
+        self._writing = False
+        self._closed = False
+        self._failures = []  # (name, exception) not yet taken
+
+        self._requested = 0
+        self._written = 0
+        self._skipped = 0
+        self._coalesced = 0
+        self._failed = 0
+        self._batches = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+        self._thread.start()
+
+    def save(self, character):
+        """
+        Queue a save of character
+
+        A copy is taken now, so later changes to the character are not
+        part of this save. (Changes journaled after it with
+        character_manager.record_changes are kept in the journal.)
+
+        Returns: Future that finishes with True (or SAVE_UNCHANGED), or raises the save error
+        Raises: RuntimeError if the queue has been closed
+        """
+        snapshot, position = character_manager.snapshot_character(character, self.save_directory)
+        ticket = Future()
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Save queue is closed")
+            self._requested += 1
+            entry = self._pending.get(snapshot["name"])
+            if entry is None:
+                self._pending[snapshot["name"]] = [snapshot, time.monotonic(), [ticket], position]
+            else:
+                # Replace the queued snapshot; its tickets finish with this write
+                entry[0] = snapshot
+                entry[2].append(ticket)
+                entry[3] = position
+                self._coalesced += 1
+            self._condition.notify_all()
+        return ticket
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued save has been written (or has failed)
+
+        Returns: True if the queue is empty, False if timeout ran out first
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._writing,
+                                            timeout)
+
+    def close(self, timeout=None):
+        """
+        Write everything still queued and stop the writer thread
+
+        Returns: True if everything was written before timeout
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def take_failures(self):
+        """
+        Get the saves that failed since the last call
+
+        Returns: List of (character_name, exception)
+        """
+        with self._condition:
+            failures, self._failures = self._failures, []
+        return failures
+
+    def metrics(self):
+        """
+        Get queue depth and latency numbers
+
+        Returns: Dictionary with:
+            queue_depth      characters waiting to be written
+            requested        save() calls
+            written          snapshots written
+            skipped          snapshots not written because the save was unchanged
+            coalesced        save() calls folded into an already-queued save
+            failed           snapshots that could not be written
+            batches          group commits done
+            average_latency  seconds from first queueing to written (mean)
+            max_latency      the longest of those
+        """
+        with self._condition:
+            finished = self._written + self._skipped + self._failed
+            return {
+                "queue_depth": len(self._pending),
+                "requested": self._requested,
+                "written": self._written,
+                "skipped": self._skipped,
+                "coalesced": self._coalesced,
+                "failed": self._failed,
+                "batches": self._batches,
+                "average_latency": self._latency_total / finished if finished else 0.0,
+                "max_latency": self._latency_max,
+            }
+
+    def _run(self):
+        """Writer thread: take whatever is queued and write it as one batch"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return  # closed and nothing left
+                if self.delay and not self._closed:
+                    self._condition.wait(self.delay)
+                batch, self._pending = self._pending, {}
+                self._writing = True
+
+            errors, unchanged = self._write(batch)
+
+            finished = time.monotonic()
+            with self._condition:
+                self._batches += 1
+                for name, (_, queued_at, _, _) in batch.items():
+                    latency = finished - queued_at
+                    self._latency_total += latency
+                    self._latency_max = max(self._latency_max, latency)
+                    if name in errors:
+                        self._failed += 1
+                        self._failures.append((name, errors[name]))
+                    elif name in unchanged:
+                        self._skipped += 1
+                    else:
+                        self._written += 1
+                self._writing = False
+                self._condition.notify_all()
+
+            for name, (_, _, tickets, _) in batch.items():
+                for ticket in tickets:
+                    if name in errors:
+                        ticket.set_exception(errors[name])
+                    elif name in unchanged:
+                        ticket.set_result(character_manager.SAVE_UNCHANGED)
+                    else:
+                        ticket.set_result(True)
+
+    def _write(self, batch):
+        """
+        Write a batch of snapshots
+
+        Returns: (Dictionary {name: exception} of the saves that failed,
+                  set of names whose save was skipped as unchanged)
+        """
+        unchanged = set()
+        snapshots = []
+        positions = {name: position for name, (_, _, _, position) in batch.items()}
+        for name, (snapshot, _, _, _) in batch.items():
+            try:
+                if character_manager.is_save_unchanged(snapshot, self.save_directory, self.sync):
+                    unchanged.add(name)
+                    continue
+            except Exception:
+                pass  # the save below reports the problem
+            snapshots.append(snapshot)
+        try:
+            character_manager.save_characters(snapshots, self.save_directory, self.sync,
+                                              journal_positions=positions)
+            return {}, unchanged
+        except Exception:
+            pass
+
+        # Something in the batch failed: save one by one to find out which
+        errors = {}
+        for snapshot in snapshots:
+            try:
+                character_manager.save_character(snapshot, self.save_directory, self.sync,
+                                                 journal_position=positions[snapshot["name"]])
+            except Exception as e:
+                errors[snapshot["name"]] = e
+        return errors, unchanged
+
+
+# ============================================================================
+# TESTING
+# ============================================================================
+
+if __name__ == "__main__":
+    print("=== SAVE QUEUE TEST ===")
+
+    # queue = SaveQueue()
+    # character = character_manager.create_character("QueueTest", "Warrior")
+    # for gold in range(100):
+    #     character["gold"] = gold
+    #     queue.save(character)
+    # queue.close()
+    # print(queue.metrics())
@@ -0,0 +1,199 @@
+"""
+Test Character Store
+Tests the SQLite character store and using it through character_manager
+"""
+
+import pytest
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import character_store
+from custom_exceptions import CharacterNotFoundError, InvalidSaveDataError
+
+
+def make_character(name="StoreTest", character_class="Warrior"):
+    """Create a character with some items and quests to save"""
+    character = character_manager.create_character(name, character_class)
+    character["inventory"] = ["health_potion", "iron_sword", "health_potion"]
+    character["active_quests"] = ["dragon_hunt"]
+    character["completed_quests"] = ["first_steps", "goblin_hunter"]
+    return character
+
+
+@pytest.fixture
+def database(tmp_path):
+    """Path of a fresh database"""
+    return str(tmp_path / "saves.db")
+
+# ============================================================================
+# CHARACTER MANAGER API TESTS
+# ============================================================================
+
+def test_round_trip_keeps_types(database):
+    """Test that a character loads back exactly, lists as lists"""
+    character = make_character()
+    character["equipped_weapon"] = "iron_sword"
+    assert character_manager.save_character(character, database) == True
+
+    loaded = character_manager.load_character("StoreTest", database)
+    assert loaded == character
+
+def test_list_and_delete(database):
+    """Test listing and deleting characters in a database"""
+    assert character_manager.list_saved_characters(database) == []
+    for name in ["Ann", "Bob", "Cid"]:
+        character_manager.save_character(make_character(name), database)
+    character_manager.save_character(make_character("Ann"), database)
+
+    assert character_manager.list_saved_characters(database) == ["Ann", "Bob", "Cid"]
+    assert character_manager.delete_character("Bob", database) == True
+    assert character_manager.list_saved_characters(database) == ["Ann", "Cid"]
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.delete_character("Bob", database)
+    with pytest.raises(CharacterNotFoundError):
+        character_manager.load_character("Bob", database)
+
+def test_resave_replaces_lists(database):
+    """Test that saving again replaces the inventory and quests"""
+    character = make_character()
+    character_manager.save_character(character, database)
+    character["inventory"] = ["dragon_scale"]
+    character["active_quests"] = []
+    character_manager.save_character(character, database)
+
+    loaded = character_manager.load_character("StoreTest", database)
+    assert loaded["inventory"] == ["dragon_scale"]
+    assert loaded["active_quests"] == []
+
+def test_text_save_moves_to_database(tmp_path, database):
+    """Test saving a character loaded from a text save into a database"""
+    character = character_manager.create_character("Mover", "Rogue")
+    character["inventory"] = ["health_potion"]
+    character_manager.save_character(character, str(tmp_path))
+    loaded = character_manager.load_character("Mover", str(tmp_path))
+
+    character_manager.save_character(loaded, database)
+    assert character_manager.load_character("Mover", database)["inventory"] == ["health_potion"]
+
+def test_bulk_save_is_all_or_nothing(database):
+    """Test that a batch with a bad character saves nothing"""
+    bad = make_character("Bad")
+    del bad["gold"]
+    with pytest.raises(InvalidSaveDataError):
+        character_manager.save_characters([make_character("Ann"), bad], database)
+    assert character_manager.list_saved_characters(database) == []
+
+    assert character_manager.save_characters(
+        [make_character(f"Hero{n}") for n in range(50)], database) == 50
+    assert len(character_manager.list_saved_characters(database)) == 50
+
+def test_recorded_changes_are_saved(database):
+    """Test record_change with a database"""
+    character = make_character()
+    character_manager.save_character(character, database)
+    character_manager.record_changes(character, [("gold", 25), ("quest", "dragon_hunt")],
+                                     database)
+
+    loaded = character_manager.load_character("StoreTest", database)
+    assert loaded["gold"] == 125
+    assert loaded["active_quests"] == []
+    assert loaded["completed_quests"][-1] == "dragon_hunt"
+
+def test_manifest_from_database(database):
+    """Test get_save_manifest with a database"""
+    character = make_character("Ann", "Mage")
+    character["level"] = 3
+    character_manager.save_character(character, database)
+    assert character_manager.get_save_manifest(database) == {"Ann": {"class": "Mage", "level": 3}}
+
+# ============================================================================
+# QUERY AND POOL TESTS
+# ============================================================================
+
+def test_indexed_queries(database):
+    """Test finding characters by class, level, item and quest"""
+    store = character_manager.get_character_store(database)
+    characters = []
+    for n, character_class in enumerate(["Warrior", "Mage", "Mage", "Rogue"]):
+        character = make_character(f"Hero{n}", character_class)
+        character["level"] = n + 1
+        characters.append(character)
+    characters[2]["inventory"] = ["dragon_scale"]
+    characters[3]["active_quests"] = []
+    characters[3]["completed_quests"] = ["dragon_hunt"]
+    store.save_characters(characters)
+
+    assert store.find_characters(character_class="Mage") == ["Hero1", "Hero2"]
+    assert store.find_characters(min_level=2, max_level=3) == ["Hero1", "Hero2"]
+    assert store.find_characters_with_item("dragon_scale") == ["Hero2"]
+    assert store.find_characters_by_quest("dragon_hunt", "active") == ["Hero0", "Hero1", "Hero2"]
+    assert store.find_characters_by_quest("dragon_hunt") == ["Hero3"]
+
+def test_store_shared_between_threads(database):
+    """Test saving and loading from many threads through a small pool"""
+    store = character_store.CharacterStore(database, pool_size=2)
+    errors = []
+
+    def work(n):
+        try:
+            for round_number in range(5):
+                character = make_character(f"Thread{n}")
+                character["gold"] = round_number
+                store.save_character(character, sync=False)
+                assert store.load_character(f"Thread{n}")["gold"] == round_number
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(store.list_saved_characters()) == 8
+    assert store._opened <= 2
+    store.close()
+
+def test_closed_store_raises_instead_of_hanging(database):
+    """Test using a store after close()"""
+    store = character_store.CharacterStore(database, pool_size=1)
+    store.save_character(make_character())
+    store.close()
+
+    with pytest.raises(RuntimeError):
+        store.list_saved_characters()
+    with pytest.raises(RuntimeError):
+        store.load_character("StoreTest")
+
+def test_closed_shared_store_is_reopened(database):
+    """Test that character_manager opens a new store after the shared one is closed"""
+    character_manager.save_character(make_character(), database)
+    character_manager.get_character_store(database).close()
+    assert character_manager.list_saved_characters(database) == ["StoreTest"]
+
+    character_manager.close_character_store(database)
+    assert character_manager.load_character("StoreTest", database)["gold"] == 100
+    character_manager.close_character_store(database)
+
+def test_waiting_call_fails_when_store_closes(database):
+    """Test that a call waiting for a busy pool is woken by close()"""
+    store = character_store.CharacterStore(database, pool_size=1)
+    errors = []
+
+    with store._connection():
+        waiter = threading.Thread(
+            target=lambda: errors.append(pytest.raises(RuntimeError, store.list_saved_characters)))
+        waiter.start()
+        store.close()
+        waiter.join(5)
+    assert not waiter.is_alive()
+    assert len(errors) == 1
+    assert store._opened == 0
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
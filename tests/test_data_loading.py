@@ -0,0 +1,650 @@
+"""
+Test Data Loading
+Tests the game_data loaders and their caching/indexing helpers
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_data
+import item_catalog
+import world_generator
+import benchmark_loaders
+import data_converter
+from custom_exceptions import InvalidDataFormatError, MissingDataFileError
+
+QUEST_TEXT = (
+    "QUEST_ID: first_steps\n"
+    "TITLE: First Steps\n"
+    "DESCRIPTION: Begin your adventure\n"
+    "REWARD_XP: 50\n"
+    "REWARD_GOLD: 25\n"
+    "REQUIRED_LEVEL: 1\n"
+    "PREREQUISITE: NONE\n"
+    "\n"
+    "QUEST_ID: goblin_hunter\n"
+    "TITLE: Goblin Hunter\n"
+    "DESCRIPTION: Defeat 3 goblins\n"
+    "REWARD_XP: 100\n"
+    "REWARD_GOLD: 75\n"
+    "REQUIRED_LEVEL: 2\n"
+    "PREREQUISITE: first_steps\n"
+)
+
+ITEM_TEXT = (
+    "ITEM_ID: health_potion\n"
+    "NAME: Health Potion\n"
+    "TYPE: consumable\n"
+    "EFFECT: health:20\n"
+    "COST: 25\n"
+    "DESCRIPTION: Restores 20 health points\n"
+    "\n"
+    "ITEM_ID: iron_sword\n"
+    "NAME: Iron Sword\n"
+    "TYPE: weapon\n"
+    "EFFECT: strength:5\n"
+    "COST: 100\n"
+    "DESCRIPTION: A sturdy iron sword\n"
+)
+
+
+def write_file(path, text):
+    """Write text to path and return it as a string path"""
+    path.write_text(text)
+    return str(path)
+
+# ============================================================================
+# COMPILED CACHE TESTS
+# ============================================================================
+
+def test_cache_is_written_and_reused(tmp_path):
+    """Test that a second load comes from the compiled cache"""
+    filename = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+
+    quests = game_data.load_quests(filename)
+    assert os.path.exists(game_data.get_cache_path(filename))
+
+    # Make the text parser unusable: the cache must be what gets loaded
+    original_parser = game_data._parse_quest_file
+    game_data._parse_quest_file = None
+    try:
+        cached = game_data.load_quests(filename)
+    finally:
+        game_data._parse_quest_file = original_parser
+
+    assert cached == quests
+
+def test_cache_is_rebuilt_when_file_changes(tmp_path):
+    """Test that editing the text file invalidates the cache"""
+    filename = write_file(tmp_path / "items.txt", ITEM_TEXT)
+    assert game_data.load_items(filename)["iron_sword"]["cost"] == 100
+
+    write_file(tmp_path / "items.txt", ITEM_TEXT.replace("COST: 100", "COST: 120"))
+    assert game_data.load_items(filename)["iron_sword"]["cost"] == 120
+
+def test_corrupted_cache_falls_back_to_parser(tmp_path):
+    """Test that a damaged cache file is ignored"""
+    filename = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+    game_data.load_quests(filename)
+
+    with open(game_data.get_cache_path(filename), "wb") as f:
+        f.write(b"not a pickle")
+
+    assert "goblin_hunter" in game_data.load_quests(filename)
+
+def test_loading_without_cache(tmp_path):
+    """Test that use_cache=False never writes a cache file"""
+    filename = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+    game_data.load_quests(filename, use_cache=False)
+    assert not os.path.exists(game_data.get_cache_path(filename))
+
+def test_missing_file_still_raises(tmp_path):
+    """Test that the cache does not hide a missing data file"""
+    with pytest.raises(MissingDataFileError):
+        game_data.load_quests(str(tmp_path / "missing.txt"))
+
+def test_invalid_file_still_raises(tmp_path):
+    """Test that format errors are raised and nothing is cached"""
+    filename = write_file(tmp_path / "quests.txt", "QUEST_ID first_steps\n")
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_quests(filename)
+    assert not os.path.exists(game_data.get_cache_path(filename))
+
+# ============================================================================
+# STREAMING LOADER TESTS
+# ============================================================================
+
+def test_iter_quests_streams_records(tmp_path):
+    """Test that iter_quests yields the same records as load_quests"""
+    filename = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+
+    stream = game_data.iter_quests(filename)
+    first = next(stream)
+    assert first["quest_id"] == "first_steps"
+    assert first["reward_xp"] == 50
+
+    rest = list(stream)
+    assert [q["quest_id"] for q in rest] == ["goblin_hunter"]
+    assert game_data.load_quests(filename, use_cache=False) == {
+        q["quest_id"]: q for q in [first] + rest
+    }
+
+def test_iter_items_without_trailing_blank_line(tmp_path):
+    """Test that the final block is yielded even without a blank line"""
+    filename = write_file(tmp_path / "items.txt", ITEM_TEXT.rstrip("\n"))
+    items = list(game_data.iter_items(filename))
+    assert [i["item_id"] for i in items] == ["health_potion", "iron_sword"]
+
+def test_iter_missing_file_raises_immediately(tmp_path):
+    """Test that a missing file is reported before iterating"""
+    with pytest.raises(MissingDataFileError):
+        game_data.iter_items(str(tmp_path / "missing.txt"))
+
+def test_iter_reports_missing_field(tmp_path):
+    """Test that records missing a field raise InvalidDataFormatError"""
+    filename = write_file(tmp_path / "items.txt", ITEM_TEXT.replace("COST: 100\n", ""))
+    stream = game_data.iter_items(filename)
+    assert next(stream)["item_id"] == "health_potion"
+    with pytest.raises(InvalidDataFormatError):
+        next(stream)
+
+# ============================================================================
+# LAZY CATALOG TESTS
+# ============================================================================
+
+def test_lazy_catalog_matches_loader(tmp_path):
+    """Test that LazyCatalog returns the same records as load_quests"""
+    filename = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+    quests = game_data.load_quests(filename, use_cache=False)
+
+    with game_data.LazyCatalog(filename, "quest") as catalog:
+        assert len(catalog) == 2
+        assert list(catalog) == ["first_steps", "goblin_hunter"]
+        assert "goblin_hunter" in catalog
+        assert "dragon_slayer" not in catalog
+        assert catalog["goblin_hunter"] == quests["goblin_hunter"]
+        assert dict(catalog) == quests
+
+def test_lazy_catalog_parses_only_on_lookup(tmp_path):
+    """Test that a broken block only fails when it is looked up"""
+    filename = write_file(tmp_path / "items.txt", ITEM_TEXT.replace("COST: 100", "COST: lots"))
+
+    with game_data.LazyCatalog(filename, "item") as catalog:
+        assert catalog["health_potion"]["cost"] == 25
+        with pytest.raises(InvalidDataFormatError):
+            catalog["iron_sword"]
+
+def test_lazy_catalog_missing_file(tmp_path):
+    """Test that LazyCatalog reports missing files like the loaders"""
+    with pytest.raises(MissingDataFileError):
+        game_data.LazyCatalog(str(tmp_path / "missing.txt"), "item")
+
+def test_lazy_catalog_empty_file(tmp_path):
+    """Test that an empty file gives an empty catalog"""
+    filename = write_file(tmp_path / "items.txt", "")
+    with game_data.LazyCatalog(filename, "item") as catalog:
+        assert len(catalog) == 0
+
+# ============================================================================
+# SHARDED LOADING TESTS
+# ============================================================================
+
+def test_load_item_shards_merges_all_shards(tmp_path):
+    """Test that every shard is loaded (using a process pool)"""
+    shard_dir = tmp_path / "items.d"
+    shard_dir.mkdir()
+    blocks = ITEM_TEXT.split("\n\n")
+    write_file(shard_dir / "a.txt", blocks[0])
+    write_file(shard_dir / "b.txt", blocks[1])
+
+    items = game_data.load_item_shards(str(shard_dir), max_workers=2)
+    assert sorted(items) == ["health_potion", "iron_sword"]
+    assert items == game_data.load_items(write_file(tmp_path / "items.txt", ITEM_TEXT))
+
+def test_duplicate_ids_across_shards(tmp_path):
+    """Test that the same ID in two shards is rejected"""
+    shard_dir = tmp_path / "quests.d"
+    shard_dir.mkdir()
+    write_file(shard_dir / "a.txt", QUEST_TEXT)
+    write_file(shard_dir / "b.txt", QUEST_TEXT.split("\n\n")[1])
+
+    with pytest.raises(InvalidDataFormatError):
+        game_data.load_quest_shards(str(shard_dir), max_workers=2)
+
+def test_missing_shard_directory(tmp_path):
+    """Test that a missing shard directory raises MissingDataFileError"""
+    with pytest.raises(MissingDataFileError):
+        game_data.load_quest_shards(str(tmp_path / "quests.d"))
+
+def test_catalog_falls_back_to_single_file(tmp_path):
+    """Test that load_quest_catalog uses the file when there are no shards"""
+    filename = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+    quests = game_data.load_quest_catalog(filename, str(tmp_path / "quests.d"))
+    assert len(quests) == 2
+
+# ============================================================================
+# RECORD TYPE TESTS
+# ============================================================================
+
+def test_loaders_build_slotted_records(tmp_path):
+    """Test that loaded records are compact but read like dictionaries"""
+    filename = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+    quest = game_data.load_quests(filename)["goblin_hunter"]
+
+    assert isinstance(quest, game_data.Quest)
+    assert not hasattr(quest, "__dict__")
+    assert quest["reward_gold"] == 75
+    assert quest.get("prerequisite") == "first_steps"
+    assert quest.get("missing", "default") == "default"
+    assert "required_level" in quest
+    assert quest == dict(quest)
+    assert game_data.validate_quest_data(quest) == True
+
+def test_records_are_smaller_than_dicts(tmp_path):
+    """Test that a record uses less memory than the equivalent dictionary"""
+    filename = write_file(tmp_path / "items.txt", ITEM_TEXT)
+    item = game_data.load_items(filename, use_cache=False)["iron_sword"]
+    assert sys.getsizeof(item) < sys.getsizeof(dict(item))
+
+def test_blocks_with_extra_fields_keep_them(tmp_path):
+    """Test that unknown fields are not dropped"""
+    filename = write_file(tmp_path / "items.txt", ITEM_TEXT.replace("COST: 25\n", "COST: 25\nRARITY: common\n"))
+    items = game_data.load_items(filename, use_cache=False)
+    assert items["health_potion"]["rarity"] == "common"
+    assert isinstance(items["iron_sword"], game_data.Item)
+
+# ============================================================================
+# ITEM COLUMN TESTS
+# ============================================================================
+
+def test_items_under_cost_sorted_by_bonus():
+    """Test the weapons-under-N-gold query on the real item file"""
+    columns = item_catalog.build_item_columns(game_data.load_items("data/items.txt"))
+
+    assert columns.items_under_cost("weapon", 250, "strength") == ["steel_sword", "iron_sword"]
+    assert columns.items_under_cost("weapon", 249, "strength") == ["iron_sword"]
+    assert columns.items_under_cost("weapon", 10) == []
+    assert set(columns.items_under_cost("armor", 1000)) == {"leather_armor", "steel_armor", "magic_robe"}
+
+def test_best_value_per_gold():
+    """Test the best-consumable-per-gold query"""
+    items = {
+        "small": {"type": "consumable", "effect": "health:20", "cost": 25},
+        "large": {"type": "consumable", "effect": "health:50", "cost": 40},
+        "sword": {"type": "weapon", "effect": "strength:90", "cost": 1},
+    }
+    columns = item_catalog.build_item_columns(items)
+
+    assert columns.best_value("consumable", "health") == "large"
+    assert columns.best_value("consumable", "magic") is None
+    assert len(columns) == 3
+
+# ============================================================================
+# HOT RELOAD TESTS
+# ============================================================================
+
+def rewrite(path, text, bump):
+    """Rewrite a data file and move its mtime forward"""
+    path.write_text(text)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump * 1_000_000_000))
+
+def test_reloader_updates_catalog_in_place(tmp_path):
+    """Test that edits, additions and removals reach the same dictionary"""
+    path = tmp_path / "items.txt"
+    filename = write_file(path, ITEM_TEXT)
+    items = game_data.load_items(filename)
+    held_reference = items
+    reloader = game_data.DataReloader(filename, "item", items)
+
+    assert reloader.reload_if_changed() is None
+
+    rewrite(path, ITEM_TEXT.replace("COST: 100", "COST: 150"), 1)
+    changes = reloader.reload_if_changed()
+    assert changes == {"added": [], "updated": ["iron_sword"], "removed": []}
+    assert held_reference["iron_sword"]["cost"] == 150
+
+    blocks = ITEM_TEXT.replace("COST: 100", "COST: 150").split("\n\n")
+    new_block = blocks[1].replace("iron_sword", "steel_sword")
+    rewrite(path, blocks[0] + "\n\n" + new_block, 2)
+    changes = reloader.reload_if_changed()
+    assert changes == {"added": ["steel_sword"], "updated": [], "removed": ["iron_sword"]}
+    assert sorted(held_reference) == ["health_potion", "steel_sword"]
+
+def test_reloader_keeps_catalog_on_bad_edit(tmp_path):
+    """Test that an invalid edit is reported and nothing is applied"""
+    path = tmp_path / "quests.txt"
+    filename = write_file(path, QUEST_TEXT)
+    quests = game_data.load_quests(filename)
+    reloader = game_data.DataReloader(filename, "quest", quests)
+
+    rewrite(path, QUEST_TEXT.replace("REWARD_XP: 100", "REWARD_XP: many"), 1)
+    with pytest.raises(InvalidDataFormatError):
+        reloader.reload_if_changed()
+    assert quests["goblin_hunter"]["reward_xp"] == 100
+
+# ============================================================================
+# WHOLE-FILE VALIDATION TESTS
+# ============================================================================
+
+def test_validate_file_collects_every_error(tmp_path):
+    """Test that one run reports all problems with their line numbers"""
+    text = (QUEST_TEXT
+            .replace("REWARD_XP: 100", "REWARD_XP: lots")
+            .replace("TITLE: Goblin Hunter\n", "")
+            + "\nQUEST_ID: first_steps\nTITLE: Again\nDESCRIPTION: x\n"
+              "REWARD_XP: 1\nREWARD_GOLD: 1\nREQUIRED_LEVEL: 1\nPREREQUISITE: lost_quest\n")
+    filename = write_file(tmp_path / "quests.txt", text)
+
+    errors = game_data.validate_quest_file(filename)
+    lines = [line for line, message in errors]
+    messages = " | ".join(message for line, message in errors)
+
+    assert lines == [9, 11, 16, 16]
+    assert "Expected integer for REWARD_XP" in messages
+    assert "Missing field 'TITLE'" in messages
+    assert "Duplicate quest ID 'first_steps'" in messages
+    assert "Unknown prerequisite 'lost_quest'" in messages
+
+def test_validate_file_on_real_data():
+    """Test that the shipped data files are valid"""
+    assert game_data.validate_quest_file("data/quests.txt") == []
+    assert game_data.validate_item_file("data/items.txt") == []
+
+def test_loader_reports_line_number(tmp_path):
+    """Test that the loaders share the schema and name the bad line"""
+    filename = write_file(tmp_path / "items.txt", ITEM_TEXT.replace("TYPE: weapon", "TYPE: wand"))
+    with pytest.raises(InvalidDataFormatError, match="Line 8: Invalid TYPE 'wand'"):
+        game_data.load_items(filename)
+
+def test_validate_item_data_lists_all_problems():
+    """Test that validate_item_data reports every problem together"""
+    with pytest.raises(InvalidDataFormatError) as error:
+        game_data.validate_item_data({"item_id": "x", "name": "X", "type": "wand",
+                                      "effect": "health:5", "cost": "10"})
+    assert "description" in str(error.value)
+    assert "cost" in str(error.value)
+    assert "wand" in str(error.value)
+
+# ============================================================================
+# PRE-PARSED EFFECT TESTS
+# ============================================================================
+
+def test_items_carry_parsed_effect(tmp_path):
+    """Test that load_items stores the effect stat and value"""
+    filename = write_file(tmp_path / "items.txt", ITEM_TEXT)
+    sword = game_data.load_items(filename)["iron_sword"]
+
+    assert sword["effect"] == "strength:5"
+    assert sword["effect_stat"] == "strength"
+    assert sword["effect_value"] == 5
+
+def test_parsed_effect_is_not_a_record_field(tmp_path):
+    """Test that an item still equals its data-file dictionary"""
+    sword = game_data.load_items(write_file(tmp_path / "items.txt", ITEM_TEXT))["iron_sword"]
+
+    assert len(sword) == 6
+    assert list(sword) == ["item_id", "name", "type", "effect", "cost", "description"]
+    assert sword == {"item_id": "iron_sword", "name": "Iron Sword", "type": "weapon",
+                     "effect": "strength:5", "cost": 100, "description": sword["description"]}
+    assert sword.effect_value == 5
+
+def test_unknown_effect_stat_is_rejected(tmp_path):
+    """Test that effects naming an unknown stat fail at load time"""
+    filename = write_file(tmp_path / "items.txt", ITEM_TEXT.replace("strength:5", "luck:5"))
+    with pytest.raises(InvalidDataFormatError, match="luck"):
+        game_data.load_items(filename)
+
+def test_use_item_does_not_parse_effect_string(tmp_path):
+    """Test that using a loaded item reads the pre-parsed effect"""
+    import inventory_system
+    filename = write_file(tmp_path / "items.txt", ITEM_TEXT)
+    potion = game_data.load_items(filename)["health_potion"]
+    character = {"health": 50, "max_health": 100, "inventory": ["health_potion"]}
+
+    original_parser = inventory_system.parse_item_effect
+    inventory_system.parse_item_effect = None
+    try:
+        inventory_system.use_item(character, "health_potion", potion)
+    finally:
+        inventory_system.parse_item_effect = original_parser
+
+    assert character["health"] == 70
+
+# ============================================================================
+# CATALOG INDEX TESTS
+# ============================================================================
+
+def test_indexed_queries_match_full_scans(tmp_path):
+    """Test that indexed quest queries give the same answers as scanning"""
+    import quest_handler
+
+    path = str(tmp_path / "quests.txt")
+    world_generator.generate_quests_file(path, 300, seed=11)
+    quests = game_data.load_quests(path)
+    plain = dict(quests)
+    assert isinstance(quests, game_data.QuestCatalog)
+
+    assert (quest_handler.get_quests_by_level(quests, 10, 20)
+            == quest_handler.get_quests_by_level(plain, 10, 20))
+
+    character = {"level": 25,
+                 "completed_quests": [world_generator.quest_id_for(n) for n in range(0, 12)],
+                 "active_quests": [world_generator.quest_id_for(12)]}
+    assert (quest_handler.get_available_quests(character, quests)
+            == quest_handler.get_available_quests(character, plain))
+
+    # A saved one-quest list loads back as a bare string, and an empty one as ""
+    for completed, active in [(world_generator.quest_id_for(0), ""), ("", [])]:
+        character = {"level": 25, "completed_quests": completed, "active_quests": active}
+        assert (quest_handler.get_available_quests(character, quests)
+                == quest_handler.get_available_quests(character, plain))
+
+def test_available_quests_after_reload(tmp_path):
+    """Test a reloaded character who has completed exactly one quest"""
+    import quest_handler
+    import character_manager
+
+    quests = game_data.load_quests(write_file(tmp_path / "quests.txt", QUEST_TEXT))
+    character = character_manager.create_character("OneQuest", "Warrior")
+    character["level"] = 3
+    character["completed_quests"] = ["first_steps"]
+    character_manager.save_character(character, str(tmp_path))
+    loaded = character_manager.load_character("OneQuest", str(tmp_path))
+
+    indexed = [quest["quest_id"] for quest in quest_handler.get_available_quests(loaded, quests)]
+    assert "first_steps" not in indexed
+    assert "goblin_hunter" in indexed
+    assert indexed == [quest["quest_id"]
+                       for quest in quest_handler.get_available_quests(loaded, dict(quests))]
+
+def test_quest_unlock_index(tmp_path):
+    """Test the reverse prerequisite map"""
+    quests = game_data.load_quests(write_file(tmp_path / "quests.txt", QUEST_TEXT))
+    assert quests.quests_unlocked_by("first_steps") == ["goblin_hunter"]
+    assert quests.quests_unlocked_by("goblin_hunter") == []
+
+def test_item_indexes_by_type_and_cost(tmp_path):
+    """Test item lookups by type and price range"""
+    items = game_data.load_items(write_file(tmp_path / "items.txt", ITEM_TEXT))
+    assert items.item_ids_by_type("weapon") == ["iron_sword"]
+    assert items.item_ids_by_cost(max_cost=50) == ["health_potion"]
+    assert items.item_ids_by_cost(min_cost=25, max_cost=100) == ["health_potion", "iron_sword"]
+
+def test_indexes_follow_catalog_changes(tmp_path):
+    """Test that changing the catalog rebuilds the indexes"""
+    items = game_data.load_items(write_file(tmp_path / "items.txt", ITEM_TEXT))
+    assert items.item_ids_by_cost(max_cost=50) == ["health_potion"]
+
+    del items["health_potion"]
+    assert items.item_ids_by_cost(max_cost=50) == []
+    assert items.item_ids_by_type("consumable") == []
+
+# ============================================================================
+# WORLD GENERATOR TESTS
+# ============================================================================
+
+def test_generated_world_is_valid(tmp_path):
+    """Test that generated data passes validation and loads"""
+    import character_manager
+    import quest_handler
+
+    paths = world_generator.generate_world(str(tmp_path / "world"), 200, 150, 5, seed=7)
+
+    assert game_data.validate_quest_file(paths["quests"]) == []
+    assert game_data.validate_item_file(paths["items"]) == []
+
+    quests = game_data.load_quests(paths["quests"])
+    assert len(quests) == 200
+    assert quest_handler.validate_quest_prerequisites(quests) == True
+    assert len(game_data.load_items(paths["items"])) == 150
+    assert len(character_manager.list_saved_characters(paths["save_games"])) == 5
+
+def test_generated_saves_follow_quest_chains(tmp_path, monkeypatch):
+    """Test that generated saves are written in chunks with valid quest progress"""
+    import character_manager
+
+    quests_file = str(tmp_path / "quests.txt")
+    world_generator.generate_quests_file(quests_file, 42, seed=7)
+    quests = game_data.load_quests(quests_file)
+
+    batches = []
+    original = character_manager.save_characters
+
+    def counting_save_characters(characters, save_directory, sync=True):
+        batches.append(len(characters))
+        return original(characters, save_directory, sync)
+
+    monkeypatch.setattr(world_generator, "SAVE_CHUNK", 4)
+    monkeypatch.setattr(character_manager, "save_characters", counting_save_characters)
+    directory = str(tmp_path / "saves")
+    assert world_generator.generate_save_games(directory, 30, seed=7, quest_count=42) == 30
+    assert batches == [4] * 7 + [2]
+
+    for name in character_manager.list_saved_characters(directory):
+        character = character_manager.load_character(name, directory)
+        completed = character["completed_quests"]
+        completed = completed if isinstance(completed, list) else [completed] if completed else []
+        for quest_id in completed:
+            prerequisite = quests[quest_id]["prerequisite"]
+            assert prerequisite == "NONE" or prerequisite in completed
+        active = character["active_quests"]
+        if active:
+            assert quests[active]["prerequisite"] in completed + ["NONE"]
+
+def test_generator_is_deterministic(tmp_path):
+    """Test that the same seed writes the same file"""
+    first = str(tmp_path / "first.txt")
+    second = str(tmp_path / "second.txt")
+    world_generator.generate_items_file(first, 50, seed=3)
+    world_generator.generate_items_file(second, 50, seed=3)
+
+    with open(first) as a, open(second) as b:
+        assert a.read() == b.read()
+
+# ============================================================================
+# JSON LINES TESTS
+# ============================================================================
+
+def test_jsonl_round_trip_matches_block_format(tmp_path):
+    """Test converting to JSON Lines and back gives the same records"""
+    source = write_file(tmp_path / "items.txt", ITEM_TEXT)
+    jsonl = str(tmp_path / "items.jsonl")
+    back = str(tmp_path / "items_back.txt")
+
+    assert data_converter.convert_data_file(source, jsonl) == 2
+    assert data_converter.convert_data_file(jsonl, back, "item") == 2
+
+    original = game_data.load_items(source, use_cache=False)
+    assert game_data.load_items(jsonl, use_cache=False) == original
+    assert game_data.load_items(back, use_cache=False) == original
+    assert game_data.load_items(jsonl)["iron_sword"]["effect_value"] == 5
+
+def test_jsonl_errors_report_line_numbers(tmp_path):
+    """Test that bad JSON lines are reported by line"""
+    path = write_file(tmp_path / "quests.jsonl",
+                      '{"quest_id": "a", "title": "A", "description": "d", "reward_xp": 1, '
+                      '"reward_gold": 1, "required_level": 1, "prerequisite": "NONE"}\n'
+                      '\n'
+                      '{"quest_id": "b", "title": "B", "description": "d", "reward_xp": "lots", '
+                      '"reward_gold": 1, "required_level": 1, "prerequisite": "a"}\n'
+                      '{"quest_id": "c",\n')
+
+    with pytest.raises(InvalidDataFormatError, match="Line 3"):
+        game_data.load_quests(path, use_cache=False)
+    assert [line for line, _ in game_data.validate_quest_file(path)] == [3, 4]
+
+def test_catalog_prefers_jsonl_file(tmp_path):
+    """Test that load_quest_catalog uses quests.jsonl when it exists"""
+    source = write_file(tmp_path / "quests.txt", QUEST_TEXT)
+    jsonl = str(tmp_path / "quests.jsonl")
+    data_converter.convert_data_file(source, jsonl)
+
+    assert game_data.catalog_file(source, jsonl) == jsonl
+    quests = game_data.load_quest_catalog(source, str(tmp_path / "none.d"), jsonl)
+    assert quests.quests_unlocked_by("first_steps") == ["goblin_hunter"]
+
+def test_lazy_catalog_and_reloader_read_jsonl(tmp_path):
+    """Test the lazy catalog and hot reloader on a JSON Lines file"""
+    jsonl = str(tmp_path / "items.jsonl")
+    data_converter.convert_data_file(write_file(tmp_path / "items.txt", ITEM_TEXT), jsonl)
+
+    with game_data.LazyCatalog(jsonl, "item") as items:
+        assert items["iron_sword"]["cost"] == 100
+
+    catalog = game_data.load_items(jsonl, use_cache=False)
+    reloader = game_data.DataReloader(jsonl, "item", catalog)
+    with open(jsonl) as f:
+        text = f.read()
+    rewrite(tmp_path / "items.jsonl", text.replace('"cost": 100', '"cost": 90'), 5)
+    assert reloader.reload_if_changed()["updated"] == ["iron_sword"]
+    assert catalog["iron_sword"]["cost"] == 90
+
+def test_lazy_jsonl_index_decodes_escaped_ids(tmp_path):
+    """Test IDs that json.dumps writes with escapes"""
+    import json
+
+    lines = []
+    for item_id in ["épée", "a/b", 'say "hi"']:
+        record = {"item_id": item_id, "name": "Blade", "type": "weapon",
+                  "effect": "strength:1", "cost": 5, "description": "Sharp"}
+        lines.append(json.dumps(record).replace("/", "\\/") + "\n")
+    jsonl = write_file(tmp_path / "items.jsonl", "".join(lines))
+
+    with game_data.LazyCatalog(jsonl, "item") as items:
+        assert sorted(items) == sorted(game_data.load_items(jsonl, use_cache=False))
+        assert "épée" in items
+        assert items["a/b"]["item_id"] == "a/b"
+        assert items['say "hi"']["cost"] == 5
+
+# ============================================================================
+# BENCHMARK TESTS
+# ============================================================================
+
+def test_benchmark_reports_throughput_and_memory(tmp_path):
+    """Test a small benchmark run"""
+    results = benchmark_loaders.run_benchmarks(["1k"], ["load_items"],
+                                               work_directory=str(tmp_path), repeats=1)
+    result = results["load_items/1k"]
+    assert result["records"] == 1000
+    assert result["records_per_second"] > 0
+    assert result["peak_memory_bytes"] > 0
+
+def test_throughput_drop_past_threshold_is_reported():
+    """Test comparing results against baselines"""
+    baselines = {"threshold_percent": 25,
+                 "results": {"load_items/1k": {"records_per_second": 1000}}}
+
+    assert benchmark_loaders.compare_to_baselines(
+        {"load_items/1k": {"records_per_second": 800}}, baselines) == []
+    assert len(benchmark_loaders.compare_to_baselines(
+        {"load_items/1k": {"records_per_second": 700}}, baselines)) == 1
+    # Benchmarks without a baseline are not judged
+    assert benchmark_loaders.compare_to_baselines(
+        {"load_quests/1k": {"records_per_second": 1}}, baselines) == []
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
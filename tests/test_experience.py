@@ -0,0 +1,207 @@
+"""
+Test Experience
+Tests the closed-form level-up math against the original one-level-at-a-time loop,
+and the batch XP and gold awards
+"""
+
+import pytest
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+from custom_exceptions import CharacterDeadError
+
+
+def loop_gain_experience(character, xp_amount):
+    """The original gain_experience level-up loop, kept as the reference"""
+    character["experience"] += xp_amount
+    while character["experience"] >= character["level"] * 100:
+        level_up_xp = character["level"] * 100
+        character["experience"] -= level_up_xp
+        character["level"] += 1
+        character["max_health"] += 10
+        character["strength"] += 2
+        character["magic"] += 2
+        character["health"] = character["max_health"]
+
+
+def make_character(level=1, experience=0, health=50):
+    """Create a character part-way through some level"""
+    character = character_manager.create_character("XPTest", "Mage")
+    character["level"] = level
+    character["experience"] = experience
+    character["health"] = health
+    return character
+
+# ============================================================================
+# DIFFERENTIAL TESTS
+# ============================================================================
+
+def test_matches_loop_for_every_small_case():
+    """Test every level, starting experience and grant in a small grid"""
+    for level in range(1, 12):
+        for experience in range(0, level * 100, 11):
+            for xp_amount in list(range(0, 3000, 37)) + [-experience]:
+                expected = make_character(level, experience)
+                loop_gain_experience(expected, xp_amount)
+                actual = make_character(level, experience)
+                character_manager.gain_experience(actual, xp_amount)
+                assert actual == expected, (level, experience, xp_amount)
+
+def test_matches_loop_on_level_boundaries():
+    """Test grants that land exactly on, or one short of, a level-up"""
+    for level in range(1, 30):
+        needed = 0
+        for levels in range(1, 20):
+            needed += (level + levels - 1) * 100
+            for xp_amount in (needed - 1, needed, needed + 1):
+                expected = make_character(level)
+                loop_gain_experience(expected, xp_amount)
+                actual = make_character(level)
+                character_manager.gain_experience(actual, xp_amount)
+                assert actual == expected, (level, xp_amount)
+
+def test_matches_loop_for_random_large_grants():
+    """Test random grants up to thousands of levels"""
+    rng = random.Random(163)
+    for _ in range(300):
+        level = rng.randint(1, 500)
+        experience = rng.randrange(level * 100)
+        xp_amount = rng.randint(0, 10 ** rng.randint(1, 8))
+        expected = make_character(level, experience)
+        loop_gain_experience(expected, xp_amount)
+        actual = make_character(level, experience)
+        character_manager.gain_experience(actual, xp_amount)
+        assert actual == expected, (level, experience, xp_amount)
+
+def test_unusual_values_still_match_loop():
+    """Test values the closed form does not handle (level 0, fractional experience)"""
+    for level, experience, xp_amount in [(0, 0, 250), (1, 0, 150.5), (2, 350, 0)]:
+        expected = make_character(level, experience)
+        loop_gain_experience(expected, xp_amount)
+        actual = make_character(level, experience)
+        character_manager.gain_experience(actual, xp_amount)
+        assert actual == expected
+
+def test_huge_grant_is_fast():
+    """Test a grant worth about a million levels"""
+    character = make_character()
+    character_manager.gain_experience(character, 50 * 10 ** 12)
+    assert character["level"] == 1000000
+    assert 0 <= character["experience"] < character["level"] * 100
+
+# ============================================================================
+# PREVIEW TESTS
+# ============================================================================
+
+def test_preview_matches_gain_without_changing_character():
+    """Test that preview_experience predicts gain_experience"""
+    character = make_character(3, 250)
+    before = dict(character)
+    preview = character_manager.preview_experience(character, 1000)
+    assert character == before
+
+    character_manager.gain_experience(character, 1000)
+    assert preview["levels_gained"] == 3
+    for key in ["level", "experience", "health", "max_health", "strength", "magic"]:
+        assert preview[key] == character[key]
+
+def test_preview_without_level_up_keeps_health():
+    """Test a preview that gains no level"""
+    preview = character_manager.preview_experience(make_character(health=30), 10)
+    assert preview["levels_gained"] == 0
+    assert preview["health"] == 30
+
+def test_preview_of_dead_character():
+    """Test that previewing for a dead character raises like gain_experience"""
+    with pytest.raises(CharacterDeadError):
+        character_manager.preview_experience(make_character(health=0), 10)
+
+# ============================================================================
+# BATCH AWARD TESTS
+# ============================================================================
+
+def make_party(count=200, seed=163):
+    """Characters at random levels, every tenth one dead, some short of gold"""
+    rng = random.Random(seed)
+    party = []
+    for n in range(count):
+        character = make_character(rng.randint(1, 40), 0, health=0 if n % 10 == 0 else 50)
+        character["name"] = f"Hero{n}"
+        character["experience"] = rng.randrange(character["level"] * 100)
+        character["gold"] = rng.randint(0, 200)
+        party.append(character)
+    return party
+
+def one_by_one(party, xp_amounts, gold_amounts):
+    """Award with gain_experience and add_gold, skipping characters that would fail"""
+    rejected = []
+    for n, character in enumerate(party):
+        if xp_amounts[n] and character["health"] == 0:
+            rejected.append(n)
+        elif character["gold"] + gold_amounts[n] < 0:
+            rejected.append(n)
+        else:
+            if xp_amounts[n]:
+                character_manager.gain_experience(character, xp_amounts[n])
+            character_manager.add_gold(character, gold_amounts[n])
+    return rejected
+
+def test_award_party_matches_one_by_one():
+    """Test batch awards against gain_experience and add_gold"""
+    rng = random.Random(7)
+    expected = make_party()
+    actual = make_party()
+    xp_amounts = [rng.choice([0, 50, 400, 25000]) for _ in expected]
+    gold_amounts = [rng.randint(-150, 100) for _ in expected]
+
+    expected_rejected = one_by_one(expected, xp_amounts, gold_amounts)
+    rejected = character_manager.award_party(actual, xp_amounts, gold_amounts)
+
+    assert [n for n, _, _ in rejected] == expected_rejected
+    assert actual == expected
+
+def test_award_columns_matches_award_party():
+    """Test the columnar form on the same party"""
+    party = make_party()
+    columns = {field: [character[field] for character in party]
+               for field in character_manager.AWARD_COLUMNS + ["name"]}
+
+    rejected_columns = character_manager.award_columns(columns, 1500, -20)
+    rejected_party = character_manager.award_party(party, 1500, -20)
+
+    assert [(n, name) for n, name, _ in rejected_columns] == \
+        [(n, name) for n, name, _ in rejected_party]
+    for field in character_manager.AWARD_COLUMNS:
+        assert columns[field] == [character[field] for character in party]
+
+def test_rejections_say_why():
+    """Test the reasons given for rejected characters"""
+    dead = make_character(health=0)
+    dead["name"] = "Dead"
+    poor = make_character()
+    poor["name"] = "Poor"
+    poor["gold"] = 10
+
+    rejected = character_manager.award_party([dead, poor], 100, -20)
+    assert [(n, name) for n, name, _ in rejected] == [(0, "Dead"), (1, "Poor")]
+    assert isinstance(rejected[0][2], CharacterDeadError)
+    assert isinstance(rejected[1][2], ValueError)
+    assert poor["gold"] == 10 and poor["experience"] == 0
+
+def test_dead_characters_can_still_be_paid():
+    """Test that a gold-only award reaches dead characters"""
+    dead = make_character(health=0)
+    assert character_manager.award_party([dead], gold_amount=25) == []
+    assert dead["gold"] == 125
+
+def test_amount_lists_must_match_party():
+    """Test a wrong-length amount list"""
+    with pytest.raises(ValueError):
+        character_manager.award_party([make_character()], [10, 20])
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,656 @@
+"""
+Test Save System
+Tests crash-safe character saving and the save file helpers
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import character_manager
+import inventory_system
+import benchmark_saves
+import save_queue
+import journal_compactor
+import threading
+
+
+def make_character(name="SaveTest", character_class="Warrior"):
+    """Create a character with some items and quests to save"""
+    character = character_manager.create_character(name, character_class)
+    character["inventory"] = ["health_potion", "iron_sword"]
+    character["completed_quests"] = ["first_steps", "goblin_hunter"]
+    return character
+
+
+def leftover_temp_files(directory):
+    """Temporary files left behind in a save directory"""
+    return [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+# ============================================================================
+# ATOMIC SAVE TESTS
+# ============================================================================
+
+def test_save_round_trip(tmp_path):
+    """Test that a saved character loads back"""
+    character = make_character()
+    assert character_manager.save_character(character, str(tmp_path)) == True
+
+    loaded = character_manager.load_character("SaveTest", str(tmp_path))
+    assert loaded["gold"] == 100
+    assert loaded["inventory"] == ["health_potion", "iron_sword"]
+    assert leftover_temp_files(tmp_path) == []
+
+def test_failed_save_keeps_old_save(tmp_path, monkeypatch):
+    """Test that a save interrupted before the swap leaves the old file whole"""
+    character = make_character()
+    character_manager.save_character(character, str(tmp_path))
+
+    def crash(*args):
+        raise OSError("disk full")
+
+    character["gold"] = 999
+    monkeypatch.setattr(character_manager.os, "replace", crash)
+    with pytest.raises(OSError):
+        character_manager.save_character(character, str(tmp_path))
+    monkeypatch.undo()
+
+    assert character_manager.load_character("SaveTest", str(tmp_path))["gold"] == 100
+
+def test_save_errors_are_raised(tmp_path):
+    """Test that a failed save raises instead of returning False"""
+    not_a_directory = tmp_path / "file.txt"
+    not_a_directory.write_text("")
+
+    with pytest.raises(OSError):
+        character_manager.save_character(make_character(), str(not_a_directory))
+
+def test_temp_files_are_not_listed(tmp_path):
+    """Test that a stray temporary file is not shown as a save"""
+    character_manager.save_character(make_character(), str(tmp_path))
+    (tmp_path / "Ghost_save.txt.1.2.tmp").write_text("name:Ghost\n")
+
+    assert character_manager.list_saved_characters(str(tmp_path)) == ["SaveTest"]
+
+# ============================================================================
+# GROUP COMMIT TESTS
+# ============================================================================
+
+def test_save_characters_saves_every_character(tmp_path):
+    """Test saving a batch of characters"""
+    characters = [make_character(f"Hero{n}") for n in range(20)]
+    assert character_manager.save_characters(characters, str(tmp_path)) == 20
+
+    assert sorted(character_manager.list_saved_characters(str(tmp_path))) == \
+        sorted(c["name"] for c in characters)
+    assert character_manager.load_character("Hero7", str(tmp_path))["name"] == "Hero7"
+    assert leftover_temp_files(tmp_path) == []
+
+def test_failed_batch_cleans_up(tmp_path):
+    """Test that a batch that fails part-way leaves no temporary files"""
+    characters = [make_character("Hero1"), {"no_name": True}, make_character("Hero2")]
+
+    with pytest.raises(KeyError):
+        character_manager.save_characters(characters, str(tmp_path))
+    assert leftover_temp_files(tmp_path) == []
+    assert character_manager.list_saved_characters(str(tmp_path)) == []
+
+def test_save_benchmark_measures_cost(tmp_path):
+    """Test a small save benchmark run"""
+    results = benchmark_saves.run_benchmarks(10, ["atomic", "group_commit", "unchanged", "journal"],
+                                             str(tmp_path))
+    assert results["atomic"]["saves"] == 10
+    assert results["unchanged"]["saves"] == 10
+    assert results["group_commit"]["microseconds_per_save"] > 0
+
+# ============================================================================
+# CHANGE TRACKING TESTS
+# ============================================================================
+
+def test_unchanged_save_is_skipped(tmp_path):
+    """Test that saving an unchanged character writes nothing"""
+    character = make_character()
+    assert character_manager.save_character(character, str(tmp_path)) == True
+    path = character_manager.get_save_path("SaveTest", str(tmp_path))
+    mtime = os.stat(path).st_mtime_ns
+
+    assert character_manager.save_character(character, str(tmp_path), report_skip=True) == \
+        character_manager.SAVE_UNCHANGED
+    # A skipped save is still a successful one
+    assert character_manager.save_character(character, str(tmp_path)) == True
+    assert os.stat(path).st_mtime_ns == mtime
+
+    character["gold"] += 1
+    assert character_manager.save_character(character, str(tmp_path)) == True
+    assert character_manager.load_character("SaveTest", str(tmp_path))["gold"] == 101
+
+def test_loaded_character_is_not_resaved(tmp_path):
+    """Test that a character saved straight after loading is skipped"""
+    character_manager.save_character(make_character(), str(tmp_path))
+    loaded = character_manager.load_character("SaveTest", str(tmp_path))
+
+    assert character_manager.is_save_unchanged(loaded, str(tmp_path))
+    assert character_manager.save_characters([loaded], str(tmp_path)) == 0
+    assert character_manager.save_character(loaded, str(tmp_path)) == True
+
+def test_outside_change_is_overwritten(tmp_path):
+    """Test that a save file changed or removed behind our back is written again"""
+    character = make_character()
+    character_manager.save_character(character, str(tmp_path))
+    path = character_manager.get_save_path("SaveTest", str(tmp_path))
+
+    with open(path, "a") as f:
+        f.write("gold:0\n")
+    assert character_manager.save_character(character, str(tmp_path)) == True
+    assert character_manager.load_character("SaveTest", str(tmp_path))["gold"] == 100
+
+    os.remove(path)
+    assert character_manager.save_character(character, str(tmp_path)) == True
+    assert os.path.exists(path)
+
+def test_unsynced_save_is_synced_later(tmp_path):
+    """Test that a save written without fsync is not skipped when fsync is asked for"""
+    character = make_character()
+    character_manager.save_character(character, str(tmp_path), sync=False)
+    assert character_manager.save_character(character, str(tmp_path), sync=False,
+                                            report_skip=True) == character_manager.SAVE_UNCHANGED
+    assert character_manager.save_character(character, str(tmp_path), report_skip=True) == True
+    assert character_manager.save_character(character, str(tmp_path), report_skip=True) == \
+        character_manager.SAVE_UNCHANGED
+
+def test_queue_skips_unchanged_saves(tmp_path):
+    """Test that the save queue reports skipped saves"""
+    queue = save_queue.SaveQueue(str(tmp_path), sync=False)
+    character = make_character("Ann")
+    assert queue.save(character).result(5) == True
+    assert queue.save(character).result(5) == character_manager.SAVE_UNCHANGED
+    queue.close()
+
+    metrics = queue.metrics()
+    assert metrics["written"] == 1
+    assert metrics["skipped"] == 1
+
+# ============================================================================
+# JOURNAL SAVE TESTS
+# ============================================================================
+
+def journal_file(directory, name="SaveTest"):
+    """Path of a character's journal"""
+    return os.path.join(directory, f"{name}{character_manager.JOURNAL_SUFFIX}")
+
+def test_journal_replayed_on_load(tmp_path):
+    """Test that journaled changes are part of the loaded character"""
+    directory = str(tmp_path)
+    character = make_character()
+    character["active_quests"] = ["first_steps_2"]
+    character_manager.save_character(character, directory)
+
+    character_manager.record_changes(character, [("gold", 50), ("experience", 150),
+                                                 ("item", "dragon_scale"),
+                                                 ("quest", "first_steps_2")], directory)
+    character_manager.record_change(character, "gold", -30, directory)
+    assert character["level"] == 2
+
+    loaded = character_manager.load_character("SaveTest", directory)
+    assert loaded["gold"] == 120
+    assert loaded["level"] == 2
+    assert loaded["experience"] == 50
+    assert loaded["max_health"] == character["max_health"]
+    assert loaded["inventory"] == ["health_potion", "iron_sword", "dragon_scale"]
+    assert loaded["active_quests"] == []
+    assert loaded["completed_quests"] == ["first_steps", "goblin_hunter", "first_steps_2"]
+
+def test_journal_needs_a_save(tmp_path):
+    """Test journaling a character that was never saved"""
+    with pytest.raises(character_manager.CharacterNotFoundError):
+        character_manager.record_change(make_character(), "gold", 5, str(tmp_path))
+
+def test_failed_change_keeps_earlier_changes(tmp_path):
+    """Test that changes before a rejected one are still journaled"""
+    directory = str(tmp_path)
+    character = make_character()
+    character_manager.save_character(character, directory)
+
+    with pytest.raises(ValueError):
+        character_manager.record_changes(character, [("gold", 10), ("gold", -500)], directory)
+    assert character["gold"] == 110
+    assert character_manager.load_character("SaveTest", directory)["gold"] == 110
+
+def test_journaled_items_respect_inventory_limit(tmp_path):
+    """Test that journaling items stops at a full inventory"""
+    directory = str(tmp_path)
+    character = make_character()
+    character_manager.save_character(character, directory)
+    loaded = character_manager.load_character("SaveTest", directory)
+
+    with pytest.raises(inventory_system.InventoryFullError):
+        character_manager.record_changes(loaded, [("item", f"gem_{n}") for n in range(25)],
+                                         directory)
+    limit = inventory_system.MAX_INVENTORY_SIZE
+    assert len(loaded["inventory"]) == limit
+    assert len(character_manager.load_character("SaveTest", directory)["inventory"]) == limit
+
+def test_journaling_does_not_wait_on_other_characters(tmp_path):
+    """Test that one character's journal lock does not block another's changes"""
+    directory = str(tmp_path)
+    ann, bob = make_character("Ann"), make_character("Bob")
+    character_manager.save_characters([ann, bob], directory)
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold_ann_lock():
+        with character_manager._journal_lock(character_manager.get_save_path("Ann", directory)):
+            held.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_ann_lock)
+    holder.start()
+    held.wait(5)
+    done = threading.Event()
+    writer = threading.Thread(target=lambda: (
+        character_manager.record_change(bob, "gold", 5, directory), done.set()))
+    writer.start()
+    assert done.wait(2)
+    release.set()
+    holder.join(5)
+    writer.join(5)
+    assert character_manager.load_character("Bob", directory)["gold"] == 105
+
+def test_compaction_folds_journal_into_save(tmp_path):
+    """Test that compacting removes the journal and keeps the changes"""
+    directory = str(tmp_path)
+    character = make_character()
+    character_manager.save_character(character, directory)
+    for _ in range(10):
+        character_manager.record_change(character, "gold", 1, directory, sync=False)
+
+    assert character_manager.compact_journals(directory, threshold=1000) == 0
+    assert character_manager.compact_journals(directory, threshold=0) == 1
+    assert not os.path.exists(journal_file(directory))
+    assert character_manager.load_character("SaveTest", directory)["gold"] == 110
+    assert character_manager.list_saved_characters(directory) == ["SaveTest"]
+
+def test_stale_journal_is_ignored(tmp_path):
+    """Test a crash between writing the save and removing the journal"""
+    directory = str(tmp_path)
+    character = make_character()
+    character_manager.save_character(character, directory)
+    character_manager.record_change(character, "gold", 25, directory)
+    with open(journal_file(directory)) as f:
+        journal = f.read()
+
+    character_manager.save_character(character, directory)
+    with open(journal_file(directory), "w") as f:
+        f.write(journal)
+    assert character_manager.load_character("SaveTest", directory)["gold"] == 125
+    assert not os.path.exists(journal_file(directory))
+
+def test_torn_journal_line_is_dropped(tmp_path):
+    """Test that an append cut short by a crash is ignored"""
+    directory = str(tmp_path)
+    character = make_character()
+    character_manager.save_character(character, directory)
+    character_manager.record_change(character, "gold", 5, directory)
+    with open(journal_file(directory), "a") as f:
+        f.write("gold\t10")
+
+    assert character_manager.load_character("SaveTest", directory)["gold"] == 105
+
+def test_queued_save_keeps_later_journal_entries(tmp_path, monkeypatch):
+    """Test journaling while an older queued snapshot is being written"""
+    directory = str(tmp_path)
+    character = make_character()
+    character_manager.save_character(character, directory)
+    character_manager.record_change(character, "gold", 5, directory)
+    started = threading.Event()
+    release = threading.Event()
+    original = character_manager.save_characters
+
+    def slow_save_characters(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(character_manager, "save_characters", slow_save_characters)
+    queue = save_queue.SaveQueue(directory, sync=False)
+    ticket = queue.save(character)
+    started.wait(5)
+    character_manager.record_changes(character, [("gold", 50), ("item", "dragon_scale")],
+                                     directory)
+    release.set()
+    assert queue.close(5)
+    assert ticket.result() == True
+
+    loaded = character_manager.load_character("SaveTest", directory)
+    assert loaded["gold"] == 155
+    assert loaded["inventory"].count("dragon_scale") == 1
+    # The kept entries now apply to the new save: compacting still works
+    assert character_manager.compact_journal("SaveTest", directory)
+    assert character_manager.load_character("SaveTest", directory)["gold"] == 155
+
+def test_background_compactor(tmp_path):
+    """Test that the compactor folds journals when asked"""
+    directory = str(tmp_path)
+    character = make_character()
+    character_manager.save_character(character, directory)
+    character_manager.record_change(character, "item", "dragon_scale", directory, sync=False)
+
+    compactor = journal_compactor.JournalCompactor(directory, threshold=0, interval=60)
+    compactor.request()
+    assert compactor.wait_idle(5)
+    assert compactor.close(5)
+
+    assert compactor.metrics()["compacted"] == 1
+    assert not os.path.exists(journal_file(directory))
+    assert "dragon_scale" in character_manager.load_character("SaveTest", directory)["inventory"]
+
+# ============================================================================
+# BULK LOAD TESTS
+# ============================================================================
+
+def test_load_characters_reports_failures_per_name(tmp_path):
+    """Test that missing and broken saves do not stop the batch"""
+    directory = str(tmp_path)
+    character_manager.save_characters([make_character(f"Hero{n}") for n in range(10)], directory)
+    (tmp_path / "Broken_save.txt").write_bytes(b"\xff\xfe\x00")
+
+    names = ["Hero3", "Missing", "Hero1", "Broken", "Hero3"]
+    characters, errors = character_manager.load_characters(names, directory)
+
+    assert list(characters) == ["Hero3", "Hero1"]
+    assert characters["Hero1"]["name"] == "Hero1"
+    assert list(errors) == ["Missing", "Broken"]
+    assert isinstance(errors["Missing"], character_manager.CharacterNotFoundError)
+
+def test_load_characters_runs_concurrently(tmp_path, monkeypatch):
+    """Test that slow loads overlap instead of running one by one"""
+    directory = str(tmp_path)
+    names = [f"Hero{n}" for n in range(8)]
+    character_manager.save_characters([make_character(name) for name in names], directory)
+
+    original = character_manager.load_character
+    all_started = threading.Barrier(4, timeout=5)
+
+    def slow_load(name, save_directory):
+        # Only returns once 4 loads are running at the same time
+        all_started.wait()
+        return original(name, save_directory)
+
+    monkeypatch.setattr(character_manager, "load_character", slow_load)
+    characters, errors = character_manager.load_characters(names, directory, max_workers=4)
+    assert errors == {}
+    assert list(characters) == names
+
+# ============================================================================
+# CHARACTER CACHE TESTS
+# ============================================================================
+
+def test_repeated_loads_hit_the_cache(tmp_path):
+    """Test that a second load comes from the cache and is a separate copy"""
+    directory = str(tmp_path)
+    character_manager.save_character(make_character(), directory)
+    before = character_manager.character_cache.stats()
+
+    first = character_manager.load_character("SaveTest", directory)
+    first["inventory"].append("dragon_scale")
+    second = character_manager.load_character("SaveTest", directory)
+
+    after = character_manager.character_cache.stats()
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
+    assert second["inventory"] == ["health_potion", "iron_sword"]
+
+def test_writes_invalidate_the_cache(tmp_path):
+    """Test that saves, journaled changes and deletes are seen by the next load"""
+    directory = str(tmp_path)
+    character = make_character()
+    character_manager.save_character(character, directory)
+    character_manager.load_character("SaveTest", directory)
+
+    character["gold"] = 500
+    character_manager.save_character(character, directory)
+    assert character_manager.load_character("SaveTest", directory)["gold"] == 500
+
+    character_manager.record_change(character, "gold", 5, directory)
+    assert character_manager.load_character("SaveTest", os.path.join(directory, "."))["gold"] == 505
+
+    character_manager.delete_character("SaveTest", directory)
+    with pytest.raises(character_manager.CharacterNotFoundError):
+        character_manager.load_character("SaveTest", directory)
+
+def test_cache_shared_by_every_spelling_of_a_directory(tmp_path, monkeypatch):
+    """Test that a save through an absolute path invalidates a load through a relative one"""
+    monkeypatch.chdir(tmp_path)
+    character = make_character()
+    character_manager.save_character(character, "saves")
+    assert character_manager.load_character("SaveTest", "saves")["gold"] == 100
+
+    character["gold"] = 999
+    character_manager.save_character(character, os.path.abspath("saves"))
+    assert character_manager.load_character("SaveTest", "saves")["gold"] == 999
+
+    character_manager.delete_character("SaveTest", os.path.abspath("saves"))
+    with pytest.raises(character_manager.CharacterNotFoundError):
+        character_manager.load_character("SaveTest", "./saves")
+
+def test_cache_evicts_least_recently_used():
+    """Test the size bound"""
+    cache = character_manager.CharacterCache(capacity=2)
+    for name in ["Ann", "Bob"]:
+        cache.put("saves", {"name": name}, cache.version)
+    cache.get("saves", "Ann")
+    cache.put("saves", {"name": "Cid"}, cache.version)
+
+    assert cache.get("saves", "Bob") is None
+    assert cache.get("saves", "Ann") == {"name": "Ann"}
+    assert cache.stats()["size"] == 2
+
+def test_load_racing_a_save_is_not_cached():
+    """Test that a load started before an invalidation does not fill the cache"""
+    cache = character_manager.CharacterCache()
+    version = cache.version
+    cache.invalidate("saves", ["Ann"])
+    cache.put("saves", {"name": "Ann"}, version)
+    assert cache.get("saves", "Ann") is None
+
+# ============================================================================
+# SAVE MANIFEST TESTS
+# ============================================================================
+
+def test_manifest_tracks_saves_and_deletes(tmp_path):
+    """Test that saves and deletes keep the manifest up to date"""
+    directory = str(tmp_path)
+    character_manager.save_character(make_character("Ann"), directory)
+    assert character_manager.list_saved_characters(directory) == ["Ann"]
+
+    bob = make_character("Bob", "Mage")
+    bob["level"] = 4
+    character_manager.save_character(bob, directory)
+    character_manager.delete_character("Ann", directory)
+
+    manifest = character_manager.get_save_manifest(directory)
+    assert list(manifest) == ["Bob"]
+    assert manifest["Bob"]["class"] == "Mage"
+    assert manifest["Bob"]["level"] == 4
+
+def test_manifest_survives_restart(tmp_path):
+    """Test that a manifest written by saves is read back from disk"""
+    directory = str(tmp_path)
+    character_manager.list_saved_characters(directory)
+    character_manager.save_characters([make_character(f"Hero{n}") for n in range(5)], directory)
+
+    character_manager._manifest_cache.clear()
+    assert sorted(character_manager.list_saved_characters(directory)) == \
+        [f"Hero{n}" for n in range(5)]
+
+def test_manifest_rebuilt_after_outside_change(tmp_path):
+    """Test that a save added without the manifest is still found"""
+    directory = str(tmp_path)
+    character_manager.save_character(make_character("Ann"), directory)
+    assert character_manager.list_saved_characters(directory) == ["Ann"]
+
+    (tmp_path / "Copied_save.txt").write_text("name:Copied\nclass:Rogue\nlevel:7\n")
+    manifest = character_manager.get_save_manifest(directory)
+    assert sorted(manifest) == ["Ann", "Copied"]
+    assert manifest["Copied"]["level"] == 7
+
+def test_damaged_manifest_is_rebuilt(tmp_path):
+    """Test the rebuild-from-scan fallback"""
+    directory = str(tmp_path)
+    character_manager.save_character(make_character("Ann"), directory)
+    character_manager.list_saved_characters(directory)
+
+    with open(tmp_path / character_manager.MANIFEST_NAME, "a") as f:
+        f.write("S\tHalf")
+    character_manager._manifest_cache.clear()
+    assert character_manager.list_saved_characters(directory) == ["Ann"]
+
+def test_manifest_handles_unusual_names(tmp_path):
+    """Test names with backslashes"""
+    directory = str(tmp_path)
+    character_manager.list_saved_characters(directory)
+    character_manager.save_character(make_character("Tab\\Name"), directory)
+
+    character_manager._manifest_cache.clear()
+    assert character_manager.list_saved_characters(directory) == ["Tab\\Name"]
+
+def test_read_only_directory_is_listed(tmp_path, monkeypatch):
+    """Test listing saves when the manifest cannot be written"""
+    directory = str(tmp_path)
+    character_manager.save_characters([make_character("Ann"), make_character("Bob")], directory)
+
+    def read_only_open(path, mode="r", *args, **kwargs):
+        if "r" not in mode:
+            raise PermissionError(f"Read-only: {path}")
+        return open(path, mode, *args, **kwargs)
+
+    # (chmod does not stop root, so the writes are refused here instead)
+    monkeypatch.setattr(character_manager, "open", read_only_open, raising=False)
+    for _ in range(2):
+        assert character_manager.list_saved_characters(directory) == ["Ann", "Bob"]
+    assert character_manager.get_save_manifest(directory)["Bob"]["level"] == 1
+    assert sorted(os.listdir(directory)) == ["Ann_save.txt", "Bob_save.txt"]
+
+# ============================================================================
+# SHARDED LAYOUT TESTS
+# ============================================================================
+
+def test_migration_to_sharded_layout(tmp_path):
+    """Test moving a flat save directory to the sharded layout and back"""
+    directory = str(tmp_path)
+    names = [f"Hero{n}" for n in range(30)]
+    character_manager.save_characters([make_character(name) for name in names], directory)
+
+    assert character_manager.migrate_save_directory(directory, "sharded") == 30
+    assert character_manager.get_save_layout(directory) == "sharded"
+    assert not any(name.endswith("_save.txt") for name in os.listdir(directory))
+    assert sorted(character_manager.list_saved_characters(directory)) == sorted(names)
+    assert character_manager.load_character("Hero3", directory)["name"] == "Hero3"
+
+    assert character_manager.migrate_save_directory(directory, "flat") == 30
+    assert sorted(name for name in os.listdir(directory) if name.endswith("_save.txt")) == \
+        sorted(f"{name}_save.txt" for name in names)
+
+def test_sharded_save_load_delete(tmp_path):
+    """Test the save functions in a sharded directory"""
+    directory = str(tmp_path)
+    character_manager.migrate_save_directory(directory, "sharded")
+
+    character_manager.save_character(make_character("Ann"), directory)
+    path = character_manager.get_save_path("Ann", directory)
+    assert os.path.exists(path)
+    assert os.path.dirname(os.path.dirname(os.path.dirname(path))) == directory
+
+    assert character_manager.list_saved_characters(directory) == ["Ann"]
+    assert character_manager.load_character("Ann", directory)["gold"] == 100
+    assert character_manager.delete_character("Ann", directory) == True
+    assert character_manager.list_saved_characters(directory) == []
+
+def test_saves_readable_during_migration(tmp_path):
+    """Test that a save still in the old place is found"""
+    directory = str(tmp_path)
+    character_manager.save_character(make_character("Ann"), directory)
+    # Layout switched, but the file has not been moved yet
+    (tmp_path / character_manager.LAYOUT_FILE).write_text("sharded\n")
+    character_manager._layout_cache.clear()
+
+    assert character_manager.load_character("Ann", directory)["name"] == "Ann"
+
+# ============================================================================
+# SAVE QUEUE TESTS
+# ============================================================================
+
+def test_queued_saves_are_coalesced(tmp_path, monkeypatch):
+    """Test that saves queued while the writer is busy write only the newest"""
+    started = threading.Event()
+    release = threading.Event()
+    written = []
+    original = character_manager.save_characters
+
+    def slow_save_characters(characters, save_directory, sync=True, journal_positions=None):
+        written.append([c["gold"] for c in characters])
+        started.set()
+        release.wait(5)
+        return original(characters, save_directory, sync, journal_positions)
+
+    monkeypatch.setattr(character_manager, "save_characters", slow_save_characters)
+    queue = save_queue.SaveQueue(str(tmp_path), sync=False)
+    character = make_character("Ann")
+
+    first = queue.save(character)
+    started.wait(5)
+    tickets = []
+    for gold in range(1, 6):
+        character["gold"] = gold
+        tickets.append(queue.save(character))
+    assert queue.metrics()["queue_depth"] == 1
+
+    release.set()
+    assert queue.close(5)
+    assert first.result() == True
+    assert all(ticket.result() == True for ticket in tickets)
+    assert written == [[100], [5]]
+    assert character_manager.load_character("Ann", str(tmp_path))["gold"] == 5
+
+    metrics = queue.metrics()
+    assert metrics["requested"] == 6
+    assert metrics["coalesced"] == 4
+    assert metrics["written"] == 2
+    assert metrics["queue_depth"] == 0
+    assert metrics["max_latency"] >= metrics["average_latency"] > 0
+
+def test_queue_snapshot_is_taken_at_save(tmp_path):
+    """Test that later changes to the character are not saved by an earlier save"""
+    queue = save_queue.SaveQueue(str(tmp_path), sync=False)
+    character = make_character("Ann")
+    ticket = queue.save(character)
+    character["inventory"].append("dragon_scale")
+    ticket.result(5)
+    queue.close()
+
+    loaded = character_manager.load_character("Ann", str(tmp_path))
+    assert loaded["inventory"] == ["health_potion", "iron_sword"]
+
+def test_queue_reports_failures(tmp_path):
+    """Test that a failed background save reaches the caller"""
+    not_a_directory = tmp_path / "file.txt"
+    not_a_directory.write_text("")
+    queue = save_queue.SaveQueue(str(not_a_directory), sync=False)
+
+    ticket = queue.save(make_character("Ann"))
+    assert queue.flush(5)
+    with pytest.raises(OSError):
+        ticket.result()
+    failures = queue.take_failures()
+    assert [name for name, _ in failures] == ["Ann"]
+    assert queue.take_failures() == []
+    assert queue.metrics()["failed"] == 1
+    queue.close()
+
+    with pytest.raises(RuntimeError):
+        queue.save(make_character("Bob"))
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
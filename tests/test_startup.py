@@ -0,0 +1,131 @@
+"""
+Test Startup
+Tests that main.py starts quickly and loads game data in the background
+"""
+
+import pytest
+import sys
+import os
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Budget for "import main" (cumulative, in microseconds) as reported by -X importtime.
+# Importing everything eagerly took about 80ms; lazy imports bring it near 12ms.
+IMPORT_BUDGET_US = 40000
+
+# Modules game_data imports; none of them should load until game data is used
+DEFERRED_MODULES = ["mmap", "pickle", "hashlib", "concurrent.futures"]
+
+
+def import_times(statement):
+    """
+    Run statement in a fresh interpreter with -X importtime
+
+    Returns: Dictionary {module name: cumulative microseconds}
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+# ============================================================================
+# IMPORT TIME TESTS
+# ============================================================================
+
+def test_import_main_within_budget():
+    """Test that importing main stays within the import-time budget"""
+    import_times("import main")  # first run may write .pyc files
+    # Take the best of a few runs so a busy machine does not fail the test
+    best = min(import_times("import main")["main"] for _ in range(3))
+    assert best < IMPORT_BUDGET_US, f"import main took {best}us (budget {IMPORT_BUDGET_US}us)"
+
+def test_game_modules_are_imported_lazily():
+    """Test that importing main does not run the game modules yet"""
+    times = import_times("import main")
+    for name in DEFERRED_MODULES:
+        assert name not in times, f"{name} was imported at startup"
+
+def test_lazy_module_loads_on_first_use():
+    """Test that a lazily imported module works once used"""
+    result = subprocess.run(
+        [sys.executable, "-c",
+         "import sys, main; print('mmap' in sys.modules); main.game_data.load_quests; "
+         "print('mmap' in sys.modules)"],
+        cwd=ROOT, capture_output=True, text=True, check=True)
+    # game_data's own imports only run once one of its attributes is used
+    assert result.stdout.split() == ["False", "True"]
+
+# ============================================================================
+# BACKGROUND LOADING TESTS
+# ============================================================================
+
+def test_game_data_loads_in_background():
+    """Test that the background loader fills in the catalogs"""
+    import main
+
+    main.start_loading_game_data()
+    main.wait_for_game_data()
+
+    assert len(main.all_quests) > 0
+    assert len(main.all_items) > 0
+    # Waiting again returns straight away
+    main.wait_for_game_data()
+
+    # The shop lists the whole catalog, cheapest first
+    listing = main.get_shop_listing()
+    assert sorted(item_id for item_id, _ in listing) == sorted(main.all_items)
+    costs = [item["cost"] for _, item in listing]
+    assert costs == sorted(costs)
+
+def test_sharded_data_loads_in_background(tmp_path, monkeypatch):
+    """Test that the background loader reads shard directories without forking"""
+    import main
+    import warnings
+
+    quest_shards = tmp_path / "data" / "quests.d"
+    item_shards = tmp_path / "data" / "items.d"
+    quest_shards.mkdir(parents=True)
+    item_shards.mkdir()
+    for number in range(2):
+        (quest_shards / f"part{number}.txt").write_text(
+            f"QUEST_ID: quest_{number}\nTITLE: Quest {number}\nDESCRIPTION: A quest\n"
+            f"REWARD_XP: 50\nREWARD_GOLD: 25\nREQUIRED_LEVEL: 1\nPREREQUISITE: NONE\n")
+        (item_shards / f"part{number}.txt").write_text(
+            f"ITEM_ID: item_{number}\nNAME: Item {number}\nTYPE: consumable\n"
+            f"EFFECT: health:20\nCOST: 25\nDESCRIPTION: An item\n")
+    monkeypatch.chdir(tmp_path)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        main.start_loading_game_data()
+        main.wait_for_game_data()
+
+    assert sorted(main.all_quests) == ["quest_0", "quest_1"]
+    assert sorted(main.all_items) == ["item_0", "item_1"]
+    assert not [w for w in caught if "fork()" in str(w.message)]
+
+def test_background_load_messages_wait_for_data(monkeypatch, capsys):
+    """Test that loader messages are printed when the data is awaited"""
+    import main
+
+    def failing_catalog(*args, **kwargs):
+        raise ValueError("broken catalog")
+
+    monkeypatch.setattr(main.game_data, "load_quest_catalog", failing_catalog)
+    main.start_loading_game_data()
+    main.data_loader_thread.join()
+    assert "broken catalog" not in capsys.readouterr().out
+
+    main.wait_for_game_data()
+    assert "broken catalog" in capsys.readouterr().out
+    assert main.all_quests == {}
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
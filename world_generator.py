@@ -0,0 +1,200 @@
+"""
+COMP 163 - Project 3: Quest Chronicles
+World Generator Module
+
+This module writes large but valid quest, item and save game data so the
+loaders and managers can be tested at sizes the real content will reach.
+
+Usage:
+    python world_generator.py OUTPUT_DIR --quests 100000 --items 100000 --saves 1000
+"""
+
+import os
+import random
+import argparse
+
+import character_manager
+from game_data import VALID_ITEM_TYPES
+
+# ============================================================================
+# WORD LISTS
+# ============================================================================
+
+PLACES = ["Village", "Forest", "Crypt", "Mountain", "Swamp", "Castle",
+          "Harbor", "Desert", "Mine", "Tower", "Glacier", "Canyon"]
+DEEDS = ["Defend", "Explore", "Cleanse", "Scout", "Rescue", "Guard",
+         "Recover", "Survey", "Purge", "Escort"]
+FOES = ["goblins", "orcs", "bandits", "wolves", "skeletons", "cultists",
+        "spiders", "trolls", "wraiths", "a dragon"]
+MATERIALS = ["Iron", "Steel", "Oak", "Bone", "Silver", "Mithril", "Obsidian", "Crystal"]
+
+# Effects each item type can have: (stat, smallest value, largest value)
+ITEM_EFFECTS = {
+    "weapon": [("strength", 2, 40), ("magic", 2, 40)],
+    "armor": [("max_health", 5, 120), ("magic", 2, 30)],
+    "consumable": [("health", 10, 200), ("strength", 1, 10), ("magic", 1, 10)],
+}
+ITEM_NOUNS = {"weapon": ["Sword", "Axe", "Staff", "Dagger", "Mace", "Bow"],
+              "armor": ["Armor", "Robe", "Shield", "Helm", "Greaves"],
+              "consumable": ["Potion", "Elixir", "Tonic", "Draught"]}
+
+# ============================================================================
+# GENERATORS
+# ============================================================================
+
+# generate_save_games saves this many characters per save_characters batch
+SAVE_CHUNK = 1000
+
+def quest_id_for(number):
+    """ID of the nth generated quest"""
+    return f"quest_{number:07d}"
+
+
+def item_id_for(number):
+    """ID of the nth generated item"""
+    return f"item_{number:07d}"
+
+
+def generate_quests_file(filename, count, seed=163, chain_length=5, max_level=50):
+    """
+    Write count quests to filename in the quests.txt format
+
+    Quests come in prerequisite chains of up to chain_length quests. Each
+    chain starts at a random level and the required level rises along it.
+
+    Returns: Number of quests written
+    """
+    rng = random.Random(seed)
+    level = 1
+
+    with open(filename, "w") as f:
+        for number in range(count):
+            if number % chain_length == 0:
+                prerequisite = "NONE"
+                level = rng.randint(1, max_level)
+            else:
+                prerequisite = quest_id_for(number - 1)
+                level = min(max_level, level + rng.randint(0, 2))
+
+            place = rng.choice(PLACES)
+            f.write(
+                f"QUEST_ID: {quest_id_for(number)}\n"
+                f"TITLE: {rng.choice(DEEDS)} the {place}\n"
+                f"DESCRIPTION: Travel to the {place.lower()} and deal with the "
+                f"{rng.choice(FOES)} that threaten it.\n"
+                f"REWARD_XP: {level * rng.randint(40, 60)}\n"
+                f"REWARD_GOLD: {level * rng.randint(20, 40)}\n"
+                f"REQUIRED_LEVEL: {level}\n"
+                f"PREREQUISITE: {prerequisite}\n\n"
+            )
+    return count
+
+
+def generate_items_file(filename, count, seed=163):
+    """
+    Write count items to filename in the items.txt format
+
+    Returns: Number of items written
+    """
+    rng = random.Random(seed)
+
+    with open(filename, "w") as f:
+        for number in range(count):
+            item_type = rng.choice(VALID_ITEM_TYPES)
+            stat, low, high = rng.choice(ITEM_EFFECTS[item_type])
+            value = rng.randint(low, high)
+            name = f"{rng.choice(MATERIALS)} {rng.choice(ITEM_NOUNS[item_type])}"
+            f.write(
+                f"ITEM_ID: {item_id_for(number)}\n"
+                f"NAME: {name}\n"
+                f"TYPE: {item_type}\n"
+                f"EFFECT: {stat}:{value}\n"
+                f"COST: {value * rng.randint(5, 15)}\n"
+                f"DESCRIPTION: A {name.lower()} that raises {stat} by {value}.\n\n"
+            )
+    return count
+
+
+def generate_save_games(save_directory, count, seed=163, quest_count=0, item_count=0,
+                        chain_length=5):
+    """
+    Write count character saves with character_manager.save_characters
+
+    If quest_count/item_count are given, characters get completed quests,
+    active quests and inventory items that exist in the generated files
+    (chain_length must match the one the quests were generated with).
+    Saves are written SAVE_CHUNK at a time, so memory use stays flat
+    however many are asked for. Generated saves are not fsynced (they can
+    always be generated again).
+
+    Returns: Number of saves written
+    """
+    rng = random.Random(seed)
+    classes = ["Warrior", "Mage", "Rogue", "Cleric"]
+    characters = []
+    written = 0
+
+    for number in range(count):
+        character = character_manager.create_character(f"Hero{number:07d}", rng.choice(classes))
+        character_manager.gain_experience(character, rng.randint(0, 20000))
+        character["gold"] = rng.randint(0, 5000)
+
+        if item_count:
+            character["inventory"] = [item_id_for(rng.randrange(item_count))
+                                      for _ in range(rng.randint(0, 10))]
+        if quest_count:
+            # Completed quests are a run from the start of one chain, so
+            # every completed quest's prerequisite is completed too
+            start = rng.randrange(0, quest_count, chain_length)
+            chain_end = min(start + chain_length, quest_count)
+            done = min(start + rng.randint(0, chain_length), chain_end)
+            character["completed_quests"] = [quest_id_for(n) for n in range(start, done)]
+            if done < chain_end:
+                character["active_quests"] = [quest_id_for(done)]
+
+        characters.append(character)
+        if len(characters) == SAVE_CHUNK:
+            written += character_manager.save_characters(characters, save_directory, sync=False)
+            characters = []
+    if characters:
+        written += character_manager.save_characters(characters, save_directory, sync=False)
+    return written
+
+
+def generate_world(output_directory, quest_count, item_count, save_count, seed=163):
+    """
+    Write a full data directory: quests.txt, items.txt and save_games/
+
+    Returns: Dictionary with the paths that were written
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    paths = {
+        "quests": os.path.join(output_directory, "quests.txt"),
+        "items": os.path.join(output_directory, "items.txt"),
+        "save_games": os.path.join(output_directory, "save_games"),
+    }
+
+    # Each part gets its own seed so changing one size does not reshuffle the others
+    generate_quests_file(paths["quests"], quest_count, seed)
+    generate_items_file(paths["items"], item_count, seed + 1)
+    generate_save_games(paths["save_games"], save_count, seed + 2, quest_count, item_count)
+    return paths
+
+
+# ============================================================================
+# COMMAND LINE
+# ============================================================================
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a large Quest Chronicles data set")
+    parser.add_argument("output_directory")
+    parser.add_argument("--quests", type=int, default=100000)
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--saves", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=163)
+    args = parser.parse_args()
+
+    written = generate_world(args.output_directory, args.quests, args.items, args.saves, args.seed)
+    print(f"Wrote {args.quests} quests, {args.items} items and {args.saves} saves:")
+    for part, path in written.items():
+        print(f"  {part}: {path}")